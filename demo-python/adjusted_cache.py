@@ -0,0 +1,227 @@
+# adjusted_cache.py 파일
+# 기업 이벤트(분할/배당)를 반영하는 로컬 데이터 캐시
+# - 수정주가는 분할/배당이 생길 때마다 과거 전체가 바뀌므로 캐시하면 전체 이력을 다시 받아야 한다
+# - 대신 "원본(raw) OHLCV" 와 티커별 이벤트 테이블(분할 비율, 주당 배당금)만 저장하고
+#   읽을 때 누적 조정 계수를 벡터 연산으로 곱해 수정주가를 만든다
+# - 원본 행은 한 번 쓰면 바뀌지 않으므로 증분(append) 업데이트만 하면 되고,
+#   새 이벤트는 증분 다운로드 구간에 함께 들어오거나 refresh_events() 의 작은 조회로 반영된다
+# - 장 마감 전의 미확정 봉은 저장하지 않는다 (마지막 확정 거래일까지만, util.dynamic_date)
+#   · 이미 그 날짜까지 받아 두었으면 주말/휴장일에도 네트워크 조회 없이 바로 읽는다
+# - 여러 프로세스가 동시에 같은 티커를 요청해도 다운로드/쓰기는 한 곳에서만 (shared_cache.single_flight)
+#
+# 저장 위치) datas/raw/<ticker>.txt          Date,Open,High,Low,Close,Volume (분할/배당 미반영 원본)
+#           datas/raw/<ticker>.events.json  [[날짜, 'split'|'dividend', 값], ...]
+
+import datetime
+import json
+import os
+
+import numpy as np
+
+from data_updater import DEFAULT_START, append_rows, read_data_frame, read_last_date
+from shared_cache import atomic_write, single_flight
+from util.dynamic_date import last_closed_session
+
+RAW_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'datas', 'raw')
+RAW_HEADER = ['Date', 'Open', 'High', 'Low', 'Close', 'Volume']
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close']
+
+
+def raw_data_path(ticker):
+    return os.path.join(RAW_DIR, '%s.txt' % ticker.lower())
+
+
+def events_path(ticker):
+    return os.path.join(RAW_DIR, '%s.events.json' % ticker.lower())
+
+
+def read_events(ticker):
+    """저장된 이벤트 목록 [(date, kind, value), ...] (날짜순)"""
+    try:
+        with open(events_path(ticker), 'r', encoding='utf-8') as f:
+            payload = json.load(f)
+    except (OSError, ValueError):
+        return []
+    return [(datetime.date.fromisoformat(d), kind, value) for d, kind, value in payload['events']]
+
+
+def write_events(ticker, events):
+    payload = {
+        'refreshed': datetime.datetime.now().isoformat(timespec='seconds'),
+        'events': [(d.isoformat(), kind, value) for d, kind, value in sorted(set(events))],
+    }
+    atomic_write(events_path(ticker), json.dumps(payload))
+
+
+def suffix_factors(event_dates, multipliers, dates):
+    """각 날짜보다 뒤에 있는 이벤트 multipliers 의 누적 곱 (벡터 연산)
+
+    분할/배당은 이벤트 당일(ex-date) 바에는 이미 반영되어 있으므로 날짜가 "이후"인 이벤트만 곱한다.
+    """
+    if len(event_dates) == 0:
+        return np.ones(len(dates))
+    suffix = np.concatenate([np.cumprod(multipliers[::-1])[::-1], [1.0]])
+    return suffix[np.searchsorted(event_dates, dates, side='right')]
+
+
+def _as_days(dates):
+    return np.asarray(dates, dtype='datetime64[D]')
+
+
+def events_from_actions(actions):
+    """yfinance 의 Dividends / Stock Splits 컬럼 → 원본(raw) 기준 이벤트 목록
+
+    yfinance 배당금은 이후 분할로 조정된 값이므로 이후 분할 비율을 곱해 당시 주당 금액으로 되돌린다.
+    """
+    if actions is None or len(actions) == 0:
+        return []
+    dates = _as_days(actions.index.tz_localize(None) if actions.index.tz is not None
+                     else actions.index)
+    splits = actions['Stock Splits'].to_numpy(dtype='d') if 'Stock Splits' in actions else np.zeros(len(dates))
+    dividends = actions['Dividends'].to_numpy(dtype='d') if 'Dividends' in actions else np.zeros(len(dates))
+
+    has_split = splits > 0
+    split_dates, ratios = dates[has_split], splits[has_split]
+    raw_dividends = dividends * suffix_factors(split_dates, ratios, dates)
+
+    events = []
+    for d, ratio in zip(split_dates, ratios):
+        events.append((d.astype(datetime.date), 'split', float(ratio)))
+    for d, amount in zip(dates[dividends > 0], raw_dividends[dividends > 0]):
+        events.append((d.astype(datetime.date), 'dividend', round(float(amount), 8)))
+    return events
+
+
+def deadjust(df):
+    """auto_adjust=False 로 받은 (분할 조정된) 가격을 원본 가격으로 되돌린 DataFrame"""
+    out = df[PRICE_COLUMNS + ['Volume']].astype('d').copy()
+    if 'Stock Splits' not in df:
+        return out
+    dates = _as_days(df.index.tz_localize(None) if df.index.tz is not None else df.index)
+    splits = df['Stock Splits'].to_numpy(dtype='d')
+    has_split = splits > 0
+    factor = suffix_factors(dates[has_split], splits[has_split], dates)
+    out[PRICE_COLUMNS] = out[PRICE_COLUMNS].to_numpy() * factor[:, None]
+    out['Volume'] = out['Volume'].to_numpy() / factor
+    return out
+
+
+def format_raw_rows(df):
+    dates = df.index.strftime('%Y-%m-%d')
+    values = df[RAW_HEADER[1:]].to_numpy(dtype='d')
+    # yfinance 는 일부 행의 Volume 을 NaN 으로 준다 ('%d' 는 NaN 을 쓸 수 없음)
+    values[:, -1] = np.nan_to_num(values[:, -1])
+    return ['%s,%.6f,%.6f,%.6f,%.6f,%d' % ((d,) + tuple(v)) for d, v in zip(dates, values)]
+
+
+def sync_ticker(ticker, today=None):
+    """원본 데이터를 증분 업데이트하고 다운로드 구간에 들어온 이벤트를 이벤트 테이블에 합친다.
+    추가된 행 수 반환 (같은 티커 동시 요청은 한 곳만 다운로드)
+
+    원본 파일은 한 번 쓴 행을 고치지 않으므로 장 마감이 지난 거래일까지만 받는다
+    (today 가 더 늦어도 마지막 확정 거래일로 제한). 이미 그 날짜까지 있으면 네트워크 조회 없음.
+    """
+    closed = last_closed_session()
+    today = min(today, closed) if today else closed
+    os.makedirs(RAW_DIR, exist_ok=True)
+    with single_flight(raw_data_path(ticker)):
+        return _sync_ticker(ticker, today)
+
+
+def _sync_ticker(ticker, today):
+    import yfinance as yf
+
+    path = raw_data_path(ticker)
+    last_date = read_last_date(path) if os.path.exists(path) and os.path.getsize(path) > 0 else None
+    if last_date is not None and last_date >= today:
+        return 0
+
+    start = last_date + datetime.timedelta(days=1) if last_date else DEFAULT_START
+    # actions=True: 같은 응답에 Dividends / Stock Splits 컬럼이 함께 들어온다
+    df = yf.Ticker(ticker).history(start=start, end=today + datetime.timedelta(days=1),
+                                   auto_adjust=False, actions=True)
+    if df.empty:
+        return 0
+    days = df.index.strftime('%Y-%m-%d')
+    keep = days <= today.isoformat()
+    if last_date is not None:
+        keep &= days > last_date.isoformat()
+    df = df[keep]
+    if df.empty:
+        return 0
+
+    new_events = events_from_actions(df)
+    if new_events:
+        write_events(ticker, read_events(ticker) + new_events)
+    rows = format_raw_rows(deadjust(df))
+    append_rows(path, RAW_HEADER, rows)
+    return len(rows)
+
+
+def refresh_events(ticker):
+    """전체 이벤트 테이블만 다시 조회해 교체 (가격 이력은 다시 받지 않음). 바뀐 이벤트 수 반환"""
+    import yfinance as yf
+
+    os.makedirs(RAW_DIR, exist_ok=True)
+    # 이벤트 파일은 sync_ticker 도 고치므로 같은 잠금 안에서 읽고 교체
+    with single_flight(raw_data_path(ticker)):
+        events = events_from_actions(yf.Ticker(ticker).actions)
+        old = set(read_events(ticker))
+        write_events(ticker, events)
+    return len(old.symmetric_difference(events))
+
+
+def adjust(raw, events, dividends=True):
+    """원본 OHLCV DataFrame 에 이벤트 누적 계수를 적용한 수정주가 DataFrame"""
+    dates = _as_days(raw.index)
+    close = raw['Close'].to_numpy(dtype='d')
+
+    splits = [(d, v) for d, kind, v in events if kind == 'split']
+    split_dates = _as_days([d for d, _ in splits])
+    split_factor = suffix_factors(split_dates, np.array([v for _, v in splits], dtype='d'), dates)
+    price_factor = 1.0 / split_factor
+
+    if dividends:
+        divs = [(d, v) for d, kind, v in events if kind == 'dividend']
+        div_dates = _as_days([d for d, _ in divs])
+        amounts = np.array([v for _, v in divs], dtype='d')
+        # Yahoo 방식: 배당락 전날 종가 기준 (1 - 배당금 / 전일 종가) 를 이전 구간 전체에 곱함
+        prev = np.searchsorted(dates, div_dates, side='left') - 1
+        ok = prev >= 0
+        multipliers = 1.0 - amounts[ok] / close[prev[ok]]
+        price_factor = price_factor * suffix_factors(div_dates[ok], multipliers, dates)
+
+    out = raw.copy()
+    out[PRICE_COLUMNS] = raw[PRICE_COLUMNS].to_numpy(dtype='d') * price_factor[:, None]
+    out['Volume'] = raw['Volume'].to_numpy(dtype='d') * split_factor
+    return out
+
+
+def load_adjusted(ticker, fromdate=None, todate=None, dividends=True, sync=True):
+    """수정주가 일봉 DataFrame (yfinance history(auto_adjust=True) 와 같은 컬럼, todate 미포함)"""
+    import pandas as pd
+
+    if sync:
+        sync_ticker(ticker)
+    path = raw_data_path(ticker)
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=RAW_HEADER[1:])
+
+    raw = read_data_frame(path)
+    # 계수는 구간 밖(이후) 이벤트도 반영해야 하므로 전체 이력에 적용한 뒤 자른다
+    df = adjust(raw, read_events(ticker), dividends)
+    if fromdate is not None:
+        df = df[df.index >= pd.Timestamp(fromdate)]
+    if todate is not None:
+        df = df[df.index < pd.Timestamp(todate)]
+    return df
+
+
+if __name__ == "__main__":
+    import sys
+
+    tickers = sys.argv[1:] or ['ORCL']
+    for ticker in tickers:
+        added = sync_ticker(ticker)
+        changed = refresh_events(ticker)
+        print(f"💾 [{ticker}] 원본 {added}개 행 추가, 이벤트 변경 {changed}건")
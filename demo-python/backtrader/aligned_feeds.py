@@ -0,0 +1,265 @@
+import argparse
+import itertools
+import time
+import numpy as np
+import backtrader as bt
+
+from numpy_feed import NumpyData, columns_from_dataframe
+from synthetic_data import make_synthetic_ohlcv
+
+# ----------------------------------------------------------------------
+# 여러 종목 피드를 하나의 공통 세션 인덱스로 미리 정렬(align)
+# - 기본 Cerebro 는 매 바마다 모든 피드의 datetime 을 비교해 동기화한다 (피드 수에 비례)
+# - align_frames: 모든 피드를 공통 날짜 배열 하나에 맞추고, 빠진 날은 전일 종가로 채우거나(ffill)
+#   NaN 으로 두며 gap 라인(1.0)으로 표시한다
+# - AlignedCerebro: 정렬된 피드만 있으면 datetime 비교 없이 정수 인덱스로 모든 피드를 함께 전진
+#   · 아끼는 것은 바마다의 날짜 비교/되감기뿐이고, 피드별 advance(라인 전진 + tick 채우기)는 그대로라
+#     이득은 작다 (피드 20개 x 5천 봉: runonce, next 모드 모두 1.0~1.25배, 측정마다 편차 있음)
+#   · 결측일을 채운 바도 모든 피드가 함께 전진하므로 결측이 많으면 오히려 느려질 수 있다
+# ----------------------------------------------------------------------
+
+PRICE_LINES = ('open', 'high', 'low', 'close')
+_align_ids = itertools.count(1)
+
+
+def _as_columns(frame):
+    if isinstance(frame, dict):
+        return {k: np.asarray(v, dtype='d') for k, v in frame.items()}
+    return columns_from_dataframe(frame)
+
+
+def align_frames(frames, how='common', fill='ffill', sessions=None):
+    """{이름: DataFrame 또는 배열 dict} → 같은 날짜 배열을 공유하는 {이름: 배열 dict}
+
+    how:      'common' - 모든 피드에 데이터가 생긴 첫 날부터 (앞쪽 빈 구간 없음)
+              'union'  - 가장 이른 날부터 (데이터 시작 전 구간은 NaN + gap)
+    fill:     'ffill'  - 빠진 날은 전일 종가로 OHLC 를 채우고 거래량 0
+              'nan'    - 빠진 날은 NaN
+    sessions: 공통 세션 날짜(backtrader 숫자 날짜) 배열. 없으면 모든 피드 날짜의 합집합
+    """
+    columns = {name: _as_columns(frame) for name, frame in frames.items()}
+    if sessions is None:
+        sessions = np.unique(np.concatenate([c['datetime'] for c in columns.values()]))
+    sessions = np.asarray(sessions, dtype='d')
+    if how == 'common':
+        first = max(c['datetime'][0] for c in columns.values())
+        sessions = sessions[sessions >= first]
+
+    align_id = next(_align_ids)
+    aligned = {}
+    n = len(sessions)
+    for name, cols in columns.items():
+        dt = cols['datetime']
+        # 각 세션 날짜에 대해 "그 날짜 이하의 마지막 원본 바" 위치
+        pos = np.searchsorted(dt, sessions, side='right') - 1
+        valid = pos >= 0
+        exact = np.zeros(n, dtype=bool)
+        exact[valid] = dt[pos[valid]] == sessions[valid]
+        src = np.where(valid, pos, 0)
+
+        out = {'datetime': sessions.copy(), 'gap': (~exact).astype('d')}
+        for line, col in cols.items():
+            if line == 'datetime':
+                continue
+            if fill != 'ffill':
+                filled = np.nan
+            elif line in PRICE_LINES and 'close' in cols:
+                # 빠진 날: 시/고/저/종가 모두 직전 종가 (평평한 바)
+                filled = cols['close'][src]
+            elif line in ('volume', 'openinterest'):
+                filled = 0.0
+            else:
+                filled = col[src]
+            values = np.where(exact, col[src], filled)
+            out[line] = np.where(valid, values, np.nan)
+        out['align_id'] = align_id
+        aligned[name] = out
+    return aligned
+
+
+class AlignedNumpyData(NumpyData):
+    """align_frames 결과를 받는 피드. gap 라인: 원본에 없던(채워진) 바이면 1.0"""
+    lines = ('gap',)
+    params = (
+        ('align_id', None),   # 같은 align_frames 호출에서 나온 피드끼리 같은 값
+    )
+
+    def __init__(self):
+        dataname = self.p.dataname
+        if isinstance(dataname, dict) and 'align_id' in dataname:
+            self.p.align_id = dataname['align_id']
+            self.p.dataname = {k: v for k, v in dataname.items() if k != 'align_id'}
+        super(AlignedNumpyData, self).__init__()
+
+    def is_gap(self, ago=0):
+        return self.lines.gap[ago] > 0.0
+
+
+def add_aligned_feeds(cerebro, frames, **align_kwargs):
+    """frames 를 정렬해 cerebro 에 이름별로 추가하고 피드 목록 반환"""
+    feeds = []
+    for name, columns in align_frames(frames, **align_kwargs).items():
+        feed = AlignedNumpyData(dataname=columns)
+        cerebro.adddata(feed, name=name)
+        feeds.append(feed)
+    return feeds
+
+
+class AlignedCerebro(bt.Cerebro):
+    """모든 피드가 같은 align_frames 결과이면 datetime 동기화 없이 인덱스로 함께 전진하는 Cerebro.
+    조건이 맞지 않으면(다른 피드, resample/replay, 라이브, 날짜 필터 불일치) 기본 동작 사용"""
+
+    def _aligned(self):
+        datas = self.datas
+        if not datas or not all(isinstance(d, AlignedNumpyData) for d in datas):
+            return False
+        first = datas[0]
+        return all(
+            d.p.align_id is not None and d.p.align_id == first.p.align_id
+            and not d._filters and not d.islive()
+            and d.p.fromdate == first.p.fromdate and d.p.todate == first.p.todate
+            for d in datas)
+
+    def _runonce(self, runstrats):
+        if not self._aligned():
+            return super(AlignedCerebro, self)._runonce(runstrats)
+
+        for strat in runstrats:
+            strat._once()
+            strat.reset()
+
+        datas = self.datas
+        data0 = datas[0]
+        dtarray = data0.lines.datetime.array
+        for i in range(data0.buflen()):
+            for data in datas:
+                data.advance()
+            dt0 = dtarray[i]
+
+            self._check_timers(runstrats, dt0, cheat=True)
+            if self.p.cheat_on_open:
+                for strat in runstrats:
+                    strat._oncepost_open()
+                    if self._event_stop:
+                        return
+
+            self._brokernotify()
+            if self._event_stop:
+                return
+
+            self._check_timers(runstrats, dt0, cheat=False)
+            for strat in runstrats:
+                strat._oncepost(dt0)
+                if self._event_stop:
+                    return
+                self._next_writers(runstrats)
+
+    def _runnext(self, runstrats):
+        if not self._aligned():
+            return super(AlignedCerebro, self)._runnext(runstrats)
+
+        datas = self.datas
+        data0 = datas[0]
+        while True:
+            self._storenotify()
+            if self._event_stop:
+                return
+            self._datanotify()
+            if self._event_stop:
+                return
+
+            # 모든 피드가 같은 날짜 배열이므로 한꺼번에 다음 바로 이동 (비교/되감기 없음)
+            if not all([data.next(ticks=False) for data in datas]):
+                break
+            for data in datas:
+                data._tick_fill(force=True)
+            dt0 = data0.lines.datetime[0]
+
+            self._datanotify()
+            if self._event_stop:
+                return
+
+            self._check_timers(runstrats, dt0, cheat=True)
+            if self.p.cheat_on_open:
+                for strat in runstrats:
+                    strat._next_open()
+                    if self._event_stop:
+                        return
+
+            self._brokernotify()
+            if self._event_stop:
+                return
+
+            self._check_timers(runstrats, dt0, cheat=False)
+            for strat in runstrats:
+                strat._next()
+                if self._event_stop:
+                    return
+                self._next_writers(runstrats)
+
+        self._datanotify()
+        if self._event_stop:
+            return
+        self._storenotify()
+
+
+# ----------------------------------------------------------------------
+# 벤치마크: 결측일이 섞인 N 개 피드, 기본 Cerebro vs AlignedCerebro
+# ----------------------------------------------------------------------
+
+class SmaStrategy(bt.Strategy):
+    """피드마다 SMA 하나를 계산하는 벤치마크용 전략"""
+
+    def __init__(self):
+        self.smas = [bt.indicators.SMA(data.close, period=20) for data in self.datas]
+
+
+def synthetic_frames(n_feeds, bars, missing=0.02, seed=42):
+    """피드마다 일부 날짜(missing 비율)를 지운 합성 데이터"""
+    rng = np.random.default_rng(seed)
+    frames = {}
+    for k in range(n_feeds):
+        columns = make_synthetic_ohlcv(bars, seed=seed + k)
+        keep = rng.random(bars) >= missing
+        keep[0] = True
+        frames['SYN%02d' % k] = {name: col[keep] for name, col in columns.items()}
+    return frames
+
+
+def run_benchmark(n_feeds=20, bars=5000, runonce=True, repeat=3):
+    """엔진별 repeat 회 실행 중 가장 빠른 시간으로 비교 (한 번만 재면 편차가 이득보다 크다)"""
+    frames = synthetic_frames(n_feeds, bars)
+    results = {}
+    for label, cerebro_cls, aligned in (('default', bt.Cerebro, False),
+                                        ('aligned', AlignedCerebro, True)):
+        timings = []
+        for _ in range(repeat):
+            cerebro = cerebro_cls(stdstats=False, runonce=runonce, preload=True)
+            if aligned:
+                add_aligned_feeds(cerebro, frames, how='union')
+            else:
+                for name, columns in frames.items():
+                    cerebro.adddata(NumpyData(dataname=columns), name=name)
+            cerebro.addstrategy(SmaStrategy)
+            t0 = time.perf_counter()
+            cerebro.run()
+            timings.append(time.perf_counter() - t0)
+        results[label] = min(timings)
+
+    print("="*70)
+    print(f"    피드 {n_feeds}개 x {bars:,} bars (runonce={runonce}, {repeat}회 중 최소)")
+    for label, elapsed in results.items():
+        print(f"   {label:<8} {elapsed:8.2f}s")
+    print(f"   속도 {results['default'] / results['aligned']:.2f}x")
+    print("="*70)
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='정렬 피드 벤치마크')
+    parser.add_argument('--feeds', type=int, default=20)
+    parser.add_argument('--bars', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--next', action='store_true', help='runonce 대신 next 모드로 측정')
+    args = parser.parse_args()
+    run_benchmark(args.feeds, args.bars, runonce=not args.next, repeat=args.repeat)
@@ -0,0 +1,252 @@
+# backtest_daemon.py 파일
+# 상주(warm) 백테스트 데몬
+# - backtrader / pandas / yfinance import 와 데이터 로딩을 워커 프로세스마다 한 번만 수행하고 메모리에 유지
+# - 클라이언트는 localhost HTTP 로 전략 파라미터(job)를 보내고 결과(JSON)를 받는다
+# - 백테스트는 CPU 작업이므로 워커는 프로세스 풀 (스레드는 GIL 때문에 동시에 하나만 계산)
+# - 대기 작업 수를 제한(가득 차면 503), 동일 job 결과는 LRU 캐시로 즉시 응답
+#
+# 실행)   python backtest_daemon.py --port 8765 --workers 2
+# 요청)   curl -X POST localhost:8765/jobs -d '{"ticker": "SPY", "params": {"adx_threshold": 20}}'
+
+import argparse
+import datetime
+import itertools
+import json
+import queue
+import threading
+import time
+import urllib.request
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import turtle_strategy
+
+DEFAULT_FROM = '2024-01-01'
+DEFAULT_TO = '2025-11-04'
+FRAME_CACHE_SIZE = 32   # 워커 프로세스마다 메모리에 유지하는 DataFrame 수
+
+# 워커 프로세스 안의 (티커, 시작일, 종료일) -> DataFrame (LRU)
+# 워커는 한 번에 작업 하나만 실행하므로 잠금이 필요 없고,
+# 프로세스 간 동시 다운로드는 adjusted_cache 가 파일 잠금으로 한 번만 수행한다
+_FRAMES = OrderedDict()
+
+
+def _load_frame(ticker, fromdate, todate):
+    key = (ticker, fromdate, todate)
+    df = _FRAMES.get(key)
+    if df is None:
+        df = turtle_strategy.load_history(
+            ticker,
+            datetime.datetime.strptime(fromdate, '%Y-%m-%d'),
+            datetime.datetime.strptime(todate, '%Y-%m-%d'))
+        _FRAMES[key] = df
+        while len(_FRAMES) > FRAME_CACHE_SIZE:
+            _FRAMES.popitem(last=False)
+    else:
+        _FRAMES.move_to_end(key)
+    return df
+
+
+def _warm_worker():
+    # 무거운 import 를 첫 작업이 아니라 워커 시작 시점에 끝내 둔다
+    import backtrader  # noqa: F401
+    import pandas  # noqa: F401
+    import adjusted_cache  # noqa: F401
+
+
+def run_job(spec):
+    """(워커 프로세스) 백테스트 1건 실행 후 성과 지표 dict"""
+    df = _load_frame(spec['ticker'], spec['from'], spec['to'])
+    if df.empty:
+        raise ValueError('%s 데이터를 가져오지 못했습니다.' % spec['ticker'])
+    _, _, metrics = turtle_strategy.run_backtest(
+        df, spec['ticker'], cash=spec['cash'], commission=spec['commission'],
+        printlog=False, **spec['params'])
+    return metrics
+
+
+class Job(object):
+    """대기열에 들어가는 백테스트 작업 1건"""
+    _ids = itertools.count(1)
+
+    def __init__(self, spec):
+        self.id = next(self._ids)
+        self.spec = spec
+        self.key = json.dumps(spec, sort_keys=True)
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.submitted = time.perf_counter()
+
+
+class BacktestDaemon(object):
+    """작업 대기열과 워커 프로세스 풀을 관리하는 상주 백테스트 서비스"""
+
+    def __init__(self, workers=2, queue_size=32, result_cache_size=256):
+        self.pool = ProcessPoolExecutor(max_workers=workers, initializer=_warm_worker)
+        # 실행 중(workers) + 대기(queue_size) 를 넘으면 새 작업을 받지 않는다
+        self.capacity = workers + queue_size
+        self.pending = 0
+        self.results = OrderedDict()  # job key -> 결과 (LRU)
+        self.result_cache_size = result_cache_size
+        self._results_lock = threading.Lock()
+        self._by_id = OrderedDict()  # 최근 작업만 조회용으로 유지
+
+    def submit(self, spec):
+        """작업 등록. 같은 작업 결과가 캐시에 있으면 바로 완료 처리. 대기열이 가득 차면 queue.Full"""
+        job = Job(normalize_spec(spec))
+        with self._results_lock:
+            cached = self.results.get(job.key)
+            if cached is not None:
+                self.results.move_to_end(job.key)
+                job.result = dict(cached, cached=True)
+                job.done.set()
+            elif self.pending >= self.capacity:
+                raise queue.Full()
+            else:
+                self.pending += 1
+        if not job.done.is_set():
+            try:
+                future = self.pool.submit(run_job, job.spec)
+            except Exception:
+                with self._results_lock:
+                    self.pending -= 1
+                raise
+            future.add_done_callback(lambda f: self._finish(job, f))
+        # 대기열에 들어간(또는 캐시로 끝난) 작업만 조회 대상으로 등록
+        with self._results_lock:
+            self._by_id[job.id] = job
+            while len(self._by_id) > self.result_cache_size * 4:
+                self._by_id.popitem(last=False)
+        return job
+
+    def get(self, job_id):
+        with self._results_lock:
+            return self._by_id.get(job_id)
+
+    def _finish(self, job, future):
+        try:
+            job.result = future.result()
+            with self._results_lock:
+                self.results[job.key] = job.result
+                while len(self.results) > self.result_cache_size:
+                    self.results.popitem(last=False)
+        except Exception as e:
+            job.error = str(e)
+        finally:
+            with self._results_lock:
+                self.pending -= 1
+            job.result = dict(job.result or {}, elapsed_ms=(time.perf_counter() - job.submitted) * 1000)
+            job.done.set()
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+def normalize_spec(spec):
+    """요청 JSON에 기본값을 채워 캐시 키가 일정하도록 정규화 (형식이 잘못되면 ValueError)"""
+    if not isinstance(spec, dict):
+        raise ValueError('요청 본문은 JSON 객체여야 합니다.')
+    if not isinstance(spec.get('params', {}), dict):
+        raise ValueError('params 는 JSON 객체여야 합니다.')
+    return {
+        'ticker': str(spec.get('ticker', 'SPY')).upper(),
+        'from': spec.get('from', DEFAULT_FROM),
+        'to': spec.get('to', DEFAULT_TO),
+        'cash': float(spec.get('cash', 100000.0)),
+        'commission': float(spec.get('commission', 0.001)),
+        'params': spec.get('params', {}),
+    }
+
+
+def job_payload(job):
+    payload = {'id': job.id, 'done': job.done.is_set(), 'spec': job.spec}
+    if job.done.is_set():
+        payload['result'] = job.result
+        payload['error'] = job.error
+    return payload
+
+
+def make_handler(daemon):
+    class Handler(BaseHTTPRequestHandler):
+
+        def _send(self, status, payload):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            if url.path != '/jobs':
+                return self._send(404, {'error': 'not found'})
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                spec = json.loads(self.rfile.read(length) or b'{}')
+                job = daemon.submit(spec)
+            except queue.Full:
+                return self._send(503, {'error': 'job queue is full'})
+            except (TypeError, ValueError) as e:
+                return self._send(400, {'error': str(e)})
+
+            # ?wait=0 이면 작업 번호만 즉시 반환, 기본은 완료까지 대기
+            if parse_qs(url.query).get('wait') == ['0']:
+                return self._send(202, job_payload(job))
+            job.done.wait()
+            self._send(200, job_payload(job))
+
+        def do_GET(self):
+            parts = self.path.strip('/').split('/')
+            if len(parts) == 2 and parts[0] == 'jobs' and parts[1].isdigit():
+                job = daemon.get(int(parts[1]))
+                if job is None:
+                    return self._send(404, {'error': 'unknown job'})
+                return self._send(200, job_payload(job))
+            if parts == ['health']:
+                return self._send(200, {'queued': daemon.pending,
+                                        'cached_results': len(daemon.results)})
+            self._send(404, {'error': 'not found'})
+
+        def log_message(self, format, *args):
+            # 요청마다 stderr 로그를 남기지 않음
+            pass
+
+    return Handler
+
+
+def serve(host='127.0.0.1', port=8765, workers=2, queue_size=32):
+    daemon = BacktestDaemon(workers=workers, queue_size=queue_size)
+    server = ThreadingHTTPServer((host, port), make_handler(daemon))
+    print(f"🚀 백테스트 데몬 시작: http://{host}:{port} (workers={workers}, queue={queue_size})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("데몬 종료")
+    finally:
+        server.server_close()
+        daemon.shutdown()
+
+
+def submit(spec, host='127.0.0.1', port=8765, timeout=600):
+    """클라이언트 헬퍼: 작업을 보내고 완료 결과(dict)를 받는다"""
+    request = urllib.request.Request(
+        'http://%s:%d/jobs' % (host, port),
+        data=json.dumps(spec).encode('utf-8'),
+        headers={'Content-Type': 'application/json'},
+        method='POST')
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return json.loads(response.read())
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='상주 백테스트 데몬')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--queue-size', type=int, default=32)
+    args = parser.parse_args()
+    serve(args.host, args.port, args.workers, args.queue_size)
@@ -0,0 +1,228 @@
+# benchmark_suite.py 파일
+# 백테스트 엔진 벤치마크 모음
+# - 튜토리얼 전략(4~8)과 TurtleStrategy 를 시드 고정 합성 데이터(1만/10만/100만 봉)로 실행
+# - 측정: bars/sec, 시작 시간(import + Cerebro 구성), 최대 메모리(RSS)
+# - 케이스마다 새 프로세스에서 실행 (import 캐시/메모리 최대치가 다른 케이스에 섞이지 않도록)
+# - 저장된 JSON 기준값(baseline)과 비교: 허용 오차를 넘는 성능 저하 + 거래 수/최종 자산 불일치 검출
+#   · 매매하는 전략이 거래 0건이면 동등성 비교가 의미 없으므로 실패로 본다
+# - 실행에 실패한 케이스는 오류를 출력하고 건너뛴다 (기준값 비교에서는 실패로 집계)
+#
+# 실행)          python benchmark_suite.py
+# 기준값 갱신)   python benchmark_suite.py --update-baseline
+# 일부만)        python benchmark_suite.py --sizes 10000 --strategies turtle,8_indicators
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+MODPATH = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(MODPATH, 'benchmark_baseline.json')
+DEFAULT_SIZES = (10000, 100000, 1000000)
+
+# (이름, 파일 이름(None 이면 TurtleStrategy), 초기 현금, 수수료, 고정 수량, 전략 파라미터)
+BENCH_STRATEGIES = [
+    ('4_strategy', '4_strategy.py', 100000.0, 0.0, None, {}),
+    ('5_buy', '5_buy_strategy.py', 100000.0, 0.0, None, {}),
+    ('6_sell', '6_sell_strategy.py', 100000.0, 0.0, None, {}),
+    ('7_commission', '7.sell_strategy_commission.py', 100000.0, 0.001, None, {}),
+    ('8_indicators', '8.indicators.py', 1000.0, 0.0, 10, {}),
+    ('turtle', None, 100000.0, 0.001, None, {'printlog': False}),
+]
+
+# 로그만 출력하고 매매하지 않는 전략 (그 외 전략은 거래가 있어야 동등성 확인이 의미 있음)
+NO_TRADE_STRATEGIES = {'4_strategy'}
+
+# 기준값 대비 허용 오차 (비율)
+TOLERANCES = {
+    'bars_per_sec': 0.15,   # 15% 이상 느려지면 실패
+    'startup_sec': 0.25,    # 25% 이상 시작이 느려지면 실패
+    'peak_rss_mb': 0.15,    # 15% 이상 메모리가 늘면 실패
+}
+
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return (peak if sys.platform == 'darwin' else peak * 1024) / 1024.0 / 1024.0
+
+
+def run_case(label, bars, seed=42):
+    """(자식 프로세스) 전략 1개 x 데이터 크기 1개 측정 결과 dict"""
+    t0 = time.perf_counter()
+    import backtrader as bt
+    from lean_mode import quiet_strategy
+    from numpy_feed import NumpyData
+    from synthetic_data import make_synthetic_ohlcv
+
+    _, filename, cash, commission, stake, params = next(
+        row for row in BENCH_STRATEGIES if row[0] == label)
+    if filename is None:
+        from turtle_strategy import TurtleStrategy as strategy_cls
+    else:
+        from multi_strategy_runner import load_strategy_class
+        strategy_cls = load_strategy_class(filename)
+    imported = time.perf_counter()
+
+    # 데이터 생성은 전략과 무관하므로 시작 시간에서 제외
+    columns = make_synthetic_ohlcv(bars, seed=seed)
+    t1 = time.perf_counter()
+    cerebro = bt.Cerebro(stdstats=False)
+    cerebro.adddata(NumpyData(dataname=columns))
+    cerebro.addstrategy(quiet_strategy(strategy_cls), **params)
+    cerebro.addanalyzer(bt.analyzers.TradeAnalyzer, _name='trades')
+    cerebro.broker.setcash(cash)
+    cerebro.broker.setcommission(commission=commission)
+    if stake is not None:
+        cerebro.addsizer(bt.sizers.FixedSize, stake=stake)
+    built = time.perf_counter()
+
+    strat = cerebro.run()[0]
+    elapsed = time.perf_counter() - built
+
+    trades = strat.analyzers.trades.get_analysis()
+    total = trades.get('total', {})
+    return {
+        'strategy': label,
+        'bars': bars,
+        'bars_per_sec': bars / elapsed if elapsed else float('inf'),
+        'run_sec': elapsed,
+        'startup_sec': (imported - t0) + (built - t1),
+        'peak_rss_mb': _peak_rss_mb(),
+        # 동등성(parity) 확인용: 성능 변경 전후 결과가 같아야 함
+        'trades': total.get('total', 0),
+        'closed_trades': total.get('closed', 0),
+        'final_value': round(cerebro.broker.getvalue(), 6),
+    }
+
+
+def run_suite(labels, sizes, seed=42):
+    """케이스마다 새 프로세스(spawn)에서 순서대로 실행 (동시 실행하면 측정이 서로 간섭)
+
+    (결과 목록, 실패 목록 [(케이스, 오류 메시지), ...]) 반환
+    """
+    context = multiprocessing.get_context('spawn')
+    results, failures = [], []
+    for bars in sizes:
+        for label in labels:
+            key = '%s@%d' % (label, bars)
+            try:
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                    result = pool.submit(run_case, label, bars, seed).result()
+            except Exception as e:
+                failures.append((key, '%s: %s' % (type(e).__name__, e)))
+                print(f"   {label:<14} {bars:>9,} bars  ⚠️  실행 실패, 건너뜀 ({failures[-1][1]})")
+                continue
+            results.append(result)
+            print(f"   {label:<14} {bars:>9,} bars  {result['bars_per_sec']:>12,.0f} bars/sec  "
+                  f"startup {result['startup_sec']:6.2f}s  peak {result['peak_rss_mb'] or 0:8.1f} MB  "
+                  f"trades {result['trades']:>5}  final {result['final_value']:.2f}")
+    return results, failures
+
+
+def idle_cases(results):
+    """매매해야 하는 전략인데 거래가 0건인 케이스 [(케이스, 설명), ...]"""
+    return [(case_key(r), '거래 0건: 동등성 확인이 의미 없음') for r in results
+            if r['strategy'] not in NO_TRADE_STRATEGIES and r['trades'] == 0]
+
+
+def case_key(result):
+    return '%s@%d' % (result['strategy'], result['bars'])
+
+
+def load_baseline(path=BASELINE_PATH):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_baseline(results, seed, path=BASELINE_PATH):
+    payload = {
+        'python': sys.version.split()[0],
+        'platform': sys.platform,
+        'seed': seed,
+        'cases': {case_key(r): r for r in results},
+    }
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, indent=2)
+    os.replace(tmp, path)
+
+
+def compare(results, baseline, tolerances=TOLERANCES):
+    """기준값 대비 문제 목록 [(케이스, 설명), ...]. 동등성 불일치는 항상 문제로 보고"""
+    problems = []
+    cases = baseline.get('cases', {})
+    for result in results:
+        key = case_key(result)
+        base = cases.get(key)
+        if base is None:
+            continue
+
+        for field in ('trades', 'closed_trades'):
+            if result[field] != base[field]:
+                problems.append((key, '%s 불일치: %s → %s' % (field, base[field], result[field])))
+        if abs(result['final_value'] - base['final_value']) > 1e-6 * max(1.0, abs(base['final_value'])):
+            problems.append((key, '최종 자산 불일치: %.6f → %.6f' % (base['final_value'], result['final_value'])))
+
+        # 속도는 낮아지면, 시작 시간/메모리는 높아지면 저하
+        if result['bars_per_sec'] < base['bars_per_sec'] * (1.0 - tolerances['bars_per_sec']):
+            problems.append((key, 'bars/sec 저하: %.0f → %.0f' % (base['bars_per_sec'], result['bars_per_sec'])))
+        for field in ('startup_sec', 'peak_rss_mb'):
+            if result[field] is None or base.get(field) is None:
+                continue
+            if result[field] > base[field] * (1.0 + tolerances[field]):
+                problems.append((key, '%s 증가: %.2f → %.2f' % (field, base[field], result[field])))
+    return problems
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='백테스트 엔진 벤치마크 (기준값 비교)')
+    parser.add_argument('--sizes', default=','.join(str(s) for s in DEFAULT_SIZES))
+    parser.add_argument('--strategies', default=','.join(row[0] for row in BENCH_STRATEGIES))
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--update-baseline', action='store_true', help='이번 결과를 기준값으로 저장')
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(',')]
+    labels = args.strategies.split(',')
+    print("="*70)
+    print(f"    🏁 백테스트 벤치마크: {', '.join(labels)}")
+    print("="*70)
+    results, failures = run_suite(labels, sizes, args.seed)
+    print("="*70)
+
+    if args.update_baseline:
+        idle = idle_cases(results)
+        for key, message in failures + idle:
+            print(f"❌ {key}: {message}")
+        if failures or idle:
+            print("기준값을 저장하지 않았습니다.")
+            sys.exit(1)
+        save_baseline(results, args.seed, args.baseline)
+        print(f"💾 기준값 저장: {args.baseline}")
+        sys.exit(0)
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        print(f"⚠️  기준값 파일이 없습니다: {args.baseline} (--update-baseline 으로 생성)")
+        sys.exit(0)
+    if baseline.get('seed') != args.seed:
+        print(f"⚠️  기준값 시드({baseline.get('seed')})와 다른 시드로 실행했습니다. 동등성 비교가 무의미합니다.")
+
+    problems = failures + idle_cases(results) + compare(results, baseline)
+    for key, message in problems:
+        print(f"❌ {key}: {message}")
+    if not problems:
+        print("✅ 기준값 대비 성능 저하/결과 불일치 없음")
+    print("="*70)
+    sys.exit(1 if problems else 0)
@@ -0,0 +1,303 @@
+import argparse
+import json
+import os
+import numpy as np
+import backtrader as bt
+from backtrader.position import Position
+from backtrader.trade import Trade
+
+from numpy_feed import columns_from_dataframe
+from streaming_analyzers import collect_metrics
+from turtle_strategy import TurtleStrategy, build_cerebro
+
+# ----------------------------------------------------------------------
+# 백테스트 상태 체크포인트 / 이어서 실행
+# - 실행이 끝날 때(stop) 엔진 상태를 JSON 으로 저장
+#   · 전략 변수 (전략 클래스의 checkpoint_attrs), 진행 중인 주문
+#   · 모든 지표(하위 지표 포함) 라인의 마지막 tail 개 값 (tail = 전략 최소 기간)
+#   · 브로커 현금, 포지션, 열린 거래(Trade)
+# - 이어서 실행할 때는 저장된 tail 구간 + 새 바만 피드로 넣는다
+#   · tail 구간(워밍업)에서는 매매하지 않고 지표 값을 저장된 값으로 덮어씀
+#     → EMA/ADX 같은 재귀 지표도 전체 재실행과 같은 값에서 이어서 계산 (비트 단위 동일)
+#   · 브로커(현금/포지션/거래)는 시작 시, 전략 변수와 주문은 워밍업 마지막 바에서 복원
+# - 비용: O(tail + 새 바), 전체 재실행과 비교하려면 둘 다 next 모드(runonce=False)로 실행
+# ----------------------------------------------------------------------
+
+CHECKPOINT_VERSION = 1
+
+
+def indicator_buffers(strategy):
+    """전략의 모든 지표(하위 지표, 라인 연산 포함) 라인 버퍼를 생성 순서대로 반환"""
+    buffers = []
+
+    def walk(owner):
+        getindicators = getattr(owner, 'getindicators', None)
+        if getindicators is None:
+            return
+        for indicator in getindicators():
+            if hasattr(indicator.lines, 'getlinealiases'):
+                buffers.extend(indicator.lines[i] for i in range(indicator.lines.fullsize()))
+            else:
+                # data.high - data.low 같은 라인 연산은 자기 자신이 버퍼
+                buffers.extend(indicator.lines)
+            walk(indicator)
+
+    walk(strategy)
+    return buffers
+
+
+def _order_state(order):
+    remaining = order.executed.remsize if order.status == order.Partial else order.created.size
+    return {
+        'buy': order.isbuy(),
+        'size': abs(remaining),
+        'exectype': order.exectype,
+        # 트레일링 스탑은 브로커가 조정한 현재 스탑 가격(created.price)에서 이어감
+        'price': order.created.price if order.exectype in (order.StopTrail, order.StopTrailLimit) else order.price,
+        'plimit': order.pricelimit,
+        'trailamount': order.trailamount,
+        'trailpercent': order.trailpercent,
+        'valid': order.valid,
+        'tradeid': order.tradeid,
+    }
+
+
+def _trade_state(trade):
+    return {
+        'tradeid': trade.tradeid,
+        'size': trade.size,
+        'price': trade.price,
+        'value': trade.value,
+        'commission': trade.commission,
+        'pnl': trade.pnl,
+        'pnlcomm': trade.pnlcomm,
+        'long': trade.long,
+        'dtopen': trade.dtopen,
+        'bars_open': len(trade.data) - trade.baropen,
+    }
+
+
+def snapshot(strategy, tail=None, ago=0):
+    """실행이 끝난 전략에서 체크포인트 dict 생성 (데이터 피드 1개 기준)
+
+    ago > 0 이면 ago 바 전 시점의 체크포인트 (그 뒤로 체결/주문/전략 변수 변화가 없을 때만 유효)
+    """
+    data = strategy.datas[0]
+    broker = strategy.broker
+    tail = min(tail or strategy._minperiod + 1, len(data) - ago)
+    agos = range(tail - 1 + ago, ago - 1, -1)   # 오래된 값부터
+
+    orders = [o for o in broker.orders if o.alive() and o.data is data]
+    attrs = {}
+    order_attrs = {}
+    for name in getattr(strategy, 'checkpoint_attrs', ()):
+        value = getattr(strategy, name, None)
+        if isinstance(value, bt.Order):
+            order_attrs[name] = orders.index(value) if value in orders else None
+        else:
+            attrs[name] = value
+
+    trades = [ts[-1] for ts in strategy._trades[data].values() if ts and ts[-1].isopen]
+    position = broker.getposition(data)
+    return {
+        'version': CHECKPOINT_VERSION,
+        'strategy': strategy.__class__.__name__,
+        'params': dict(strategy.p._getkwargs()),
+        'tail': tail,
+        'tail_datetime': [data.datetime[-ago] for ago in agos],
+        'tail_close': [data.close[-ago] for ago in agos],
+        'indicators': [[buf[-ago] for ago in agos] for buf in indicator_buffers(strategy)],
+        'attrs': attrs,
+        'order_attrs': order_attrs,
+        'orders': [_order_state(o) for o in orders],
+        'cash': broker.getcash(),
+        'position': {'size': position.size, 'price': position.price},
+        'trades': [_trade_state(t) for t in trades],
+    }
+
+
+def save_checkpoint(state, path):
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+
+def load_checkpoint(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        state = json.load(f)
+    if state.get('version') != CHECKPOINT_VERSION:
+        raise ValueError('지원하지 않는 체크포인트 버전: %s' % state.get('version'))
+    return state
+
+
+def checkpointed(strategy_cls, save_path=None, state=None):
+    """stop() 에서 체크포인트를 저장하고(save_path), state 가 있으면 그 상태에서 이어서 실행하는 서브클래스"""
+
+    class CheckpointedStrategy(strategy_cls):
+
+        def start(self):
+            super(CheckpointedStrategy, self).start()
+            self._resume = state
+            self.checkpoint = None
+            if state is not None:
+                # 워밍업 구간의 평가금액도 실제 계좌 기준이 되도록 브로커는 시작할 때 복원
+                self._restore_broker(state)
+
+        def _warmup(self):
+            """워밍업(tail) 구간이면 지표 값을 덮어쓰고 True 반환"""
+            if self._resume is None:
+                return False
+            k = len(self) - 1
+            saved = self._resume['indicators']
+            buffers = indicator_buffers(self)
+            if len(buffers) != len(saved):
+                raise ValueError('체크포인트의 지표 구성이 현재 전략과 다릅니다.')
+            for buf, values in zip(buffers, saved):
+                buf[0] = values[k]
+            if k == self._resume['tail'] - 1:
+                self._restore_strategy(self._resume)
+                self._resume = None
+            return True
+
+        def _restore_broker(self, state):
+            data = self.datas[0]
+            broker = self.broker
+            broker.cash = state['cash']
+            broker.positions[data] = Position(size=state['position']['size'],
+                                              price=state['position']['price'])
+            for t in state['trades']:
+                trade = Trade(data=data, tradeid=t['tradeid'], size=t['size'], price=t['price'],
+                              value=t['value'], commission=t['commission'])
+                trade.pnl, trade.pnlcomm, trade.long = t['pnl'], t['pnlcomm'], t['long']
+                trade.dtopen = t['dtopen']
+                # 원래 실행의 마지막 바 = 워밍업 마지막 바(len == tail)
+                trade.baropen = state['tail'] - t['bars_open']
+                trade.status, trade.isopen = Trade.Open, True
+                self._trades[data][t['tradeid']].append(trade)
+
+        def _restore_strategy(self, state):
+            for name, value in state['attrs'].items():
+                setattr(self, name, value)
+
+            # 마지막 바에서 만든(아직 체결 전) 주문을 같은 조건으로 다시 제출 → 다음 바에서 체결
+            orders = []
+            for o in state['orders']:
+                submit = self.buy if o['buy'] else self.sell
+                order = submit(size=o['size'], price=o['price'], plimit=o['plimit'],
+                               exectype=o['exectype'], valid=o['valid'], tradeid=o['tradeid'],
+                               trailamount=o['trailamount'], trailpercent=o['trailpercent'])
+                if o['exectype'] in (bt.Order.StopTrail, bt.Order.StopTrailLimit):
+                    # 주문 생성 시 price 에서 트레일 폭을 빼므로 저장된 스탑 가격으로 되돌린다
+                    order.created.price = o['price']
+                orders.append(order)
+            for name, index in state['order_attrs'].items():
+                setattr(self, name, orders[index] if index is not None else None)
+
+        def prenext(self):
+            if not self._warmup():
+                super(CheckpointedStrategy, self).prenext()
+
+        def next(self):
+            if not self._warmup():
+                super(CheckpointedStrategy, self).next()
+
+        def stop(self):
+            super(CheckpointedStrategy, self).stop()
+            self.checkpoint = snapshot(self)
+            if save_path:
+                save_checkpoint(self.checkpoint, save_path)
+
+    CheckpointedStrategy.__name__ = strategy_cls.__name__
+    return CheckpointedStrategy
+
+
+def resume_columns(columns, state):
+    """전체 데이터 배열에서 체크포인트 tail 구간 + 새 바만 잘라낸다"""
+    dt = columns['datetime']
+    tail_dt = np.asarray(state['tail_datetime'])
+    start = int(np.searchsorted(dt, tail_dt[0], side='left'))
+    stop = start + len(tail_dt)
+    if stop > len(dt) or not np.array_equal(dt[start:stop], tail_dt):
+        raise ValueError('데이터에 체크포인트 구간이 없습니다. 전체 재실행이 필요합니다.')
+    if not np.array_equal(columns['close'][start:stop], np.asarray(state['tail_close'])):
+        raise ValueError('체크포인트 이후 과거 데이터가 수정되었습니다. 전체 재실행이 필요합니다.')
+    return {name: col[start:] for name, col in columns.items()}
+
+
+def run_with_checkpoint(df, ticker, path, cash=100000.0, commission=0.001,
+                        strategy=TurtleStrategy, **params):
+    """체크포인트가 있으면 새 바만 이어서, 없으면 전체를 실행한 뒤 체크포인트 저장.
+    (cerebro, 전략 인스턴스, 성과 지표 dict, 이어서 실행한 바 수 또는 None) 반환
+
+    성과 지표(수익률/샤프 등)는 이번 실행 구간 기준이다.
+    """
+    columns = df if isinstance(df, dict) else columns_from_dataframe(df)
+    state = load_checkpoint(path) if os.path.exists(path) else None
+    if state is not None:
+        if state['strategy'] != strategy.__name__:
+            raise ValueError('다른 전략의 체크포인트입니다: %s' % state['strategy'])
+        saved_params = dict(state['params'], **params)
+        if saved_params != state['params']:
+            raise ValueError('체크포인트와 전략 파라미터가 다릅니다.')
+        columns = resume_columns(columns, state)
+        params = state['params']
+
+    cerebro = build_cerebro(columns, ticker, cash, commission,
+                            strategy=checkpointed(strategy, path, state), **params)
+    # 체크포인트 실행은 항상 next 모드 (이어서 실행한 결과와 비트 단위로 같도록)
+    strat = cerebro.run(runonce=False)[0]
+    metrics = collect_metrics(strat)
+    metrics['final_value'] = cerebro.broker.getvalue()
+    resumed = len(columns['datetime']) - state['tail'] if state is not None else None
+    return cerebro, strat, metrics, resumed
+
+
+def verify_resume(df, split, ticker='TEST', cash=100000.0, commission=0.001,
+                  strategy=TurtleStrategy, **params):
+    """앞 split 개 바로 체크포인트 → 나머지 이어서 실행한 결과가 전체 재실행과 같은지 확인"""
+    import tempfile
+
+    columns = df if isinstance(df, dict) else columns_from_dataframe(df)
+    head = {name: col[:split] for name, col in columns.items()}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'state.json')
+        run_with_checkpoint(head, ticker, path, cash, commission, strategy, **params)
+        resumed = run_with_checkpoint(columns, ticker, path, cash, commission, strategy, **params)[1]
+        full = run_with_checkpoint(columns, ticker, os.path.join(tmp, 'full.json'),
+                                   cash, commission, strategy, **params)[1]
+
+    a, b = resumed.checkpoint, full.checkpoint
+    keys = ('cash', 'position', 'attrs', 'orders', 'indicators')
+    mismatched = [key for key in keys if a[key] != b[key]]
+    if resumed.broker.getvalue() != full.broker.getvalue():
+        mismatched.append('value')
+    return not mismatched, mismatched
+
+
+if __name__ == '__main__':
+    import pandas as pd
+    from turtle_strategy import update_orcl_data_file
+
+    parser = argparse.ArgumentParser(description='TurtleStrategy 체크포인트 이어서 실행')
+    parser.add_argument('--state', default=os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                        'turtle_orcl.checkpoint.json'))
+    parser.add_argument('--no-update', action='store_true', help='데이터 파일 업데이트 생략')
+    parser.add_argument('--verify', type=int, default=None, metavar='SPLIT',
+                        help='SPLIT 번째 바에서 끊어 이어서 실행한 결과가 전체 재실행과 같은지 확인')
+    args = parser.parse_args()
+
+    datapath = update_orcl_data_file() if not args.no_update else os.path.normpath(os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), '../datas/yfinance/orcl-1995-2014.txt'))
+    df = pd.read_csv(datapath, index_col='Date', parse_dates=True)
+
+    if args.verify is not None:
+        ok, mismatched = verify_resume(df, args.verify, 'ORCL', printlog=False)
+        print('✅ 전체 재실행과 동일' if ok else '❌ 불일치: %s' % ', '.join(mismatched))
+    else:
+        _, strat, metrics, resumed = run_with_checkpoint(df, 'ORCL', args.state, printlog=False)
+        print("="*70)
+        print('이어서 실행: %d 바' % resumed if resumed is not None else '전체 실행 (체크포인트 생성)')
+        print('Final Portfolio Value: %.2f' % metrics['final_value'])
+        print(f"체크포인트 저장: {args.state}")
+        print("="*70)
@@ -0,0 +1,429 @@
+import argparse
+import itertools
+import math
+import os
+import time
+import numpy as np
+import backtrader as bt
+
+from checkpoint import checkpointed, resume_columns, snapshot
+from numpy_feed import columns_from_dataframe
+from turtle_strategy import TurtleStrategy, build_cerebro
+
+# ----------------------------------------------------------------------
+# 거래 비용 민감도: 한 번 기록하고 비용 그리드 전체를 벡터로 재평가
+# - 무비용(수수료 0, 슬리피지 0)으로 한 번 실행하며 체결 흐름(바, 수량, 시가 체결가)과
+#   바별 평가금액, 포지션 사이즈 계산 로그를 기록
+# - 비용 모델 (그리드의 모든 조합):
+#   · commission: 체결 금액 대비 비율 (setcommission 과 같음)
+#   · slippage:   체결가 대비 비율
+#   · spread:     호가 스프레드 비율 (매수/매도 각각 절반씩 불리하게 체결)
+# - 체결 흐름이 같다면 포지션 경로도 같으므로 비용 차이만큼 현금/평가금액을 빼면 된다 (G x 체결 수 행렬)
+# - 고정 수량 전략 (기본: 7.sell_strategy_commission.py): 종가만 보고 결정하므로 비용과 무관하게
+#   체결 흐름이 같다 → 벡터 재평가가 정확하고, 현금 부족으로 거절될 체결이 생기는 점만 처음부터 재실행
+#   (ORCL 36개 조합: 0.9s, 모든 조합 전체 재실행 verify 29.9s, 최대 상대 오차 6e-15)
+# - TurtleStrategy 는 평가금액으로 수량을 정하고 체결가로 손절/피라미딩 기준을 정하므로
+#   비용이 바뀌면 경로가 달라질 수 있다 → 그리드 점마다 처음으로 달라지는 구간을 찾아
+#   그 직전의 무포지션 시점 체크포인트(checkpoint.py)부터만 다시 실행
+# - 한계: TurtleStrategy 의 수량은 floor(평가금액 x 리스크 / 손절 거리) 이고 피라미딩 손절 거리는
+#   진입 체결가를 따라가므로, 0 이 아닌 비용이면 첫 구간의 피라미딩 수량부터 거의 항상 달라진다
+#   → 무비용 점을 뺀 거의 모든 그리드 점이 첫 구간부터 재실행되고, 기록 실행이 무비용 점의 실행을
+#     대신하므로 전체 시간은 verify 와 같다 (ORCL 12개 조합: 11개 재실행, 21.9s vs 21.6s)
+#   결과는 재실행으로 보정하므로 항상 정확하다
+#
+# 사용 예)
+#   python cost_replay.py --commission 0,0.0005,0.001,0.002 --slippage 0,0.0005,0.001 --spread 0,0.0002
+#   python cost_replay.py --strategy turtle --commission 0,0.001,0.002 --slippage 0,0.001 --spread 0,0.0005 --verify
+# ----------------------------------------------------------------------
+
+DEFAULT_GRID = {
+    'commission': (0.0, 0.0005, 0.001, 0.002),
+    'slippage': (0.0, 0.0005, 0.001),
+    'spread': (0.0, 0.0002, 0.0005),
+}
+
+
+def cost_grid(commission, slippage, spread):
+    """비용 조합 배열 dict (그리드 점 G 개)"""
+    rows = np.array(list(itertools.product(commission, slippage, spread)), dtype='d').reshape(-1, 3)
+    return {'commission': rows[:, 0], 'slippage': rows[:, 1], 'spread': rows[:, 2]}
+
+
+def price_shift(grid):
+    """그리드 점별 체결가 불리 비율 (슬리피지 + 스프레드 절반)"""
+    return grid['slippage'] + grid['spread'] / 2.0
+
+
+def apply_costs(cerebro, commission, slippage, spread):
+    """브로커에 같은 비용 모델 설정 (재실행용). 시가 체결에도 슬리피지를 적용하고 고가/저가로 자르지 않는다"""
+    cerebro.broker.setcommission(commission=commission)
+    cerebro.broker.set_slippage_perc(slippage + spread / 2.0, slip_open=True, slip_limit=True,
+                                     slip_match=True, slip_out=True)
+
+
+class FillRecorder(bt.Analyzer):
+    """체결 흐름과 바별 평가금액 기록"""
+
+    def start(self):
+        self.fills = []    # (바, 부호 있는 수량, 체결가, 수수료, 그 바의 시가, 체결 후 현금)
+        self.values = []
+
+    def notify_order(self, order):
+        if order.status == order.Completed:
+            self.fills.append((len(self.strategy), order.executed.size, order.executed.price,
+                               order.executed.comm, order.data.open[0], self.strategy.broker.getcash()))
+
+    def next(self):
+        self.values.append(self.strategy.broker.getvalue())
+
+    def get_analysis(self):
+        return {'fills': self.fills, 'values': self.values}
+
+
+class RecordingTurtle(TurtleStrategy):
+    """비용에 따라 달라질 수 있는 결정의 입력을 함께 기록하는 TurtleStrategy
+
+    - sizing: 포지션 사이즈 계산마다 (바, 종류, 평가금액, 현금, 가격, 손절가, 수량, 구간)
+    - segments: 진입 ~ 청산 구간마다 진입 체결가, 초기 손절, 스탑/피라미딩 여유(headroom),
+      재실행 시작점(직전 무포지션 시점 체크포인트 번호)
+    """
+
+    def __init__(self):
+        super(RecordingTurtle, self).__init__()
+        self.sizing = []
+        self.segments = []
+        self.restarts = []        # (바, 체크포인트)
+        self._last_fill_bar = 0
+        self._lpp_from_fill = False
+
+    def _segment(self):
+        return self.segments[-1] if self.segments else None
+
+    def notify_order(self, order):
+        first_entry = order.status == order.Completed and order.isbuy() and self.units == 0
+        super(RecordingTurtle, self).notify_order(order)
+        if order.status == order.Completed:
+            self._last_fill_bar = len(self)
+        if first_entry:
+            segment = self._segment()
+            segment['entry_fill'] = self.entry_price
+            segment['initial_stop'] = self.initial_stop
+            # ATR 가 없으면 진입가의 95% 손절 → 체결가에 비례
+            segment['pct_stop'] = not self.atr[0] > 0
+            # 첫 피라미딩 기준가는 진입 체결가
+            self._lpp_from_fill = True
+
+    def calculate_position_size(self, entry_price, stop_price):
+        size = super(RecordingTurtle, self).calculate_position_size(entry_price, stop_price)
+        kind = 'pyramid' if self.position else 'entry'
+        self.sizing.append({
+            'bar': len(self), 'kind': kind, 'value': self.broker.getvalue(),
+            'cash': self.broker.getcash(), 'price': entry_price, 'stop': stop_price,
+            'size': size, 'segment': len(self.segments) - 1,
+        })
+        if kind == 'pyramid' and size > 0:
+            self._lpp_from_fill = False
+        return size
+
+    def update_trailing_stop(self):
+        trail = super(RecordingTurtle, self).update_trailing_stop()
+        # 스탑에 걸리지 않은 바: 스탑이 이만큼 올라가면 결정이 바뀐다
+        if trail is not None and self.dataclose[0] >= trail:
+            segment = self._segment()
+            segment['stop_headroom'] = min(segment['stop_headroom'], self.dataclose[0] - trail)
+        return trail
+
+    def check_pyramid_signal(self):
+        fired = super(RecordingTurtle, self).check_pyramid_signal()
+        if fired and self._lpp_from_fill:
+            # 진입 체결가 기준 피라미딩: 체결가가 오르면 트리거도 같이 오른다
+            trigger = self.last_pyramid_price + self.atr[0] * self.params.atr_multiplier_pyramid
+            segment = self._segment()
+            segment['pyramid_headroom'] = min(segment['pyramid_headroom'], self.dataclose[0] - trigger)
+        return fired
+
+    def next(self):
+        flat = not self.position and self.order is None
+        if flat and self.check_entry_signal():
+            # 이번 바에 체결이 없었다면 직전 바 종료 시점 상태 = 지금 상태 → 그 시점 체크포인트
+            # (이어서 실행하려면 tail 이 전략 최소 기간 이상이어야 함)
+            if self._last_fill_bar < len(self) and len(self) > self._minperiod + 1:
+                self.restarts.append((len(self) - 1, snapshot(self, ago=1)))
+            # 체크포인트를 못 만든 구간은 그 이전 무포지션 시점(없으면 처음)부터 재실행
+            self.segments.append({
+                'bar': len(self), 'restart': len(self.restarts) - 1 if self.restarts else None,
+                'entry_fill': None, 'initial_stop': None,
+                'pct_stop': False, 'stop_headroom': math.inf, 'pyramid_headroom': math.inf,
+            })
+        super(RecordingTurtle, self).next()
+
+
+def record(columns, ticker, cash=100000.0, strategy=RecordingTurtle, stake=None, **params):
+    """무비용 기준 실행 1회. 체결/평가금액/사이즈 기록 dict 반환"""
+    cerebro = build_cerebro(columns, ticker, cash, 0.0, strategy=strategy, **params)
+    if stake is not None:
+        cerebro.addsizer(bt.sizers.FixedSize, stake=stake)
+    cerebro.addanalyzer(FillRecorder, _name='fills')
+    # 체크포인트 재실행과 같은 next 모드
+    strat = cerebro.run(runonce=False)[0]
+    analysis = strat.analyzers.fills.get_analysis()
+    fills = np.array(analysis['fills'], dtype='d').reshape(-1, 6)
+    return {
+        'cash': cash,
+        'params': params,
+        # 재실행에 쓰는 전략 (기록용 서브클래스가 아닌 원래 전략)
+        'strategy': TurtleStrategy if issubclass(strategy, RecordingTurtle) else strategy,
+        'stake': stake,
+        'fill_bar': fills[:, 0].astype(int),
+        'fill_size': fills[:, 1],
+        'fill_price': fills[:, 2],
+        'fill_cash': fills[:, 5],
+        'values': np.array(analysis['values'], dtype='d'),
+        'sizing': getattr(strat, 'sizing', []),
+        'segments': getattr(strat, 'segments', []),
+        'restarts': getattr(strat, 'restarts', []),
+        'risk_per_trade': getattr(strat.params, 'risk_per_trade', None),
+    }
+
+
+def extra_costs(rec, grid):
+    """(G x 체결 수) 체결별 추가 비용 (무비용 기준 대비 현금 감소분)"""
+    shift = price_shift(grid)[:, None]
+    size = np.abs(rec['fill_size'])[None, :]
+    price = rec['fill_price'][None, :]
+    side = np.sign(rec['fill_size'])[None, :]
+    executed = price * (1.0 + side * shift)
+    return size * price * shift + size * executed * grid['commission'][:, None]
+
+
+def _cum_until(cum, fill_bar, bars):
+    """bars 시점(그 바의 체결 포함)까지의 누적 추가 비용 (G x len(bars))"""
+    idx = np.searchsorted(fill_bar, bars, side='right')
+    padded = np.concatenate([np.zeros((cum.shape[0], 1)), cum], axis=1)
+    return padded[:, idx]
+
+
+def _first_segment(mask, segment, first):
+    """mask (G x 시간순 열)에서 그리드 점별 처음 참인 열의 구간 번호와 first 중 작은 값"""
+    found = mask.any(axis=1)
+    column = np.argmax(mask, axis=1)
+    return np.where(found, np.minimum(first, segment[column]), first)
+
+
+def divergence(rec, grid, cum):
+    """그리드 점별로 결정이 처음 달라지는 구간 번호 (없으면 -1)"""
+    n_grid = len(grid['commission'])
+    segments = rec['segments']
+    if not segments:
+        # 고정 수량 전략: 결정은 비용과 무관하고, 현금이 모자라 거절될 체결이 생기는 점만 처음부터 재실행
+        short = (rec['fill_cash'][None, :] - cum < 0) & (rec['fill_size'] > 0)[None, :]
+        return np.where(short.any(axis=1), 0, -1)
+    first = np.full(n_grid, len(segments), dtype=int)
+
+    shift = price_shift(grid)
+    entry_fill = np.array([s['entry_fill'] if s['entry_fill'] is not None else np.nan for s in segments])
+    delta = shift[:, None] * entry_fill[None, :]        # 진입 체결가 상승분 (G x 구간)
+
+    # 1) 스탑/피라미딩 여유보다 체결가가 더 오르면 결정이 바뀔 수 있다
+    stop_headroom = np.array([s['stop_headroom'] for s in segments])
+    pyramid_headroom = np.array([s['pyramid_headroom'] for s in segments])
+    flipped = (delta > stop_headroom[None, :]) | (delta > pyramid_headroom[None, :])
+    first = _first_segment(flipped, np.arange(len(segments)), first)
+
+    # 2) 포지션 사이즈: 평가금액(비용만큼 감소)과 피라미딩 손절가(체결가 기준)로 다시 계산
+    sizing = rec['sizing']
+    if sizing and rec['risk_per_trade'] is not None:
+        bars = np.array([s['bar'] for s in sizing])
+        seg = np.array([s['segment'] for s in sizing])
+        price = np.array([s['price'] for s in sizing])
+        stop = np.tile(np.array([s['stop'] for s in sizing], dtype='d'), (n_grid, 1))
+        paid = _cum_until(cum, rec['fill_bar'], bars)
+        value = np.array([s['value'] for s in sizing])[None, :] - paid
+        cash = np.array([s['cash'] for s in sizing])[None, :] - paid
+
+        pyramid = np.array([s['kind'] == 'pyramid' for s in sizing])
+        for j in np.flatnonzero(pyramid):
+            s = segments[seg[j]]
+            if s['pct_stop']:
+                stop[:, j] = s['initial_stop'] * (1.0 + shift)
+            else:
+                stop[:, j] = s['initial_stop'] + delta[:, seg[j]]
+
+        distance = price[None, :] - stop
+        with np.errstate(divide='ignore', invalid='ignore'):
+            size = np.where(distance > 0,
+                            np.maximum(1.0, np.floor(value * rec['risk_per_trade'] / distance)), 0.0)
+        recorded = np.array([s['size'] for s in sizing], dtype='d')[None, :]
+        # 제출 시 현금 확인: 종가 기준 금액 + 수수료. 기록(무비용) 실행에서도 현금 부족으로
+        # 거절됐던 주문은 그대로 거절되므로, 수락/거절 결과가 기록과 달라질 때만 표시
+        base_cash = np.array([s['cash'] for s in sizing])[None, :]
+        accepted = base_cash >= recorded * price[None, :]
+        need = recorded * price[None, :] * (1.0 + grid['commission'][:, None])
+        changed = (size != recorded) | ((recorded > 0) & ((cash >= need) != accepted))
+        first = _first_segment(changed, seg, first)
+
+    # 3) 체결 후 현금이 음수가 되면 브로커가 주문을 거절했을 것
+    short = (rec['fill_cash'][None, :] - cum < 0) & (rec['fill_size'] > 0)[None, :]
+    if short.any():
+        # 매수 체결은 그 구간의 진입 결정 바 다음에 일어난다
+        seg_start = np.array([s['bar'] for s in segments])
+        fill_seg = np.maximum(np.searchsorted(seg_start, rec['fill_bar'], side='left') - 1, 0)
+        first = _first_segment(short, fill_seg, first)
+
+    return np.where(first == len(segments), -1, first)
+
+
+def _drawdown(equity):
+    peak = np.maximum.accumulate(equity, axis=-1)
+    return np.max((peak - equity) / peak, axis=-1) * 100.0
+
+
+def rerun(columns, ticker, rec, costs, restart, cash_at_restart):
+    """restart 번째 체크포인트(None 이면 처음)부터 주어진 비용으로 다시 실행. (평가금액 배열, 시작 바)"""
+    commission, slippage, spread = costs
+    params = dict(rec['params'])
+    if restart is None:
+        cerebro = build_cerebro(columns, ticker, rec['cash'], commission,
+                                strategy=rec['strategy'], **params)
+        start_bar, skip = 1, 0
+    else:
+        start_bar, state = rec['restarts'][restart]
+        state = dict(state, cash=cash_at_restart)
+        columns = resume_columns(columns, state)
+        cerebro = build_cerebro(columns, ticker, rec['cash'], commission,
+                                strategy=checkpointed(TurtleStrategy, None, state), **params)
+        skip = state['tail'] - 1
+    apply_costs(cerebro, commission, slippage, spread)
+    if rec['stake'] is not None:
+        cerebro.addsizer(bt.sizers.FixedSize, stake=rec['stake'])
+    cerebro.addanalyzer(FillRecorder, _name='fills')
+    strat = cerebro.run(runonce=False)[0]
+    values = np.array(strat.analyzers.fills.get_analysis()['values'], dtype='d')
+    return values[skip:], start_bar
+
+
+def sweep(df, ticker, grid=None, cash=100000.0, strategy=None, stake=None, **params):
+    """비용 그리드 전체 결과 (dict 목록). 결정이 달라지는 점만 해당 구간부터 재실행
+
+    strategy=None 이면 TurtleStrategy (구간별 결정 변화 분석 후 재실행),
+    그 외 전략은 고정 수량(stake)으로 가격만 보고 결정한다고 보고 벡터 재평가만 한다
+    """
+    columns = df if isinstance(df, dict) else columns_from_dataframe(df)
+    grid = grid or cost_grid(**DEFAULT_GRID)
+
+    t0 = time.perf_counter()
+    if strategy is None:
+        params.setdefault('printlog', False)
+        # 스탑/피라미딩 여유 분석은 종가 기준 스탑(다음 바 시가 청산) 모델 기준
+        params.setdefault('use_broker_stops', False)
+        rec = record(columns, ticker, cash, **params)
+    else:
+        rec = record(columns, ticker, cash, strategy=strategy, stake=stake, **params)
+    recorded = time.perf_counter() - t0
+
+    cum = np.cumsum(extra_costs(rec, grid), axis=1)
+    bars = np.arange(1, len(rec['values']) + 1)
+    equity = rec['values'][None, :] - _cum_until(cum, rec['fill_bar'], bars)
+    first = divergence(rec, grid, cum)
+
+    rerun_from = [None] * len(first)
+    for g in np.flatnonzero(first >= 0):
+        restart = rec['segments'][first[g]]['restart'] if rec['segments'] else None
+        costs = (grid['commission'][g], grid['slippage'][g], grid['spread'][g])
+        if restart is None:
+            values, start_bar = rerun(columns, ticker, rec, costs, None, cash)
+        else:
+            bar = rec['restarts'][restart][0]
+            paid = _cum_until(cum[g:g + 1], rec['fill_bar'], np.array([bar]))[0, 0]
+            cash_at_restart = rec['restarts'][restart][1]['cash'] - paid
+            values, start_bar = rerun(columns, ticker, rec, costs, restart, cash_at_restart)
+        equity[g, start_bar - 1:] = values
+        rerun_from[g] = start_bar
+
+    final = equity[:, -1]
+    drawdown = _drawdown(equity)
+    elapsed = time.perf_counter() - t0
+    results = []
+    for g in range(len(final)):
+        results.append({
+            'commission': float(grid['commission'][g]),
+            'slippage': float(grid['slippage'][g]),
+            'spread': float(grid['spread'][g]),
+            'final_value': float(final[g]),
+            'total_return': float((final[g] / cash - 1.0) * 100.0),
+            'max_drawdown': float(drawdown[g]),
+            'rerun_from_bar': rerun_from[g],
+        })
+    stats = {'record_sec': recorded, 'total_sec': elapsed, 'grid': len(final),
+             'reruns': int((first >= 0).sum()), 'fills': len(rec['fill_bar'])}
+    return results, stats
+
+
+def print_sweep(results, stats):
+    print("="*70)
+    print(f"    💸 비용 민감도: {stats['grid']}개 조합, 체결 {stats['fills']}건, "
+          f"재실행 {stats['reruns']}회")
+    print("="*70)
+    print(f"   {'comm':>8} {'slip':>8} {'spread':>8} {'final':>14} {'return%':>9} {'mdd%':>7}  rerun")
+    for r in results:
+        rerun_bar = '' if r['rerun_from_bar'] is None else 'bar %d' % r['rerun_from_bar']
+        print(f"   {r['commission']:8.4f} {r['slippage']:8.4f} {r['spread']:8.4f} "
+              f"{r['final_value']:14.2f} {r['total_return']:9.2f} {r['max_drawdown']:7.2f}  {rerun_bar}")
+    print(f"   기록 {stats['record_sec']:.2f}s, 전체 {stats['total_sec']:.2f}s")
+    if stats['reruns'] and stats['reruns'] >= stats['grid'] - 1:
+        print("   ⚠️  거의 모든 조합이 재실행되었습니다 (수량이 비용에 민감). 전체 재실행과 시간 차이가 거의 없습니다.")
+    print("="*70)
+
+
+def verify(df, ticker, grid, results, cash=100000.0, strategy=None, stake=None, **params):
+    """모든 그리드 점을 전체 재실행해 결과와 비교. 최대 상대 오차 반환"""
+    columns = df if isinstance(df, dict) else columns_from_dataframe(df)
+    if strategy is None:
+        strategy = TurtleStrategy
+        params.setdefault('printlog', False)
+        params.setdefault('use_broker_stops', False)
+    worst = 0.0
+    for g, r in enumerate(results):
+        cerebro = build_cerebro(columns, ticker, cash, r['commission'], strategy=strategy, **params)
+        apply_costs(cerebro, r['commission'], r['slippage'], r['spread'])
+        if stake is not None:
+            cerebro.addsizer(bt.sizers.FixedSize, stake=stake)
+        cerebro.run(runonce=False)
+        full = cerebro.broker.getvalue()
+        worst = max(worst, abs(full - r['final_value']) / abs(full))
+    return worst
+
+
+def _floats(text):
+    return tuple(float(v) for v in text.split(','))
+
+
+if __name__ == '__main__':
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description='거래 비용 그리드 재평가')
+    parser.add_argument('--strategy', default='7.sell_strategy_commission.py',
+                        help="튜토리얼 전략 파일 (고정 수량) 또는 'turtle'")
+    parser.add_argument('--stake', type=int, default=None, help='고정 수량 전략의 주문 수량')
+    parser.add_argument('--data', default=os.path.normpath(os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), '../datas/yfinance/orcl-1995-2014.txt')))
+    parser.add_argument('--commission', type=_floats, default=DEFAULT_GRID['commission'])
+    parser.add_argument('--slippage', type=_floats, default=DEFAULT_GRID['slippage'])
+    parser.add_argument('--spread', type=_floats, default=DEFAULT_GRID['spread'])
+    parser.add_argument('--cash', type=float, default=100000.0)
+    parser.add_argument('--verify', action='store_true', help='모든 조합을 전체 재실행해 결과 비교 (느림)')
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.data, index_col='Date', parse_dates=True)
+    grid = cost_grid(args.commission, args.slippage, args.spread)
+    strategy = None
+    if args.strategy != 'turtle':
+        from lean_mode import quiet_strategy
+        from multi_strategy_runner import load_strategy_class
+        strategy = quiet_strategy(load_strategy_class(args.strategy))
+    results, stats = sweep(df, 'ORCL', grid, args.cash, strategy=strategy, stake=args.stake)
+    print_sweep(results, stats)
+    if args.verify:
+        t0 = time.perf_counter()
+        worst = verify(df, 'ORCL', grid, results, args.cash, strategy=strategy, stake=args.stake)
+        print(f"전체 재실행 대비 최대 상대 오차: {worst:.2e} ({time.perf_counter() - t0:.1f}s)")
@@ -1,7 +1,14 @@
 import datetime
+import os
+import sys
 import backtrader as bt
 import pandas as pd
-import yfinance as yf # yfinance를 yf로 import 합니다.
+from numpy_feed import NumpyData
+
+# demo-python 폴더의 공용 모듈(adjusted_cache)을 import 하기 위한 경로 추가
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from adjusted_cache import load_adjusted
 
 # Create a Stratey
 # Strategy 클래스를 상속받아서 거래로직을 정의
@@ -30,18 +37,16 @@ class TestStrategy(bt.Strategy):
             # 매수 주문 실행
             self.order = self.buy()
 
-# 주의: yf.Ticker().history(auto_adjust=True) 사용 시 수정 종가 보정 함수는 필요 없습니다.
-# Adj Close가 Close 컬럼에 반영되어 반환됩니다.
+# 주의: load_adjusted() 는 로컬 원본 데이터에 분할/배당 계수를 적용해 반환하므로 수정 종가 보정 함수는 필요 없습니다.
+# (yf.Ticker().history(auto_adjust=True) 와 같은 결과, 새 이벤트가 생겨도 전체 이력을 다시 받지 않음)
 
 if __name__ == '__main__':
     # 2. 테스트 구간 정하기
     fromdate = datetime.datetime(2021, 1, 1)
     todate = datetime.datetime(2021, 7, 6)
 
-    # 1. 데이터 가져오기: yf.Ticker().history() 사용 (컬럼 오류 방지 및 데이터 안정성 확보)
-    # auto_adjust=True: 주가 데이터가 분할 및 배당에 대해 자동 조정되도록 설정 (Adj Close 반영)
-    ticker = yf.Ticker("SPY")
-    df_spy = ticker.history(start=fromdate, end=todate, auto_adjust=True)
+    # 1. 데이터 가져오기: 로컬 원본 캐시를 증분 업데이트한 뒤 분할/배당 조정 (Adj Close 반영)
+    df_spy = load_adjusted("SPY", fromdate, todate)
     
     # 데이터가 비어 있는지 확인
     if df_spy.empty:
@@ -50,9 +55,9 @@ if __name__ == '__main__':
         # 3. 테스트 agent 생성
         cerebro = bt.Cerebro()
         
-        # bt.feeds.PandasData에 데이터프레임을 전달
-        # yfinance의 history() 메서드는 backtrader가 요구하는 컬럼명(Open, High, Low, Close, Volume)을 가집니다.
-        data_spy = bt.feeds.PandasData(dataname=df_spy)
+        # NumpyData에 데이터프레임을 전달 (컬럼 단위로 일괄 로딩, 행 단위 복사 없음)
+        # load_adjusted() 결과는 backtrader가 요구하는 컬럼명(Open, High, Low, Close, Volume)을 가집니다.
+        data_spy = NumpyData(dataname=df_spy)
         cerebro.adddata(data_spy, name="SPY")
 
         # 4. Add strategy
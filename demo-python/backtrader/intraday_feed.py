@@ -0,0 +1,218 @@
+import datetime
+import glob
+import io
+import os
+import sys
+import numpy as np
+import pandas as pd
+import backtrader as bt
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from numpy_feed import datetime_index_to_num
+from shared_cache import atomic_write, single_flight
+
+# ----------------------------------------------------------------------
+# 분봉(1분) 데이터 청크 로딩 + 엔진 내 멀티 타임프레임 리샘플링
+# - 로컬 캐시: datas/intraday/<TICKER>/<YYYY-MM>.csv (월 단위 파일)
+#   병합 저장은 파일별 single-flight 잠금 안에서 읽고 atomic write 로 교체 (shared_cache)
+# - ChunkedMinuteData 는 파일을 chunksize 행씩 읽어 한 청크만 메모리에 유지
+# - cerebro.resampledata 로 5분/1시간/1일 봉을 엔진 안에서 집계
+#   (전체 분봉 DataFrame 을 만들지 않으므로 1천만 봉 이상에서도 메모리가 일정)
+# ----------------------------------------------------------------------
+
+INTRADAY_DIR = os.path.normpath(os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'datas', 'intraday'))
+
+CSV_COLUMNS = ['Datetime', 'Open', 'High', 'Low', 'Close', 'Volume']
+
+
+def ticker_dir(ticker, cache_dir=None):
+    return os.path.join(cache_dir or INTRADAY_DIR, ticker.upper())
+
+
+def save_minute_bars(ticker, df, cache_dir=None):
+    """분봉 DataFrame 을 월 단위 CSV 캐시에 병합 저장 (거래소 현지 시간 기준)"""
+    if df.empty:
+        return 0
+    if df.index.tz is not None:
+        df = df.tz_convert('America/New_York').tz_localize(None)
+    df = df[['Open', 'High', 'Low', 'Close', 'Volume']]
+
+    folder = ticker_dir(ticker, cache_dir)
+    os.makedirs(folder, exist_ok=True)
+    for month, part in df.groupby(df.index.strftime('%Y-%m')):
+        path = os.path.join(folder, '%s.csv' % month)
+        # 다른 프로세스의 병합과 섞이지 않도록 잠금 안에서 읽고, 읽는 쪽은 이전 또는 새 파일만 본다
+        with single_flight(path):
+            if os.path.exists(path):
+                old = pd.read_csv(path, index_col='Datetime', parse_dates=True)
+                part = pd.concat([old, part])
+                part = part[~part.index.duplicated(keep='last')].sort_index()
+            buf = io.StringIO()
+            part.to_csv(buf, index_label='Datetime', date_format='%Y-%m-%d %H:%M:%S')
+            atomic_write(path, buf.getvalue())
+    return len(df)
+
+
+def download_minute_bars(ticker, period='7d', cache_dir=None):
+    """yfinance 1분봉(최근 7일 한도)을 받아 캐시에 추가"""
+    import yfinance as yf
+    df = yf.Ticker(ticker).history(period=period, interval='1m', auto_adjust=True)
+    return save_minute_bars(ticker, df, cache_dir)
+
+
+def iter_minute_chunks(ticker, fromdate=None, todate=None, chunksize=200000, cache_dir=None):
+    """캐시 파일들을 순서대로 chunksize 행씩 읽어 {라인: ndarray} 청크를 생성"""
+    files = sorted(glob.glob(os.path.join(ticker_dir(ticker, cache_dir), '*.csv')))
+    for path in files:
+        # 월 파일 이름으로 기간 밖의 파일은 열지 않고 건너뜀
+        month = os.path.splitext(os.path.basename(path))[0]
+        if fromdate is not None and month < fromdate.strftime('%Y-%m'):
+            continue
+        if todate is not None and month > todate.strftime('%Y-%m'):
+            break
+        for chunk in pd.read_csv(path, chunksize=chunksize):
+            index = pd.DatetimeIndex(pd.to_datetime(chunk['Datetime']))
+            yield {
+                'datetime': np.ascontiguousarray(datetime_index_to_num(index), dtype='d'),
+                'open': chunk['Open'].to_numpy(dtype='d'),
+                'high': chunk['High'].to_numpy(dtype='d'),
+                'low': chunk['Low'].to_numpy(dtype='d'),
+                'close': chunk['Close'].to_numpy(dtype='d'),
+                'volume': chunk['Volume'].to_numpy(dtype='d'),
+            }
+
+
+class ChunkedMinuteData(bt.feed.DataBase):
+    """로컬 분봉 캐시를 청크 단위로 스트리밍하는 데이터 피드 (preload 없이 사용)"""
+    params = (
+        ('ticker', None),
+        ('cache_dir', None),
+        ('chunksize', 200000),
+        ('timeframe', bt.TimeFrame.Minutes),
+        ('compression', 1),
+        ('sessionstart', datetime.time(9, 30)),
+        ('sessionend', datetime.time(16, 0)),
+    )
+
+    def start(self):
+        super(ChunkedMinuteData, self).start()
+        self._chunks = iter_minute_chunks(
+            self.p.ticker or self.p.dataname, self.p.fromdate, self.p.todate,
+            self.p.chunksize, self.p.cache_dir)
+        self._chunk = None
+        self._idx = 0
+        self._size = 0
+
+    def _load(self):
+        # 현재 청크를 다 쓰면 다음 청크를 읽는다 (메모리에는 항상 한 청크만)
+        while self._idx >= self._size:
+            self._chunk = next(self._chunks, None)
+            if self._chunk is None:
+                return False
+            self._idx = 0
+            self._size = len(self._chunk['datetime'])
+
+        i = self._idx
+        self._idx += 1
+        lines = self.lines
+        chunk = self._chunk
+        lines.datetime[0] = float(chunk['datetime'][i])
+        lines.open[0] = float(chunk['open'][i])
+        lines.high[0] = float(chunk['high'][i])
+        lines.low[0] = float(chunk['low'][i])
+        lines.close[0] = float(chunk['close'][i])
+        lines.volume[0] = float(chunk['volume'][i])
+        lines.openinterest[0] = 0.0
+        return True
+
+
+# 기본 리샘플링 구성: 5분, 1시간, 1일
+DEFAULT_TIMEFRAMES = (
+    (bt.TimeFrame.Minutes, 5),
+    (bt.TimeFrame.Minutes, 60),
+    (bt.TimeFrame.Days, 1),
+)
+
+
+class MultiTimeframeBreakout(bt.Strategy):
+    """5분봉 돈치안 돌파 + 1시간/1일봉 추세 필터 (datas: 1분, 5분, 1시간, 1일)"""
+    params = (
+        ('entry_period', 20),    # 5분봉 돌파 기간
+        ('exit_period', 10),     # 5분봉 이탈 기간
+        ('hour_period', 20),     # 1시간봉 추세 기간
+        ('day_period', 10),      # 1일봉 추세 기간
+        ('printlog', False),
+    )
+
+    def log(self, txt, dt=None):
+        ''' 로깅 함수 '''
+        if not self.params.printlog:
+            return
+        dt = dt or self.datas[0].datetime.datetime(0)
+        print('%s, %s' % (dt.isoformat(), txt))
+
+    def __init__(self):
+        m5, h1, d1 = self.datas[1], self.datas[2], self.datas[3]
+        # 직전 봉까지의 채널 (현재 봉은 제외해야 돌파 판정 가능)
+        self.entry_high = bt.indicators.Highest(m5.high(-1), period=self.p.entry_period)
+        self.exit_low = bt.indicators.Lowest(m5.low(-1), period=self.p.exit_period)
+        # 상위 타임프레임 추세 필터: 종가가 채널 중간값 위
+        hour_mid = (bt.indicators.Highest(h1.high, period=self.p.hour_period) +
+                    bt.indicators.Lowest(h1.low, period=self.p.hour_period)) / 2.0
+        day_mid = (bt.indicators.Highest(d1.high, period=self.p.day_period) +
+                   bt.indicators.Lowest(d1.low, period=self.p.day_period)) / 2.0
+        self.uptrend = bt.And(h1.close > hour_mid, d1.close > day_mid)
+        self.m5 = m5
+        self.order = None
+
+    def notify_order(self, order):
+        if order.status in [order.Submitted, order.Accepted]:
+            return
+        if order.status in [order.Completed]:
+            side = 'BUY' if order.isbuy() else 'SELL'
+            self.log('%s EXECUTED, Price: %.2f, Size: %.0f' %
+                     (side, order.executed.price, order.executed.size))
+        self.order = None
+
+    def next(self):
+        if self.order:
+            return
+        if not self.position:
+            if self.m5.close[0] > self.entry_high[0] and self.uptrend[0]:
+                self.order = self.buy(data=self.datas[0])
+        elif self.m5.close[0] < self.exit_low[0]:
+            self.order = self.close(data=self.datas[0])
+
+
+def add_multi_timeframe_data(cerebro, ticker, timeframes=DEFAULT_TIMEFRAMES, **kwargs):
+    """분봉 피드와 리샘플링된 상위 타임프레임 피드들을 cerebro 에 추가"""
+    data = ChunkedMinuteData(dataname=ticker, ticker=ticker, **kwargs)
+    cerebro.adddata(data, name='%s-1m' % ticker)
+    for timeframe, compression in timeframes:
+        cerebro.resampledata(data, timeframe=timeframe, compression=compression,
+                             name='%s-%s%d' % (ticker, bt.TimeFrame.getname(timeframe, compression), compression))
+    return data
+
+
+def run_multi_timeframe(ticker, strategy=MultiTimeframeBreakout, cash=100000.0,
+                        commission=0.001, fromdate=None, todate=None, **params):
+    """메모리 상한 모드(preload/runonce 끔, exactbars=1)로 멀티 타임프레임 백테스트 실행"""
+    cerebro = bt.Cerebro(preload=False, runonce=False, exactbars=1, stdstats=False)
+    add_multi_timeframe_data(cerebro, ticker, fromdate=fromdate, todate=todate)
+    cerebro.addstrategy(strategy, **params)
+    cerebro.addsizer(bt.sizers.PercentSizer, percents=95)
+    cerebro.broker.setcash(cash)
+    cerebro.broker.setcommission(commission=commission)
+    cerebro.run()
+    return cerebro.broker.getvalue()
+
+
+if __name__ == '__main__':
+    TICKER = 'SPY'
+    # 최근 분봉을 캐시에 추가한 뒤, 캐시 전체로 백테스트
+    added = download_minute_bars(TICKER)
+    print(f"💾 {TICKER} 분봉 {added}개 캐시 저장")
+    final_value = run_multi_timeframe(TICKER, printlog=True)
+    print('Final Portfolio Value: %.2f' % final_value)
@@ -0,0 +1,172 @@
+import argparse
+import time
+import tracemalloc
+import backtrader as bt
+
+from numpy_feed import NumpyData
+from synthetic_data import make_synthetic_ohlcv
+
+# ----------------------------------------------------------------------
+# 배치 실행용 "린(lean)" 실행 프로파일
+# - 기본: Broker/Trades/BuySell 옵저버만 끔 (stdstats=False), preload/runonce 는 유지
+#   → 결과는 같고 옵저버 계산만 빠지므로 배치/최적화 실행의 처리량이 가장 높다
+# - save_memory=True (선택): 플로팅용 전체 라인 이력을 유지하지 않음 (exactbars)
+#   · backtrader 는 exactbars 를 지정하면 runonce 를 끄므로 바마다 지표를 계산한다
+#     → 메모리는 줄지만 느려진다 (TurtleStrategy 2만 봉: 약 4배 느림). 처리량 목적으로 쓰지 않는다
+#   · 전략 클래스에 lean_lookback (next() 에서 직접 참조하는 과거 바 수, 예: data[-2] → 3)을
+#     선언하면 최소 메모리 모드(exactbars=1), 선언하지 않으면 하위 지표 버퍼만 줄이는 exactbars=-2
+# ----------------------------------------------------------------------
+
+
+def lean_settings(strategy_cls, datas=(), save_memory=False):
+    """전략/데이터 호환성에 맞는 Cerebro 옵션(dict)을 반환"""
+    # 라이브 피드는 미리 읽을 수 없으므로 preload/runonce 불가
+    live = any(data.islive() for data in datas)
+    if not save_memory:
+        return dict(stdstats=False, preload=not live, runonce=not live)
+    if getattr(strategy_cls, 'lean_lookback', None) is not None:
+        # 최소 메모리: 데이터/지표 모두 필요한 만큼만 유지 (backtrader 가 preload/runonce 를 끔)
+        return dict(stdstats=False, exactbars=1, preload=False, runonce=False)
+    return dict(stdstats=False, exactbars=-2, preload=not live, runonce=False)
+
+
+def lean_strategy(strategy_cls, save_memory=False):
+    """exactbars=1 에서도 lean_lookback 만큼 데이터 버퍼를 확보하는 서브클래스"""
+    lookback = getattr(strategy_cls, 'lean_lookback', None)
+    if not save_memory or lookback is None:
+        return strategy_cls
+
+    class LeanStrategy(strategy_cls):
+
+        def qbuffer(self, savemem=0, replaying=False):
+            super(LeanStrategy, self).qbuffer(savemem, replaying)
+            if savemem > 0:
+                # 전략이 직접 data[-k] 를 읽으므로 지표가 요구하는 크기보다 작아지지 않게 함
+                for data in self.datas:
+                    data.minbuffer(lookback)
+
+    LeanStrategy.__name__ = strategy_cls.__name__
+    return LeanStrategy
+
+
+def quiet_strategy(strategy_cls):
+    """log() 출력을 끈 서브클래스 (배치 실행/벤치마크용)"""
+
+    class QuietStrategy(strategy_cls):
+        def log(self, txt, dt=None):
+            pass
+
+    QuietStrategy.__name__ = strategy_cls.__name__
+    return QuietStrategy
+
+
+def lean_cerebro(strategy_cls, datas, save_memory=False, **strategy_params):
+    """린 프로파일이 적용된 Cerebro 생성"""
+    cerebro = bt.Cerebro(**lean_settings(strategy_cls, datas, save_memory))
+    for data in datas:
+        cerebro.adddata(data)
+    cerebro.addstrategy(lean_strategy(strategy_cls, save_memory), **strategy_params)
+    return cerebro
+
+
+# ----------------------------------------------------------------------
+# 벤치마크: 기본 Cerebro vs 린 프로파일 vs 메모리 절약 (bars/sec, 최대 메모리, 결과 일치)
+# ----------------------------------------------------------------------
+
+MODES = ('default', 'lean', 'save_memory')
+
+
+class TradeCounter(bt.Analyzer):
+    """열린 거래 수 (동등성 확인이 의미 있으려면 실제로 거래가 있어야 한다)"""
+
+    def start(self):
+        self.trades = 0
+
+    def notify_trade(self, trade):
+        if trade.justopened:
+            self.trades += 1
+
+    def get_analysis(self):
+        return {'trades': self.trades}
+
+
+def _build(mode, strategy_cls, columns, params):
+    data = NumpyData(dataname=columns)
+    if mode == 'default':
+        cerebro = bt.Cerebro()
+        cerebro.adddata(data)
+        cerebro.addstrategy(strategy_cls, **params)
+    else:
+        cerebro = lean_cerebro(strategy_cls, [data], save_memory=mode == 'save_memory', **params)
+    cerebro.addanalyzer(TradeCounter, _name='trades')
+    cerebro.broker.setcash(100000.0)
+    return cerebro
+
+
+def measure(mode, strategy_cls, columns, params=None):
+    """실행 시간과 tracemalloc 최대 메모리를 각각 별도 실행으로 측정"""
+    params = params or {}
+    bars = len(columns['datetime'])
+
+    cerebro = _build(mode, strategy_cls, columns, params)
+    t0 = time.perf_counter()
+    strat = cerebro.run()[0]
+    elapsed = time.perf_counter() - t0
+    final_value = cerebro.broker.getvalue()
+
+    # 메모리 측정은 tracemalloc 오버헤드가 시간에 섞이지 않도록 한 번 더 실행
+    cerebro = _build(mode, strategy_cls, columns, params)
+    tracemalloc.start()
+    cerebro.run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'mode': mode,
+        'bars_per_sec': bars / elapsed if elapsed else float('inf'),
+        'elapsed': elapsed,
+        'peak_mb': peak / 1024.0 / 1024.0,
+        'final_value': final_value,
+        'trades': strat.analyzers.trades.get_analysis()['trades'],
+    }
+
+
+def run_benchmark(strategy_cls, bars=100000, seed=42, params=None):
+    columns = make_synthetic_ohlcv(bars, seed=seed)
+    strategy_cls = quiet_strategy(strategy_cls)
+    results = [measure(mode, strategy_cls, columns, params) for mode in MODES]
+
+    print("="*70)
+    print(f"    ⚡ 린 프로파일 벤치마크: {strategy_cls.__name__}, {bars:,} bars")
+    print("="*70)
+    default = results[0]
+    for r in results:
+        same = abs(r['final_value'] - default['final_value']) < 1e-6 and r['trades'] == default['trades']
+        print(f"   {r['mode']:<12} {r['bars_per_sec']:>10,.0f} bars/sec ({r['bars_per_sec'] / default['bars_per_sec']:.2f}x)  "
+              f"peak {r['peak_mb']:8.1f} MB ({r['peak_mb'] / default['peak_mb'] * 100:.0f}%)  "
+              f"trades {r['trades']:4}  final {r['final_value']:.2f}  일치 {same}")
+    if default['trades'] == 0:
+        print("   ⚠️  거래가 없어 결과 일치 확인이 의미 없습니다. 거래가 있는 전략으로 확인하세요.")
+    print("="*70)
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='린 실행 프로파일 벤치마크')
+    parser.add_argument('--bars', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--strategy', default='8.indicators.py',
+                        help="튜토리얼 전략 파일 이름 또는 'turtle'")
+    parser.add_argument('--lookback', type=int, default=1,
+                        help='튜토리얼 전략이 next() 에서 읽는 과거 바 수 (lean_lookback, 0 이면 선언 안 함)')
+    args = parser.parse_args()
+    if args.strategy == 'turtle':
+        from turtle_strategy import TurtleStrategy
+        run_benchmark(TurtleStrategy, args.bars, args.seed, params={'printlog': False})
+    else:
+        from multi_strategy_runner import load_strategy_class
+        strategy_cls = load_strategy_class(args.strategy)
+        if args.lookback:
+            # 8.indicators 는 [0] 만 읽는다 → exactbars=1 까지 동등성 확인
+            strategy_cls = type(strategy_cls.__name__, (strategy_cls,), {'lean_lookback': args.lookback})
+        run_benchmark(strategy_cls, args.bars, args.seed)
@@ -0,0 +1,128 @@
+import datetime
+import importlib.util
+import os
+import backtrader as bt
+
+from streaming_analyzers import add_streaming_analyzers
+
+# ----------------------------------------------------------------------
+# 여러 튜토리얼 전략을 한 번의 데이터 패스로 비교 실행
+# - 데이터 피드(orcl-1995-2014.txt)는 한 번만 파싱하고 모든 전략이 공유
+# - 전략마다 독립된 브로커(현금/포지션/수수료/주문)를 사용 → 서로의 계좌에 영향 없음
+# - 하나의 Cerebro 이벤트 루프에서 모든 전략을 함께 구동
+# - 결과는 하나의 비교 표로 출력
+# ----------------------------------------------------------------------
+
+MODPATH = os.path.dirname(os.path.abspath(__file__))
+DATAPATH = os.path.join(MODPATH, '../datas/yfinance/orcl-1995-2014.txt')
+
+# (표시 이름, 파일 이름, 초기 현금, 수수료, 고정 수량) - 각 튜토리얼 스크립트의 설정과 동일
+TUTORIAL_STRATEGIES = [
+    ('5_buy', '5_buy_strategy.py', 100000.0, 0.0, None),
+    ('6_sell', '6_sell_strategy.py', 100000.0, 0.0, None),
+    ('7_commission', '7.sell_strategy_commission.py', 100000.0, 0.001, None),
+    ('8_indicators', '8.indicators.py', 1000.0, 0.0, 10),
+]
+
+
+def load_strategy_class(filename, classname='TestStrategy'):
+    """숫자/점이 들어간 튜토리얼 파일에서 전략 클래스를 불러온다"""
+    path = os.path.join(MODPATH, filename)
+    modname = 'tutorial_' + os.path.splitext(filename)[0].replace('.', '_')
+    spec = importlib.util.spec_from_file_location(modname, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return getattr(module, classname)
+
+
+def isolated(strategy_cls, label, cash=100000.0, commission=0.0, stake=None, quiet=True):
+    """전략 전용 브로커를 사용하는 서브클래스를 만든다"""
+
+    class IsolatedStrategy(strategy_cls):
+
+        def __init__(self):
+            # cerebro 공용 브로커 대신 전략 전용 BackBroker 사용
+            self.broker = bt.brokers.BackBroker()
+            self.broker.setcash(cash)
+            self.broker.setcommission(commission=commission)
+            self.broker.start()
+            if stake is not None:
+                self.setsizer(bt.sizers.FixedSize(stake=stake))
+            super(IsolatedStrategy, self).__init__()
+
+        def _drive_broker(self):
+            # cerebro 가 공용 브로커에 하는 일(_brokernotify)을 전용 브로커에 대해 수행
+            self.broker.next()
+            while True:
+                order = self.broker.get_notification()
+                if order is None:
+                    break
+                self._addnotification(order)
+
+        def _next(self):
+            self._drive_broker()
+            super(IsolatedStrategy, self)._next()
+
+        def _oncepost(self, dt):
+            self._drive_broker()
+            super(IsolatedStrategy, self)._oncepost(dt)
+
+        def log(self, txt, dt=None):
+            if not quiet:
+                print('[%s] ' % label, end='')
+                super(IsolatedStrategy, self).log(txt, dt)
+
+    IsolatedStrategy.__name__ = 'Isolated_%s' % label
+    IsolatedStrategy.label = label
+    IsolatedStrategy.startcash = cash
+    return IsolatedStrategy
+
+
+def run_strategies(entries=TUTORIAL_STRATEGIES, datapath=DATAPATH,
+                   fromdate=datetime.datetime(2000, 1, 1),
+                   todate=datetime.datetime(2000, 12, 31), quiet=True):
+    """전략 목록을 하나의 피드/이벤트 루프로 실행하고 결과 행 리스트를 반환"""
+    cerebro = bt.Cerebro(stdstats=False)
+
+    # 데이터 피드는 한 번만 추가 (파싱 1회)
+    data = bt.feeds.YahooFinanceCSVData(
+        dataname=datapath, fromdate=fromdate, todate=todate, reverse=False)
+    cerebro.adddata(data)
+
+    for label, filename, cash, commission, stake in entries:
+        strategy_cls = load_strategy_class(filename)
+        cerebro.addstrategy(isolated(strategy_cls, label, cash, commission, stake, quiet))
+    add_streaming_analyzers(cerebro)
+
+    rows = []
+    for strat in cerebro.run():
+        exposure = strat.analyzers.exposure.get_analysis()
+        drawdown = strat.analyzers.drawdown.get_analysis()
+        final_value = strat.broker.getvalue()
+        rows.append({
+            'Strategy': strat.label,
+            'Start': strat.startcash,
+            'Final': final_value,
+            'Return(%)': (final_value / strat.startcash - 1.0) * 100.0,
+            'MDD(%)': drawdown['max_drawdown'],
+            'Trades': exposure['trades'],
+            'WinRate(%)': exposure['win_rate'],
+            'Exposure(%)': exposure['exposure'],
+        })
+    return rows
+
+
+def print_comparison(rows):
+    """결과 행을 비교 표로 출력"""
+    import pandas as pd
+
+    print("="*70)
+    print("    📊 전략 비교 (단일 데이터 패스)")
+    print("="*70)
+    table = pd.DataFrame(rows).round(2)
+    print(table.to_string(index=False))
+    print("="*70)
+
+
+if __name__ == '__main__':
+    print_comparison(run_strategies())
@@ -0,0 +1,130 @@
+import array
+import math
+import numpy as np
+import backtrader as bt
+
+# ----------------------------------------------------------------------
+# NumPy 배열 기반 데이터 피드
+# - bt.feeds.PandasData 는 DataFrame 을 한 행씩 순회하며 값을 라인에 복사한다.
+#   (DataFrame + 라인 버퍼 = 메모리에 데이터가 두 벌)
+# - NumpyData 는 컬럼별 연속(contiguous) float64 배열을 받아서
+#   preload 시 컬럼 단위로 라인 버퍼에 한 번에 메모리 복사한다. (행 단위 Python 루프 없음)
+# - 복사가 끝난 컬럼 배열은 바로 해제하고 그 자리에 라인 버퍼 참조만 남긴다(keepsource=False)
+#   → 메모리에는 라인 버퍼 한 벌만 남고, 같은 피드로 다시 실행하면 그 버퍼를 복사 없이 다시 쓴다
+# ----------------------------------------------------------------------
+
+# backtrader date2num 기준: 0001-01-01 00:00 = 1.0, 하루 = 1.0
+_EPOCH = np.datetime64('0001-01-01T00:00:00', 'us')
+
+# DataFrame 컬럼 이름 → backtrader 라인 이름
+COLUMN_ALIASES = {
+    'open': 'open',
+    'high': 'high',
+    'low': 'low',
+    'close': 'close',
+    'volume': 'volume',
+    'openinterest': 'openinterest',
+    'open interest': 'openinterest',
+}
+
+
+def datetime_index_to_num(index):
+    """pandas DatetimeIndex → backtrader 숫자 날짜 배열 (벡터 연산)"""
+    # PandasData 와 동일하게 타임존이 있으면 UTC 기준으로 변환
+    if getattr(index, 'tz', None) is not None:
+        index = index.tz_convert('UTC').tz_localize(None)
+    values = np.asarray(index.values).astype('datetime64[us]')
+    return (values - _EPOCH) / np.timedelta64(1, 'D') + 1.0
+
+
+def columns_from_dataframe(df):
+    """DataFrame 에서 라인별 연속 float64 배열(dict)을 만든다"""
+    columns = {'datetime': np.ascontiguousarray(datetime_index_to_num(df.index), dtype='d')}
+    for name in df.columns:
+        alias = COLUMN_ALIASES.get(str(name).lower())
+        if alias is not None and alias not in columns:
+            columns[alias] = np.ascontiguousarray(df[name].to_numpy(dtype='d'))
+    return columns
+
+
+class NumpyData(bt.feed.DataBase):
+    """컬럼별 NumPy 배열을 감싸는 데이터 피드 (preload/runonce 및 next 모드 모두 지원)
+
+    dataname: DataFrame 또는 {'datetime': ..., 'open': ..., ...} 형태의 배열 dict
+              (datetime 은 backtrader 숫자 날짜, 오름차순 정렬)
+    """
+    params = (
+        ('keepsource', False),  # True면 preload 후에도 원본 배열(날짜 구간으로 자르기 전) 유지
+    )
+
+    def __init__(self):
+        dataname = self.p.dataname
+        if isinstance(dataname, dict):
+            self._columns = {
+                k: np.ascontiguousarray(v, dtype='d') for k, v in dataname.items()
+            }
+        else:
+            self._columns = columns_from_dataframe(dataname)
+        self._size = len(self._columns['datetime'])
+        # 원본 DataFrame 참조를 끊어서 메모리에 두 벌이 남지 않도록 함
+        self.p.dataname = None
+
+    @classmethod
+    def from_dataframe(cls, df, **kwargs):
+        return cls(dataname=df, **kwargs)
+
+    def start(self):
+        super(NumpyData, self).start()
+        self._idx = -1
+
+    def _load(self):
+        # next 모드(스트리밍)에서는 한 바씩 값을 채운다
+        self._idx += 1
+        if self._idx >= self._size:
+            return False
+        i = self._idx
+        for alias in self.lines.getlinealiases():
+            col = self._columns.get(alias)
+            if col is not None:
+                getattr(self.lines, alias)[0] = float(col[i])
+        return True
+
+    def preload(self):
+        # 필터(resample 등)가 있으면 바 단위 처리가 필요하므로 기본 구현 사용
+        if self._filters:
+            return super(NumpyData, self).preload()
+
+        # fromdate/todate 구간은 이진 탐색으로 잘라냄
+        dt = np.asarray(self._columns['datetime'])
+        lo = int(np.searchsorted(dt, self.fromdate, side='left'))
+        hi = int(np.searchsorted(dt, self.todate, side='right'))
+        size = hi - lo
+        del dt
+
+        for alias in self.lines.getlinealiases():
+            line = getattr(self.lines, alias)
+            col = self._columns.get(alias)
+            buf = array.array('d')
+            if col is None:
+                buf = array.array('d', [math.nan]) * size
+            elif isinstance(col, array.array) and lo == 0 and hi == len(col):
+                # 이전 실행에서 채운 라인 버퍼 (이미 구간이 잘려 있음): 복사 없이 다시 사용
+                # (preload 된 데이터 라인은 실행 중에 값이 바뀌지 않는다)
+                buf = col
+            else:
+                # 컬럼 단위 메모리 복사 (행 단위 Python 루프 없음)
+                # array.frombytes 는 바이트 단위 버퍼만 받으므로 float64 뷰를 'B' 로 캐스팅
+                buf.frombytes(memoryview(col)[lo:hi].cast('B'))
+                if not self.p.keepsource:
+                    # 원본 배열 대신 라인 버퍼를 참조 → 메모리 한 벌, 재실행(cerebro.run 재호출) 가능
+                    self._columns[alias] = buf
+            line.array = buf
+            line.idx = size - 1
+            line.lencount = size
+
+        if not self.p.keepsource:
+            self._size = size
+        # 모두 읽었음: next 모드에서 버퍼 끝에 닿아도 _load 가 다시 채우지 않게 한다
+        self._idx = self._size
+        self._last()
+        self.home()
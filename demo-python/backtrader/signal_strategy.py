@@ -0,0 +1,193 @@
+import argparse
+import array
+import datetime
+import os
+import time
+import numpy as np
+import backtrader as bt
+
+from lean_mode import quiet_strategy
+from multi_strategy_runner import DATAPATH, load_strategy_class
+
+# ----------------------------------------------------------------------
+# 선언형(declarative) 시그널 전략
+# - 진입/청산 규칙을 next() 안의 if 문이 아니라 라인 식(line expression)으로 선언
+#   예) 종가 > SMA, 크로스오버, 연속 하락, 보유 기간(hold_bars)
+# - runonce/preload 모드에서는 라인 식이 지표와 함께 배열 단위로 한 번에 계산되고,
+#   전략은 시그널이 발생한 바 번호 집합만 만들어 둔다
+# - next() 는 "시그널이 있는 바인가" 만 확인하고 그때만 주문을 낸다 (바마다 규칙 계산 없음)
+# - next 모드(preload 없음, exactbars 등)에서는 같은 라인 식을 바마다 [0] 으로 읽어 동작
+# ----------------------------------------------------------------------
+
+
+def falling(line, bars=2):
+    """bars 번 연속 하락: line[0] < line[-1] < ... < line[-bars]"""
+    return bt.And(*[line(-i) < line(-i - 1) for i in range(bars)]) if bars > 1 else line < line(-1)
+
+
+def rising(line, bars=2):
+    """bars 번 연속 상승"""
+    return bt.And(*[line(-i) > line(-i - 1) for i in range(bars)]) if bars > 1 else line > line(-1)
+
+
+def crossover(a, b):
+    """a 가 b 를 상향 돌파한 바"""
+    return bt.indicators.CrossOver(a, b) > 0
+
+
+def crossunder(a, b):
+    """a 가 b 를 하향 돌파한 바"""
+    return bt.indicators.CrossOver(a, b) < 0
+
+
+class RuleStrategy(bt.Strategy):
+    """entry_rule()/exit_rule() 이 돌려주는 라인 식으로 매매하는 롱 전용 전략
+
+    - 포지션이 없을 때 entry 가 참인 바에서 매수
+    - 포지션이 있을 때 exit 가 참이거나 체결 후 hold_bars 바가 지나면 매도
+    - 주문이 진행 중이면 새 주문을 내지 않음 (튜토리얼 전략과 동일)
+    """
+    params = (
+        ('hold_bars', None),   # 체결 후 보유 바 수 (None 이면 사용 안 함)
+        ('printlog', False),
+    )
+
+    def entry_rule(self):
+        return None
+
+    def exit_rule(self):
+        return None
+
+    def log(self, txt, dt=None):
+        if not self.p.printlog:
+            return
+        dt = dt or self.datas[0].datetime.date(0)
+        print('%s, %s' % (dt.isoformat(), txt))
+
+    def __init__(self):
+        self.order = None
+        self.bar_executed = None
+        self.entry = self.entry_rule()
+        self.exit = self.exit_rule()
+        self._entry_bars = None
+        self._exit_bars = None
+
+    def _fire_bars(self, rule):
+        """runonce 로 미리 계산된 라인이면 시그널이 참인 바 번호(1부터) 집합, 아니면 None"""
+        if rule is None:
+            return frozenset()
+        # 라인 식이 전체 구간에 대해 미리 계산되는 것은 preload + runonce 일 때뿐
+        # (preload=False 면 데이터 길이도 지금까지의 바 수라 길이 비교로는 구분할 수 없다)
+        if not (self.cerebro._dopreload and self.cerebro._dorunonce):
+            return None   # next 모드: 바마다 [0] 으로 읽는다
+        line = rule.lines[0] if hasattr(rule.lines, 'getlinealiases') else rule
+        values = line.array
+        if not isinstance(values, array.array) or len(values) < self.data.buflen():
+            return None
+        fired = np.flatnonzero(np.frombuffer(values, dtype='d') > 0.0)
+        return frozenset((fired + 1).tolist())
+
+    def _fires(self, rule, bars):
+        if bars is not None:
+            return len(self) in bars
+        return rule is not None and rule[0] > 0.0
+
+    def nextstart(self):
+        # 모든 라인 식이 계산 가능한 첫 바: runonce 모드면 시그널 바 집합을 한 번만 만든다
+        self._entry_bars = self._fire_bars(self.entry)
+        self._exit_bars = self._fire_bars(self.exit)
+        self.next()
+
+    def notify_order(self, order):
+        if order.status in [order.Submitted, order.Accepted]:
+            return
+        if order.status in [order.Completed]:
+            self.log('%s EXECUTED, %.2f' % ('BUY' if order.isbuy() else 'SELL', order.executed.price))
+            self.bar_executed = len(self)
+        elif order.status in [order.Canceled, order.Margin, order.Rejected]:
+            self.log('Order Canceled/Margin/Rejected')
+        self.order = None
+
+    def next(self):
+        if self.order:
+            return
+        if not self.position:
+            if self._fires(self.entry, self._entry_bars):
+                self.log('BUY CREATE, %.2f' % self.data.close[0])
+                self.order = self.buy()
+        else:
+            held = self.p.hold_bars is not None and len(self) >= self.bar_executed + self.p.hold_bars
+            if held or self._fires(self.exit, self._exit_bars):
+                self.log('SELL CREATE, %.2f' % self.data.close[0])
+                self.order = self.sell()
+
+
+class ConsecutiveDownHold(RuleStrategy):
+    """6_sell_strategy.py 와 같은 규칙: 2일 연속 하락 종가에 매수, 체결 5바 후 매도"""
+    params = (('hold_bars', 5),)
+
+    def entry_rule(self):
+        return falling(self.data.close, 2)
+
+
+class SmaCloseCross(RuleStrategy):
+    """8.indicators.py 와 같은 규칙: 종가 > SMA 이면 매수, 종가 < SMA 이면 매도"""
+    params = (('maperiod', 15),)
+
+    def entry_rule(self):
+        self.sma = bt.indicators.SMA(self.data, period=self.p.maperiod)
+        return self.data.close > self.sma
+
+    def exit_rule(self):
+        return self.data.close < self.sma
+
+
+# (규칙 전략, 튜토리얼 파일, 초기 현금, 고정 수량)
+EQUIVALENTS = [
+    (ConsecutiveDownHold, '6_sell_strategy.py', 100000.0, None),
+    (SmaCloseCross, '8.indicators.py', 1000.0, 10),
+]
+
+
+# 실행 모드별 Cerebro 옵션 (규칙 전략은 모든 모드에서 같은 결과여야 한다)
+MODES = (
+    ('runonce', {}),
+    ('next', {'runonce': False}),
+    ('no-preload', {'preload': False}),
+)
+
+
+def run_once(strategy_cls, cash, stake, datapath=DATAPATH,
+             fromdate=datetime.datetime(2000, 1, 1), todate=datetime.datetime(2000, 12, 31),
+             **cerebro_kwargs):
+    cerebro = bt.Cerebro(stdstats=False, **cerebro_kwargs)
+    cerebro.adddata(bt.feeds.YahooFinanceCSVData(
+        dataname=datapath, fromdate=fromdate, todate=todate, reverse=False))
+    cerebro.addstrategy(strategy_cls)
+    cerebro.addanalyzer(bt.analyzers.TradeAnalyzer, _name='trades')
+    cerebro.broker.setcash(cash)
+    if stake is not None:
+        cerebro.addsizer(bt.sizers.FixedSize, stake=stake)
+    t0 = time.perf_counter()
+    strat = cerebro.run()[0]
+    elapsed = time.perf_counter() - t0
+    trades = strat.analyzers.trades.get_analysis().get('total', {}).get('total', 0)
+    return cerebro.broker.getvalue(), trades, elapsed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='선언형 시그널 전략 vs 튜토리얼 전략 비교')
+    parser.add_argument('--from', dest='fromdate', default='2000-01-01')
+    parser.add_argument('--to', dest='todate', default='2000-12-31')
+    args = parser.parse_args()
+    fromdate = datetime.datetime.strptime(args.fromdate, '%Y-%m-%d')
+    todate = datetime.datetime.strptime(args.todate, '%Y-%m-%d')
+
+    print("="*70)
+    for rule_cls, filename, cash, stake in EQUIVALENTS:
+        tutorial_cls = quiet_strategy(load_strategy_class(filename))
+        for label, cls in ((os.path.splitext(filename)[0], tutorial_cls), (rule_cls.__name__, rule_cls)):
+            for mode, kwargs in MODES:
+                value, trades, elapsed = run_once(cls, cash, stake, fromdate=fromdate, todate=todate, **kwargs)
+                print(f"   {label:<22} {mode:<10} final {value:12.2f}  trades {trades:4}  {elapsed * 1000:8.1f} ms")
+    print("="*70)
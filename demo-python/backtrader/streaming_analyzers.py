@@ -0,0 +1,198 @@
+import math
+import backtrader as bt
+
+# ----------------------------------------------------------------------
+# 스트리밍(증분) 성과 분석기
+# - 바(Bar)마다 O(1) 연산, 상수 메모리만 사용한다.
+# - 자산 곡선(equity series) 전체를 저장하지 않으므로 긴 최적화 스윕에서도
+#   실행마다 풍부한 지표를 보고할 수 있다.
+# ----------------------------------------------------------------------
+
+class RunningStats(object):
+    """Welford 알고리즘으로 평균/분산을 누적 계산하는 헬퍼"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, x):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+
+    @property
+    def variance(self):
+        # 표본 분산 (n-1)
+        if self.count < 2:
+            return 0.0
+        return self.m2 / (self.count - 1)
+
+    @property
+    def stddev(self):
+        return math.sqrt(self.variance)
+
+
+class RunningDrawDown(object):
+    """최고점(peak) 및 최대 낙폭(MDD)을 누적 계산하는 헬퍼"""
+
+    def __init__(self):
+        self.peak = None
+        self.drawdown = 0.0      # 현재 낙폭 (%)
+        self.max_drawdown = 0.0  # 최대 낙폭 (%)
+        self.length = 0          # 현재 낙폭 지속 기간 (바 수)
+        self.max_length = 0      # 최대 낙폭 지속 기간 (바 수)
+
+    def add(self, value):
+        if self.peak is None or value >= self.peak:
+            self.peak = value
+            self.drawdown = 0.0
+            self.length = 0
+            return
+
+        self.length += 1
+        self.drawdown = 100.0 * (self.peak - value) / self.peak if self.peak else 0.0
+        if self.drawdown > self.max_drawdown:
+            self.max_drawdown = self.drawdown
+        if self.length > self.max_length:
+            self.max_length = self.length
+
+
+class StreamingReturns(bt.Analyzer):
+    """총 수익률, 연환산 수익률, 바 단위 수익률의 평균/표준편차, 샤프 비율"""
+    params = (
+        ('riskfreerate', 0.0),   # 연간 무위험 수익률
+        ('annualize', 252),      # 연환산 계수 (일봉 기준 252 거래일)
+    )
+
+    def start(self):
+        self._stats = RunningStats()
+        self._start_value = None
+        self._last_value = None
+
+    def notify_cashvalue(self, cash, value):
+        if self._start_value is None:
+            self._start_value = value
+        elif self._last_value:
+            self._stats.add(value / self._last_value - 1.0)
+        self._last_value = value
+
+    def get_analysis(self):
+        stats = self._stats
+        rets = self.rets
+        rets['bars'] = stats.count
+        if not self._start_value:
+            rets['total_return'] = rets['annual_return'] = 0.0
+            rets['mean'] = rets['stddev'] = 0.0
+            rets['sharpe'] = None
+            return rets
+
+        total = self._last_value / self._start_value
+        rets['total_return'] = (total - 1.0) * 100.0
+        if stats.count and total > 0:
+            rets['annual_return'] = (total ** (self.p.annualize / stats.count) - 1.0) * 100.0
+        else:
+            rets['annual_return'] = 0.0
+
+        rets['mean'] = stats.mean
+        rets['stddev'] = stats.stddev
+        # 바 단위 무위험 수익률로 환산 후 샤프 비율 계산
+        rf = (1.0 + self.p.riskfreerate) ** (1.0 / self.p.annualize) - 1.0
+        if rets['stddev'] > 0:
+            rets['sharpe'] = (stats.mean - rf) / rets['stddev'] * math.sqrt(self.p.annualize)
+        else:
+            rets['sharpe'] = None
+        return rets
+
+
+class StreamingDrawDown(bt.Analyzer):
+    """실행 중 최고점, 현재/최대 낙폭, 낙폭 지속 기간"""
+
+    def start(self):
+        self._dd = RunningDrawDown()
+
+    def notify_cashvalue(self, cash, value):
+        self._dd.add(value)
+
+    def get_analysis(self):
+        dd = self._dd
+        self.rets['peak'] = dd.peak
+        self.rets['drawdown'] = dd.drawdown
+        self.rets['max_drawdown'] = dd.max_drawdown
+        self.rets['length'] = dd.length
+        self.rets['max_length'] = dd.max_length
+        return self.rets
+
+
+class StreamingExposure(bt.Analyzer):
+    """포지션 보유 바 비율(익스포저)과 거래 통계"""
+
+    def start(self):
+        self._bars = 0
+        self._bars_in_market = 0
+        self._trades = 0
+        self._won = 0
+        self._pnl = 0.0
+
+    def next(self):
+        self._bars += 1
+        # 전략의 브로커 기준으로 하나라도 포지션이 있으면 시장 참여 중
+        broker = self.strategy.broker
+        for data in self.strategy.datas:
+            if broker.getposition(data).size:
+                self._bars_in_market += 1
+                break
+
+    def notify_trade(self, trade):
+        if not trade.isclosed:
+            return
+        self._trades += 1
+        self._pnl += trade.pnlcomm
+        if trade.pnlcomm > 0:
+            self._won += 1
+
+    def get_analysis(self):
+        self.rets['bars'] = self._bars
+        self.rets['bars_in_market'] = self._bars_in_market
+        self.rets['exposure'] = 100.0 * self._bars_in_market / self._bars if self._bars else 0.0
+        self.rets['trades'] = self._trades
+        self.rets['won'] = self._won
+        self.rets['win_rate'] = 100.0 * self._won / self._trades if self._trades else 0.0
+        self.rets['net_pnl'] = self._pnl
+        return self.rets
+
+
+def add_streaming_analyzers(cerebro, **kwargs):
+    """Cerebro에 스트리밍 분석기 3종을 등록한다 (kwargs는 StreamingReturns 파라미터)"""
+    cerebro.addanalyzer(StreamingReturns, _name='returns', **kwargs)
+    cerebro.addanalyzer(StreamingDrawDown, _name='drawdown')
+    cerebro.addanalyzer(StreamingExposure, _name='exposure')
+
+
+def collect_metrics(strategy):
+    """실행이 끝난 전략에서 스트리밍 분석 결과를 평평한 dict로 모은다"""
+    returns = strategy.analyzers.returns.get_analysis()
+    drawdown = strategy.analyzers.drawdown.get_analysis()
+    exposure = strategy.analyzers.exposure.get_analysis()
+    return {
+        'total_return': returns['total_return'],
+        'annual_return': returns['annual_return'],
+        'sharpe': returns['sharpe'],
+        'max_drawdown': drawdown['max_drawdown'],
+        'max_drawdown_len': drawdown['max_length'],
+        'exposure': exposure['exposure'],
+        'trades': exposure['trades'],
+        'win_rate': exposure['win_rate'],
+    }
+
+
+def print_metrics(metrics):
+    """collect_metrics 결과를 보기 좋게 출력"""
+    sharpe = metrics['sharpe']
+    print(f"Total Return    : {metrics['total_return']:.2f}%")
+    print(f"Annual Return   : {metrics['annual_return']:.2f}%")
+    print(f"Sharpe Ratio    : {sharpe:.3f}" if sharpe is not None else "Sharpe Ratio    : N/A")
+    print(f"Max Drawdown    : {metrics['max_drawdown']:.2f}% ({metrics['max_drawdown_len']} bars)")
+    print(f"Exposure        : {metrics['exposure']:.2f}%")
+    print(f"Trades          : {metrics['trades']} (승률 {metrics['win_rate']:.1f}%)")
@@ -0,0 +1,405 @@
+# sweep_cluster.py 파일
+# 여러 머신에 최적화 스윕을 분산하는 코디네이터 / 워커
+# - 코디네이터: 파라미터 공간을 작업(job, 파라미터 묶음)으로 나누고 TCP 로 배포, 결과 수집
+# - 워커: 아무 호스트에서나 코디네이터에 접속해 작업을 받아(pull) 실행하고 결과를 보냄(push)
+# - 워커는 실행 중 하트비트를 보내고, 하트비트가 끊긴 작업은 다른 워커에게 재할당
+# - 외부 서비스 없이 표준 라이브러리(socketserver, JSON 한 줄 프로토콜)만 사용
+# - 기본은 127.0.0.1 에만 바인드. 다른 호스트의 워커를 받으려면 공유 토큰(--token 또는 SWEEP_TOKEN)이
+#   필요하고, 모든 메시지에 같은 토큰이 있어야 처리한다 (평문 전송이므로 신뢰할 수 있는 내부망에서만)
+# - 만료된 임대는 코디네이터 루프가 REAP_INTERVAL 마다 회수 (워커 요청이 없어도 재할당/실패 처리)
+#
+# 코디네이터)  SWEEP_TOKEN=secret python sweep_cluster.py coordinator --host 0.0.0.0 --port 9555 --ticker SPY \
+#                  --param donchian_high_period=10,20,30 --param adx_threshold=20,25
+# 워커)        SWEEP_TOKEN=secret python sweep_cluster.py worker --host 192.168.0.10 --port 9555
+# 로컬 테스트) python sweep_cluster.py coordinator --local-workers 4 --param atr_period=10,14,20
+
+import argparse
+import datetime
+import hmac
+import ipaddress
+import itertools
+import json
+import multiprocessing
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+from collections import deque
+
+# demo-python 폴더의 공용 모듈(util 등)을 import 하기 위한 경로 추가
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from util.params import parse_param
+
+DEFAULT_PORT = 9555
+HEARTBEAT_INTERVAL = 5.0     # 워커 하트비트 주기(초)
+LEASE_TIMEOUT = 20.0         # 이 시간 동안 하트비트가 없으면 작업 재할당
+MAX_ATTEMPTS = 3             # 작업당 최대 할당 횟수
+REAP_INTERVAL = 1.0          # 코디네이터가 만료된 임대를 회수하는 주기(초)
+STATUS_INTERVAL = 10.0       # 진행 상황 출력 주기(초)
+TOKEN_ENV = 'SWEEP_TOKEN'    # 공유 토큰 환경 변수
+
+
+# ----------------------------------------------------------------------
+# 프로토콜: 요청마다 새 연결, JSON 한 줄 요청 → JSON 한 줄 응답
+# ----------------------------------------------------------------------
+
+def request(address, message, timeout=30.0, token=None):
+    """코디네이터에 메시지 1개를 보내고 응답 dict 를 받는다 (token 이 있으면 메시지에 포함)"""
+    if token:
+        message = dict(message, token=token)
+    with socket.create_connection(address, timeout=timeout) as sock:
+        sock.sendall(json.dumps(message).encode('utf-8') + b'\n')
+        with sock.makefile('rb') as stream:
+            line = stream.readline()
+    if not line:
+        raise ConnectionError('코디네이터 응답 없음')
+    reply = json.loads(line)
+    if reply.get('type') == 'unauthorized':
+        raise PermissionError('코디네이터가 토큰을 거부했습니다 (--token / %s 확인)' % TOKEN_ENV)
+    return reply
+
+
+def is_loopback(host):
+    """루프백 주소(또는 localhost)인지"""
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def expand_grid(grid, shard_size=4):
+    """{이름: [값...]} 그리드를 파라미터 dict 목록으로 펼친 뒤 shard_size 개씩 묶는다"""
+    names = sorted(grid)
+    combos = [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+    return [combos[i:i + shard_size] for i in range(0, len(combos), shard_size)]
+
+
+class JobBoard(object):
+    """대기/임대(lease)/완료 상태를 관리하는 작업 게시판 (스레드 안전)"""
+
+    def __init__(self, shards, lease_timeout=LEASE_TIMEOUT, max_attempts=MAX_ATTEMPTS):
+        self.jobs = dict(enumerate(shards))
+        self.pending = deque(self.jobs)
+        self.leases = {}       # job_id -> (worker, 만료 시각)
+        self.attempts = dict.fromkeys(self.jobs, 0)
+        self.results = {}      # job_id -> [(score, params, metrics), ...]
+        self.failed = {}       # job_id -> 마지막 오류 메시지
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max_attempts
+        self.finished = threading.Event()
+        self._lock = threading.Lock()
+        if not self.jobs:
+            self.finished.set()
+
+    def _reap(self, now):
+        # 하트비트가 끊긴 작업을 대기열 앞으로 되돌림
+        for job_id, (worker, deadline) in list(self.leases.items()):
+            if deadline < now:
+                del self.leases[job_id]
+                self._requeue(job_id, '%s 하트비트 끊김' % worker)
+
+    def _requeue(self, job_id, reason):
+        if self.attempts[job_id] >= self.max_attempts:
+            self.failed[job_id] = reason
+            self._check_finished()
+        else:
+            self.pending.appendleft(job_id)
+
+    def _check_finished(self):
+        if len(self.results) + len(self.failed) == len(self.jobs):
+            self.finished.set()
+
+    def lease(self, worker):
+        """다음 작업을 임대. (job_id, 파라미터 목록) 또는 남은 작업이 없으면 None"""
+        with self._lock:
+            self._reap(time.time())
+            while self.pending:
+                job_id = self.pending.popleft()
+                if job_id in self.results or job_id in self.failed:
+                    continue
+                self.attempts[job_id] += 1
+                self.leases[job_id] = (worker, time.time() + self.lease_timeout)
+                return job_id, self.jobs[job_id]
+            return None
+
+    def heartbeat(self, worker, job_id):
+        """임대 연장. 이미 다른 워커에게 넘어갔거나 끝난 작업이면 False"""
+        with self._lock:
+            lease = self.leases.get(job_id)
+            if lease is None or lease[0] != worker:
+                return False
+            self.leases[job_id] = (worker, time.time() + self.lease_timeout)
+            return True
+
+    def complete(self, worker, job_id, rows):
+        with self._lock:
+            self.leases.pop(job_id, None)
+            # 재할당된 작업은 먼저 도착한 결과를 사용
+            if job_id not in self.results and job_id not in self.failed:
+                self.results[job_id] = rows
+                self._check_finished()
+
+    def fail(self, worker, job_id, error):
+        with self._lock:
+            if self.leases.get(job_id, (None,))[0] == worker:
+                del self.leases[job_id]
+                self._requeue(job_id, error)
+
+    def reap(self):
+        """만료된 임대 회수 (코디네이터 루프에서 주기적으로 호출)"""
+        with self._lock:
+            self._reap(time.time())
+
+    def status(self):
+        with self._lock:
+            self._reap(time.time())
+            return {'jobs': len(self.jobs), 'pending': len(self.pending),
+                    'running': len(self.leases), 'done': len(self.results),
+                    'failed': len(self.failed)}
+
+    def idle(self):
+        """대기 작업은 없지만 실행 중인 작업이 남았는지 (워커는 잠시 후 다시 요청)"""
+        with self._lock:
+            return not self.pending and not self.finished.is_set()
+
+
+class CoordinatorHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+        try:
+            reply = self.server.dispatch(json.loads(line))
+        except Exception as e:
+            reply = {'type': 'error', 'error': str(e)}
+        self.wfile.write(json.dumps(reply).encode('utf-8') + b'\n')
+
+
+class Coordinator(socketserver.ThreadingTCPServer):
+    """작업 게시판을 TCP 로 노출하는 코디네이터"""
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, board, config, host='127.0.0.1', port=DEFAULT_PORT, token=None):
+        if not token and not is_loopback(host):
+            raise ValueError('외부 주소(%s)에 바인드하려면 공유 토큰이 필요합니다 (--token / %s).'
+                             % (host, TOKEN_ENV))
+        socketserver.ThreadingTCPServer.__init__(self, (host, port), CoordinatorHandler)
+        self.board = board
+        self.config = config
+        self.token = token
+
+    def dispatch(self, message):
+        if self.token and not hmac.compare_digest(str(message.get('token', '')), self.token):
+            return {'type': 'unauthorized'}
+        kind = message.get('type')
+        worker = message.get('worker', '?')
+        if kind == 'hello':
+            return {'type': 'config', 'config': self.config,
+                    'heartbeat': min(HEARTBEAT_INTERVAL, self.board.lease_timeout / 3.0)}
+        if kind == 'get':
+            leased = self.board.lease(worker)
+            if leased is not None:
+                job_id, params = leased
+                return {'type': 'job', 'job_id': job_id, 'params': params}
+            if self.board.idle():
+                return {'type': 'wait', 'delay': 1.0}
+            return {'type': 'done'}
+        if kind == 'heartbeat':
+            alive = self.board.heartbeat(worker, message['job_id'])
+            return {'type': 'ok' if alive else 'cancel'}
+        if kind == 'result':
+            self.board.complete(worker, message['job_id'], message['rows'])
+            return {'type': 'ok'}
+        if kind == 'error':
+            self.board.fail(worker, message['job_id'], message['error'])
+            return {'type': 'ok'}
+        if kind == 'status':
+            return dict(self.board.status(), type='status')
+        return {'type': 'error', 'error': 'unknown message type %r' % kind}
+
+
+# ----------------------------------------------------------------------
+# 워커
+# ----------------------------------------------------------------------
+
+class Heartbeat(threading.Thread):
+    """작업 실행 중 주기적으로 임대를 연장하는 스레드"""
+
+    def __init__(self, address, worker, job_id, interval, token=None):
+        threading.Thread.__init__(self, daemon=True)
+        self.address = address
+        self.token = token
+        self.worker = worker
+        self.job_id = job_id
+        self.interval = interval
+        self.cancelled = False
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                reply = request(self.address, {'type': 'heartbeat', 'worker': self.worker,
+                                               'job_id': self.job_id}, token=self.token)
+            except OSError:
+                continue   # 일시적인 네트워크 오류는 다음 주기에 재시도
+            if reply.get('type') == 'cancel':
+                self.cancelled = True
+                return
+
+    def stop(self):
+        self._stop_event.set()
+
+
+def prepare_worker(config):
+    """코디네이터 설정대로 데이터를 한 번만 받아 평가 함수(turtle_optimizer.evaluate)를 준비"""
+    import turtle_optimizer
+    from turtle_strategy import load_history
+
+    df = load_history(config['ticker'],
+                      datetime.datetime.strptime(config['fromdate'], '%Y-%m-%d'),
+                      datetime.datetime.strptime(config['todate'], '%Y-%m-%d'))
+    if len(df) == 0:
+        raise ValueError('%s 데이터를 가져오지 못했습니다.' % config['ticker'])
+    turtle_optimizer._init_worker(df, config['ticker'], config['cash'], config['commission'],
+                                  config['metric'], config.get('prune'))
+    return turtle_optimizer.evaluate
+
+
+def run_worker(host='127.0.0.1', port=DEFAULT_PORT, name=None, verbose=True, token=None):
+    """작업이 모두 끝날 때까지 작업을 받아 실행. 처리한 작업 수 반환"""
+    address = (host, port)
+    worker = name or '%s-%d' % (socket.gethostname(), os.getpid())
+    hello = request(address, {'type': 'hello', 'worker': worker}, token=token)
+    evaluate = prepare_worker(hello['config'])
+
+    processed = 0
+    while True:
+        reply = request(address, {'type': 'get', 'worker': worker}, token=token)
+        if reply['type'] == 'done':
+            break
+        if reply['type'] == 'wait':
+            time.sleep(reply['delay'])
+            continue
+
+        job_id = reply['job_id']
+        heartbeat = Heartbeat(address, worker, job_id, hello['heartbeat'], token)
+        heartbeat.start()
+        try:
+            rows = []
+            for params in reply['params']:
+                if heartbeat.cancelled:
+                    break
+                score, metrics = evaluate(params)
+                rows.append((score, params, metrics))
+        except Exception as e:
+            heartbeat.stop()
+            request(address, {'type': 'error', 'worker': worker, 'job_id': job_id, 'error': str(e)},
+                    token=token)
+            continue
+        heartbeat.stop()
+
+        if heartbeat.cancelled:
+            continue   # 다른 워커에게 재할당된 작업: 결과를 버림
+        request(address, {'type': 'result', 'worker': worker, 'job_id': job_id, 'rows': rows},
+                token=token)
+        processed += 1
+        if verbose:
+            print(f"   [{worker}] job {job_id} 완료 ({len(rows)}개)")
+    return processed
+
+
+def _local_worker(host, port, name, token):
+    run_worker(host, port, name, verbose=False, token=token)
+
+
+# ----------------------------------------------------------------------
+# 코디네이터 실행
+# ----------------------------------------------------------------------
+
+def run_coordinator(grid, config, host='127.0.0.1', port=DEFAULT_PORT, shard_size=4,
+                    local_workers=0, lease_timeout=LEASE_TIMEOUT, verbose=True, token=None):
+    """스윕을 배포하고 모든 작업이 끝나면 점수 내림차순 (점수, 파라미터, 지표) 목록 반환"""
+    board = JobBoard(expand_grid(grid, shard_size), lease_timeout=lease_timeout)
+    server = Coordinator(board, config, host, port, token)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    if verbose:
+        print(f"🚀 스윕 코디네이터 시작: {host}:{server.server_address[1]} "
+              f"(작업 {len(board.jobs)}개, 작업당 {shard_size}개 조합)")
+
+    # 로컬 테스트용 워커 프로세스
+    processes = [
+        multiprocessing.Process(target=_local_worker, daemon=True,
+                                args=('127.0.0.1', server.server_address[1], 'local-%d' % i, token))
+        for i in range(local_workers)
+    ]
+    for process in processes:
+        process.start()
+
+    try:
+        last_status = time.time()
+        while not board.finished.wait(REAP_INTERVAL):
+            # 워커가 모두 죽어 요청이 끊겨도 만료된 임대를 회수해 재할당/실패 처리
+            board.reap()
+            if verbose and time.time() - last_status >= STATUS_INTERVAL:
+                last_status = time.time()
+                print(f"   진행 상황: {board.status()}")
+        # 워커들이 'done' 응답을 받을 수 있도록 잠시 더 서비스
+        for process in processes:
+            process.join(timeout=2 * HEARTBEAT_INTERVAL)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    if board.failed and verbose:
+        print(f"!! 실패한 작업 {len(board.failed)}개: {board.failed}")
+    rows = [row for job_rows in board.results.values() for row in job_rows]
+    return sorted(rows, key=lambda row: -row[0])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='분산 최적화 스윕 (코디네이터/워커)')
+    sub = parser.add_subparsers(dest='role', required=True)
+
+    c = sub.add_parser('coordinator')
+    c.add_argument('--host', default='127.0.0.1', help='외부 주소에 바인드하려면 --token 필요')
+    c.add_argument('--port', type=int, default=DEFAULT_PORT)
+    c.add_argument('--ticker', default='SPY')
+    c.add_argument('--from', dest='fromdate', default='2015-01-01')
+    c.add_argument('--to', dest='todate', default='2025-11-04')
+    c.add_argument('--cash', type=float, default=100000.0)
+    c.add_argument('--commission', type=float, default=0.001)
+    c.add_argument('--metric', default='sharpe')
+    c.add_argument('--param', action='append', default=[], type=parse_param,
+                   help='name=v1,v2,... (여러 번 지정 가능)')
+    c.add_argument('--shard-size', type=int, default=4)
+    c.add_argument('--lease-timeout', type=float, default=LEASE_TIMEOUT)
+    c.add_argument('--local-workers', type=int, default=0, help='로컬 워커 프로세스 수 (테스트용)')
+    c.add_argument('--top', type=int, default=10)
+    c.add_argument('--token', default=os.environ.get(TOKEN_ENV), help='공유 토큰 (기본: $%s)' % TOKEN_ENV)
+
+    w = sub.add_parser('worker')
+    w.add_argument('--host', default='127.0.0.1')
+    w.add_argument('--port', type=int, default=DEFAULT_PORT)
+    w.add_argument('--name', default=None)
+    w.add_argument('--token', default=os.environ.get(TOKEN_ENV), help='공유 토큰 (기본: $%s)' % TOKEN_ENV)
+
+    args = parser.parse_args()
+    if args.role == 'worker':
+        run_worker(args.host, args.port, args.name, token=args.token)
+    else:
+        config = {'ticker': args.ticker, 'fromdate': args.fromdate, 'todate': args.todate,
+                  'cash': args.cash, 'commission': args.commission, 'metric': args.metric}
+        rows = run_coordinator(dict(args.param), config, args.host, args.port, args.shard_size,
+                               args.local_workers, args.lease_timeout, token=args.token)
+        print("="*70)
+        for score, params, metrics in rows[:args.top]:
+            print(f"   {args.metric}={score:.4f}  return={metrics['total_return']:.2f}%  {params}")
+        print("="*70)
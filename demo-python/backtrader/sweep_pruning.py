@@ -0,0 +1,156 @@
+import math
+import backtrader as bt
+
+from streaming_analyzers import RunningDrawDown, collect_metrics
+from turtle_strategy import TurtleStrategy, build_cerebro
+
+# ----------------------------------------------------------------------
+# 최적화 스윕용 조기 중단(pruning)
+# - 바마다 중단 조건(최대 낙폭, N 바 이후에도 거래 없음)을 증분 검사
+# - 조건을 만족하면 cerebro.runstop() 으로 나머지 구간을 실행하지 않음
+# - runonce 에서는 지표를 전체 구간에 대해 먼저 계산하므로 runstop 이 줄이는 것은 전략 루프뿐
+#   → gate=True 면 앞 구간(trade_deadline + 워밍업)을 먼저 실행해 그 안의 중단은 지표 계산까지 줄인다
+#   ORCL 1995-2014 (5000 바), 랜덤 Turtle 후보 30개(3회 중 최소), trade_deadline=500 에서 16개 중단:
+#   · 중단되는 후보: 전체 실행 0.57s, runstop 0.19s, 앞 구간에서 중단 0.07s
+#   · 끝까지 가는 후보: 0.66s, 앞 구간 추가 시 0.73s, next 모드(runonce=False) 는 약 4배 느림
+#   → 앞 구간 실행의 손익분기는 앞 구간 중단 비율 약 36% (이 예: 53%, 후보 30개 합계 약 1s 절감)
+#   next 모드는 쓰지 않고, 앞 구간은 중단 비율이 높을 때만 쓴다 (gate_pays)
+# ----------------------------------------------------------------------
+
+DEFAULT_PRUNE = {
+    'max_drawdown': 50.0,     # 낙폭(%)이 이 값을 넘으면 중단
+    'min_trades': 1,          # trade_deadline 바까지 필요한 최소 거래 수
+    'trade_deadline': 500,    # 거래 수를 검사하는 시점 (바 수, None 이면 검사 안 함)
+}
+
+# 거래 수 조건을 먼저 검사하는 앞 구간 = trade_deadline + 전략 워밍업 여유 (바 수)
+# (EarlyAbort 는 전략 최소 기간 이후부터 바를 센다. TURTLE_SPACE 의 최장 기간 ema_period=200)
+GATE_WARMUP = 250
+# 앞 구간 실행을 쓰기 시작하는 조건: 평가 GATE_MIN_RUNS 회 이후, 앞 구간 안에서 중단된 비율
+GATE_MIN_RUNS = 10
+GATE_MIN_RATE = 0.4
+
+
+class EarlyAbort(bt.Analyzer):
+    """중단 조건을 만족하면 실행을 멈추고 pruned/reason/bar 를 기록하는 분석기"""
+    params = (
+        ('max_drawdown', 50.0),
+        ('min_trades', 1),
+        ('trade_deadline', None),
+    )
+
+    def start(self):
+        self._dd = RunningDrawDown()
+        self._bars = 0
+        self._trades = 0
+        self._reason = None
+
+    def notify_cashvalue(self, cash, value):
+        self._dd.add(value)
+
+    def notify_trade(self, trade):
+        if trade.justopened:
+            self._trades += 1
+
+    def next(self):
+        if self._reason is not None:
+            return
+        self._bars += 1
+
+        if self.p.max_drawdown is not None and self._dd.drawdown > self.p.max_drawdown:
+            self._reason = 'drawdown %.1f%% > %.1f%%' % (self._dd.drawdown, self.p.max_drawdown)
+        elif (self.p.trade_deadline is not None and self._bars >= self.p.trade_deadline
+              and self._trades < self.p.min_trades):
+            self._reason = '%d bars, trades %d < %d' % (self._bars, self._trades, self.p.min_trades)
+
+        if self._reason is not None:
+            self.strategy.env.runstop()
+
+    def get_analysis(self):
+        self.rets['pruned'] = self._reason is not None
+        self.rets['reason'] = self._reason
+        self.rets['bar'] = self._bars
+        return self.rets
+
+
+def add_early_abort(cerebro, **criteria):
+    """Cerebro 에 EarlyAbort 분석기를 'prune' 이름으로 등록 (criteria 는 DEFAULT_PRUNE 기준 덮어쓰기)"""
+    cerebro.addanalyzer(EarlyAbort, _name='prune', **dict(DEFAULT_PRUNE, **criteria))
+
+
+def prefix(df, bars):
+    """DataFrame 또는 {라인: ndarray} dict 의 앞 bars 개 행"""
+    if bars is None:
+        return df
+    if hasattr(df, 'iloc'):
+        return df.iloc[:bars]
+    return {name: column[:bars] for name, column in df.items()}
+
+
+def data_length(df):
+    if hasattr(df, 'iloc'):
+        return len(df)
+    return len(df['datetime'])
+
+
+def _run(df, ticker, cash, commission, prune, strategy, **params):
+    cerebro = build_cerebro(df, ticker, cash, commission, strategy, lean=True, **params)
+    if prune is not None:
+        add_early_abort(cerebro, **prune)
+    strat = cerebro.run()[0]
+
+    metrics = collect_metrics(strat)
+    metrics['final_value'] = cerebro.broker.getvalue()
+    if prune is not None:
+        result = strat.analyzers.prune.get_analysis()
+        metrics['pruned'] = result['pruned']
+        metrics['prune_reason'] = result['reason']
+        metrics['bars_run'] = result['bar']
+    else:
+        metrics['pruned'] = False
+    return metrics
+
+
+def gate_bars(prune):
+    """앞 구간 길이 (trade_deadline 이 없으면 None)"""
+    deadline = prune.get('trade_deadline') if prune is not None else None
+    return None if deadline is None else deadline + GATE_WARMUP
+
+
+def gate_pays(runs, early):
+    """평가 runs 회 중 early 회가 앞 구간 안에서 중단됐을 때 앞 구간 실행이 이득인지"""
+    return runs >= GATE_MIN_RUNS and early >= runs * GATE_MIN_RATE
+
+
+def run_pruned(df, ticker, cash=100000.0, commission=0.001, prune=None, bars=None,
+               strategy=TurtleStrategy, gate=False, **params):
+    """린 프로파일 + 조기 중단으로 백테스트 1회 실행 후 지표 dict 반환 (pruned/prune_reason 포함)
+
+    gate=True: 앞 gate_bars(prune) 바에서 먼저 실행하고 그 안에서 중단되면 그 결과를 쓴다
+    (지표는 과거 값만 쓰므로 전체 실행의 같은 바에서 중단된 결과와 같음)
+    """
+    df = prefix(df, bars)
+    gated = gate_bars(prune) if gate else None
+    if gated is not None and data_length(df) > gated:
+        metrics = _run(prefix(df, gated), ticker, cash, commission, prune,
+                       strategy, **params)
+        if metrics['pruned']:
+            return metrics
+    return _run(df, ticker, cash, commission, prune, strategy, **params)
+
+
+def halving_rungs(n_candidates, eta=3, min_fraction=1.0 / 9):
+    """successive halving 단계별 (데이터 비율, 살아남는 후보 수) 목록"""
+    rungs = []
+    fraction = min_fraction
+    survivors = n_candidates
+    while True:
+        fraction = min(fraction, 1.0)
+        rungs.append((fraction, survivors))
+        if fraction >= 1.0 or survivors <= 1:
+            break
+        fraction *= eta
+        survivors = max(1, int(math.ceil(survivors / float(eta))))
+    # 마지막 단계는 항상 전체 구간
+    rungs[-1] = (1.0, rungs[-1][1])
+    return rungs
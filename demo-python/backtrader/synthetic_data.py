@@ -0,0 +1,53 @@
+import datetime
+import numpy as np
+
+# ----------------------------------------------------------------------
+# 벤치마크용 시드 고정 합성 OHLCV 데이터
+# - NumpyData 에 바로 넣을 수 있는 {라인: ndarray} dict 를 만든다
+# - 가격은 ANCHOR 봉마다 시작 가격으로 돌아오는 브라운 브리지 (긴 데이터에서도 가격 범위 일정)
+# - 날짜는 평일만 사용 (100만 봉도 datetime 범위 안에 들어가도록 pandas 를 쓰지 않음)
+# ----------------------------------------------------------------------
+
+START = datetime.date(2000, 1, 3)  # 월요일
+# 가격을 시작 가격으로 되돌리는 주기 (봉). 누적 추세가 없어 100만 봉에서도 가격이 폭주/소멸하지 않고
+# 구간 안에서는 추세/되돌림이 있어 매매 빈도가 데이터 길이에 비례한다
+ANCHOR = 1000
+
+
+def make_synthetic_ohlcv(n, seed=42, start=START, price=100.0, drift=0.0, vol=0.015, anchor=ANCHOR):
+    """기하 브라운 운동 기반 일봉 n 개 생성 (seed 가 같으면 항상 같은 데이터)
+
+    anchor 봉마다 로그 가격이 시작 가격으로 돌아오는 브라운 브리지로 만들어
+    데이터 길이와 무관하게 가격 범위가 일정하다 (anchor=None 이면 순수 GBM, drift 는 이때만 의미 있음).
+    """
+    rng = np.random.default_rng(seed)
+    steps = rng.normal(drift, vol, n)
+    if anchor:
+        # 구간마다 누적합에서 끝점 값의 선형 성분을 빼면 구간 양 끝이 0 인 브리지가 된다
+        blocks = -(-n // anchor)
+        walk = np.cumsum(np.concatenate([steps, np.zeros(blocks * anchor - n)]).reshape(blocks, anchor), axis=1)
+        walk -= walk[:, -1:] * (np.arange(1, anchor + 1) / anchor)
+        log_price = walk.ravel()[:n]
+    else:
+        log_price = np.cumsum(steps)
+    close = price * np.exp(log_price)
+    prev_close = np.concatenate(([price], close[:-1]))
+    open_ = prev_close * (1.0 + rng.normal(0.0, vol / 4.0, n))
+    high = np.maximum(open_, close) * (1.0 + np.abs(rng.normal(0.0, vol / 3.0, n)))
+    low = np.minimum(open_, close) * (1.0 - np.abs(rng.normal(0.0, vol / 3.0, n)))
+    volume = rng.integers(100000, 10000000, n).astype('d')
+
+    # 평일 날짜: 5봉마다 7일씩 전진 (backtrader 숫자 날짜 = ordinal)
+    i = np.arange(n)
+    start_monday = start.toordinal() - start.weekday()
+    dates = (start_monday + (i // 5) * 7 + i % 5).astype('d')
+
+    return {
+        'datetime': dates,
+        'open': open_,
+        'high': high,
+        'low': low,
+        'close': close,
+        'volume': volume,
+        'openinterest': np.zeros(n),
+    }
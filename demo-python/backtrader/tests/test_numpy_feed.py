@@ -0,0 +1,90 @@
+import datetime
+import os
+import sys
+
+import backtrader as bt
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from numpy_feed import NumpyData
+from synthetic_data import make_synthetic_ohlcv
+
+# ----------------------------------------------------------------------
+# NumpyData vs PandasData 동등성
+# - 기본 Cerebro(preload + runonce), preload 없는 next 모드 모두에서
+#   바별 OHLCV 와 매매 결과(최종 자산, 거래 수)가 같아야 한다
+# ----------------------------------------------------------------------
+
+BARS = 600
+
+
+class Recorder(bt.Strategy):
+    """바별 OHLCV 를 기록하고 SMA 크로스로 매매 (결과 비교용)"""
+    params = (('period', 20),)
+
+    def __init__(self):
+        self.rows = []
+        self.cross = bt.indicators.CrossOver(self.data.close, bt.indicators.SMA(self.data, period=self.p.period))
+
+    def next(self):
+        d = self.data
+        self.rows.append((d.datetime[0], d.open[0], d.high[0], d.low[0], d.close[0], d.volume[0]))
+        if not self.position and self.cross[0] > 0:
+            self.buy(size=10)
+        elif self.position and self.cross[0] < 0:
+            self.close()
+
+
+def _frame(columns):
+    index = pd.DatetimeIndex([datetime.datetime.fromordinal(int(n)) for n in columns['datetime']])
+    return pd.DataFrame({name.capitalize(): columns[name]
+                         for name in ('open', 'high', 'low', 'close', 'volume')}, index=index)
+
+
+def _run(feed, **kwargs):
+    cerebro = bt.Cerebro(stdstats=False, **kwargs)
+    cerebro.adddata(feed)
+    cerebro.addstrategy(Recorder)
+    cerebro.addanalyzer(bt.analyzers.TradeAnalyzer, _name='trades')
+    cerebro.broker.setcash(100000.0)
+    strat = cerebro.run()[0]
+    trades = strat.analyzers.trades.get_analysis().get('total', {}).get('total', 0)
+    return np.array(strat.rows), cerebro.broker.getvalue(), trades
+
+
+@pytest.mark.parametrize('kwargs', [{}, {'preload': False}, {'runonce': False}],
+                         ids=['default', 'no-preload', 'next-mode'])
+def test_matches_pandas_data(kwargs):
+    df = _frame(make_synthetic_ohlcv(BARS, seed=7))
+    rows, value, trades = _run(NumpyData(dataname=df), **kwargs)
+    expected_rows, expected_value, expected_trades = _run(bt.feeds.PandasData(dataname=df), **kwargs)
+
+    assert len(rows) == len(expected_rows) > 0
+    np.testing.assert_allclose(rows, expected_rows, rtol=0, atol=1e-9)
+    assert trades == expected_trades > 0
+    assert value == pytest.approx(expected_value, abs=1e-6)
+
+
+def test_preload_respects_date_range():
+    df = _frame(make_synthetic_ohlcv(BARS, seed=7))
+    fromdate, todate = df.index[100].to_pydatetime(), df.index[399].to_pydatetime()
+    rows, _, _ = _run(NumpyData(dataname=df, fromdate=fromdate, todate=todate))
+    expected_rows, _, _ = _run(bt.feeds.PandasData(dataname=df, fromdate=fromdate, todate=todate))
+    np.testing.assert_allclose(rows, expected_rows, rtol=0, atol=1e-9)
+
+
+@pytest.mark.parametrize('kwargs', [{}, {'preload': False}, {'runonce': False}],
+                         ids=['default', 'no-preload', 'next-mode'])
+def test_rerun_same_feed(kwargs):
+    # keepsource=False 라도 같은 피드로 다시 실행(cerebro.run 재호출/다른 Cerebro)할 수 있어야 한다
+    df = _frame(make_synthetic_ohlcv(BARS, seed=7))
+    fromdate, todate = df.index[100].to_pydatetime(), df.index[399].to_pydatetime()
+    feed = NumpyData(dataname=df, fromdate=fromdate, todate=todate)
+    first = _run(feed)
+    second = _run(feed, **kwargs)
+
+    np.testing.assert_array_equal(second[0], first[0])
+    assert second[1:] == first[1:]
@@ -0,0 +1,88 @@
+import os
+import sys
+
+import backtrader as bt
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from turtle_strategy import TurtleStrategy, build_cerebro
+
+# ----------------------------------------------------------------------
+# TurtleStrategy 브로커 스탑(StopTrail) 경로
+# - 스탑 체결 알림은 주문 복사본으로 오므로 ref 로 구분되어야 한다
+#   (스탑 체결이 진행 중인 진입/피라미딩 주문을 지우지 않고, stop_order 는 비워져야 함)
+# - 스탑 가격은 한 가지 정의: stop[t] = max(stop[t-1], 종가[t] - 트레일 폭), 초기 손절가 이상
+# ----------------------------------------------------------------------
+
+DATAPATH = os.path.normpath(os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', '..', 'datas', 'yfinance', 'orcl-1995-2014.txt'))
+
+
+class StopRecorder(TurtleStrategy):
+    """스탑 체결 알림과 바별 스탑 가격을 기록"""
+
+    def __init__(self):
+        super(StopRecorder, self).__init__()
+        self.logs = []
+        self.stop_fills = 0
+        self.pending_kept = []   # 스탑 체결 알림 전후의 self.order 가 같은지
+        self.levels = []         # (바, 스탑 가격, 트레일 폭, 종가, 초기 손절가) - 포지션 구간 사이에는 None
+
+    def log(self, txt, dt=None):
+        self.logs.append(txt)
+
+    def notify_order(self, order):
+        pending = self.order
+        stop_fill = order.status == order.Completed and order.exectype == bt.Order.StopTrail
+        super(StopRecorder, self).notify_order(order)
+        if stop_fill:
+            self.stop_fills += 1
+            self.pending_kept.append(self.order is pending)
+            assert self.stop_order is None
+            # 같은 바에 피라미딩 매수가 함께 체결되면 포지션이 남으므로 여기서 구간을 끊는다
+            self.levels.append(None)
+
+    def next(self):
+        super(StopRecorder, self).next()
+        stop = self.stop_order
+        if self.position and stop is not None and stop.alive():
+            self.levels.append((len(self), stop.created.price, stop.trailamount,
+                                self.dataclose[0], self.initial_stop))
+        elif self.levels and self.levels[-1] is not None:
+            self.levels.append(None)
+
+
+@pytest.fixture(scope='module')
+def strat():
+    df = pd.read_csv(DATAPATH, index_col='Date', parse_dates=True)
+    cerebro = build_cerebro(df, 'ORCL', strategy=StopRecorder)
+    return cerebro.run()[0]
+
+
+def test_broker_stop_fills_are_recognised(strat):
+    assert strat.stop_fills > 0
+    assert sum('STOP EXECUTED' in line for line in strat.logs) == strat.stop_fills
+    assert all(strat.pending_kept)
+
+
+def test_stop_level_is_close_ratchet(strat):
+    checked = 0
+    prev = None
+    for row in strat.levels:
+        if row is None:
+            prev = None
+            continue
+        bar, level, trail, close, initial_stop = row
+        if prev is None or prev[0] != bar - 1:
+            # 포지션의 첫 스탑: 초기 손절가와 종가 - 트레일 폭 중 높은 값
+            assert level == pytest.approx(max(initial_stop, close - trail))
+        else:
+            # 교체되지 않았으면 같은 트레일 폭, 교체됐으면 이전/새 트레일 폭 중 높은 값으로 올림
+            _, prev_level, prev_trail, _, _ = prev
+            expected = max(prev_level, close - trail, close - prev_trail if trail != prev_trail else -1e300)
+            assert level == pytest.approx(expected)
+            checked += 1
+        prev = row
+    assert checked > 0
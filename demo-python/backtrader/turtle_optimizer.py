@@ -0,0 +1,312 @@
+import argparse
+import datetime
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+from sweep_pruning import DEFAULT_PRUNE, data_length, gate_bars, gate_pays, halving_rungs, run_pruned
+from turtle_strategy import TurtleStrategy, load_history
+
+# ----------------------------------------------------------------------
+# TurtleStrategy 12차원 파라미터 탐색 최적화기
+# - 전체 그리드 대신 랜덤 / 진화(CMA-ES 스타일) / 대리모델(surrogate) 탐색
+# - 탐색기는 ask(n) → 후보, tell(후보, 점수) 인터페이스로 교체 가능 (pluggable)
+# - 후보를 배치 단위로 프로세스 풀에서 병렬 평가, 총 평가 횟수(budget) 준수
+# - prune: 가망 없는 실행은 도중에 중단, successive_halving: 짧은 구간에서 먼저 걸러냄
+# ----------------------------------------------------------------------
+
+# 파라미터 이름: (최솟값, 최댓값, 정수 여부)
+TURTLE_SPACE = {
+    'donchian_high_period': (10, 60, True),
+    'donchian_low_period': (5, 30, True),
+    'adx_period': (7, 28, True),
+    'adx_threshold': (15.0, 40.0, False),
+    'ema_period': (20, 200, True),
+    'atr_period': (10, 40, True),
+    'atr_multiplier_stop': (1.0, 4.0, False),
+    'atr_multiplier_trail': (0.5, 4.0, False),
+    'atr_multiplier_pyramid': (0.5, 2.0, False),
+    'risk_per_trade': (0.005, 0.05, False),
+    'max_units': (1, 6, True),
+    'adx_decline_days': (1, 6, True),
+}
+
+
+class SearchSpace(object):
+    """단위 입방체 [0, 1]^d 좌표 ↔ 전략 파라미터 dict 변환"""
+
+    def __init__(self, space=TURTLE_SPACE):
+        self.names = list(space)
+        self.bounds = [space[name] for name in self.names]
+        self.dim = len(self.names)
+
+    def decode(self, x):
+        params = {}
+        for name, (low, high, is_int), u in zip(self.names, self.bounds, np.clip(x, 0.0, 1.0)):
+            value = low + u * (high - low)
+            params[name] = int(round(value)) if is_int else float(value)
+        return params
+
+
+class RandomSearch(object):
+    """균일 랜덤 탐색 (기준선)"""
+
+    def __init__(self, dim, seed=None):
+        self.dim = dim
+        self.rng = np.random.default_rng(seed)
+
+    def ask(self, n):
+        return list(self.rng.random((n, self.dim)))
+
+    def tell(self, xs, scores):
+        pass
+
+
+class EvolutionarySearch(object):
+    """대각 공분산 CMA-ES 스타일 진화 탐색 (점수가 클수록 좋음)
+
+    세대마다 평균/축별 표준편차를 상위 mu 개 후보의 가중 평균으로 갱신한다.
+    """
+
+    def __init__(self, dim, seed=None, sigma=0.3, popsize=None):
+        self.dim = dim
+        self.rng = np.random.default_rng(seed)
+        self.mean = np.full(dim, 0.5)
+        self.sigma = np.full(dim, sigma)
+        self.popsize = popsize or 4 + int(3 * math.log(dim))
+        self.mu = self.popsize // 2
+        weights = np.log(self.mu + 0.5) - np.log(np.arange(1, self.mu + 1))
+        self.weights = weights / weights.sum()
+        self._pending_x = []
+        self._pending_s = []
+
+    def ask(self, n):
+        z = self.rng.standard_normal((n, self.dim))
+        return list(np.clip(self.mean + self.sigma * z, 0.0, 1.0))
+
+    def tell(self, xs, scores):
+        self._pending_x.extend(xs)
+        self._pending_s.extend(scores)
+        # 한 세대(popsize) 분량이 모이면 분포 갱신
+        while len(self._pending_x) >= self.popsize:
+            xs = np.array(self._pending_x[:self.popsize])
+            ss = np.array(self._pending_s[:self.popsize])
+            del self._pending_x[:self.popsize]
+            del self._pending_s[:self.popsize]
+
+            elite = xs[np.argsort(-ss)[:self.mu]]
+            new_mean = self.weights @ elite
+            spread = np.sqrt(self.weights @ (elite - self.mean) ** 2)
+            # 표준편차는 완만하게 갱신하고 너무 작아지지 않도록 하한 유지
+            self.sigma = np.clip(0.7 * self.sigma + 0.3 * spread, 0.02, 0.5)
+            self.mean = new_mean
+
+
+class SurrogateSearch(object):
+    """대리모델 탐색: 평가된 점에 대해 거리 가중 k-NN 회귀로 점수를 예측하고,
+    예측 점수 + 탐색 보너스(가장 가까운 평가점까지의 거리)가 높은 후보를 고른다.
+    """
+
+    def __init__(self, dim, seed=None, n_init=None, n_candidates=2000, k=5, explore=1.0):
+        self.dim = dim
+        self.rng = np.random.default_rng(seed)
+        self.n_init = n_init or 2 * dim
+        self.n_candidates = n_candidates
+        self.k = k
+        self.explore = explore
+        self.X = np.empty((0, dim))
+        self.y = np.empty(0)
+
+    def ask(self, n):
+        if len(self.X) < self.n_init:
+            return list(self.rng.random((n, self.dim)))
+
+        # 후보: 절반은 전체 랜덤, 절반은 현재 최고점 주변
+        best = self.X[np.argmax(self.y)]
+        half = self.n_candidates // 2
+        local = np.clip(best + 0.1 * self.rng.standard_normal((half, self.dim)), 0.0, 1.0)
+        cand = np.vstack([self.rng.random((self.n_candidates - half, self.dim)), local])
+
+        # |a-b|^2 = |a|^2 + |b|^2 - 2ab (후보 x 평가점 거리 행렬만 메모리에 생성)
+        sq = (cand ** 2).sum(axis=1)[:, None] + (self.X ** 2).sum(axis=1)[None, :] - 2.0 * cand @ self.X.T
+        dist = np.sqrt(np.maximum(sq, 0.0))
+        k = min(self.k, len(self.X))
+        nearest = np.argpartition(dist, k - 1, axis=1)[:, :k]
+        nd = np.take_along_axis(dist, nearest, axis=1)
+        w = 1.0 / (nd + 1e-9)
+        pred = (w * self.y[nearest]).sum(axis=1) / w.sum(axis=1)
+
+        scale = self.y.std() or 1.0
+        acquisition = pred + self.explore * scale * nd.min(axis=1) * math.sqrt(self.dim)
+
+        chosen = []
+        for i in np.argsort(-acquisition):
+            # 같은 배치 안에서 너무 가까운 후보는 건너뛰어 다양성 확보
+            if all(np.linalg.norm(cand[i] - c) > 0.05 for c in chosen):
+                chosen.append(cand[i])
+            if len(chosen) == n:
+                break
+        return chosen
+
+    def tell(self, xs, scores):
+        self.X = np.vstack([self.X, np.array(xs)])
+        self.y = np.concatenate([self.y, np.array(scores, dtype='d')])
+
+
+SEARCHERS = {
+    'random': RandomSearch,
+    'evolution': EvolutionarySearch,
+    'surrogate': SurrogateSearch,
+}
+
+
+# ----------------------------------------------------------------------
+# 프로세스 풀 평가 (워커마다 데이터는 initializer 로 한 번만 전달)
+# ----------------------------------------------------------------------
+
+_WORKER = {}
+
+# 조기 중단/점수 없는 실행의 점수: -inf 대신 유한한 값이라 정렬/출력/진화 탐색 갱신에 그대로 쓸 수 있다
+PRUNED_SCORE = -1e9
+
+
+def _init_worker(df, ticker, cash, commission, metric, prune=None):
+    _WORKER.update(df=df, ticker=ticker, cash=cash, commission=commission, metric=metric,
+                   prune=prune, runs=0, early=0)
+
+
+def evaluate(params, bars=None):
+    """파라미터 1세트를 앞 bars 개 바(None 이면 전체)로 백테스트 후 (점수, 지표 dict) 반환
+    (점수가 없거나 조기 중단된 실행은 PRUNED_SCORE)
+
+    워커에서 앞 구간 안에 중단되는 비율이 충분히 높아지면 앞 구간부터 실행 (sweep_pruning.gate_pays)
+    """
+    prune = _WORKER['prune']
+    metrics = run_pruned(
+        _WORKER['df'], _WORKER['ticker'], cash=_WORKER['cash'], commission=_WORKER['commission'],
+        prune=prune, bars=bars, gate=gate_pays(_WORKER['runs'], _WORKER['early']),
+        printlog=False, **params)
+    if prune is not None:
+        _WORKER['runs'] += 1
+        if (metrics['pruned'] and gate_bars(prune) is not None
+                and metrics['bars_run'] <= prune['trade_deadline']):
+            _WORKER['early'] += 1
+    score = metrics.get(_WORKER['metric'])
+    if metrics['pruned'] or score is None or (isinstance(score, float) and math.isnan(score)):
+        score = PRUNED_SCORE
+    return score, metrics
+
+
+def _pool(df, ticker, cash, commission, metric, prune, workers):
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                               initargs=(df, ticker, cash, commission, metric, prune))
+
+
+def optimize(df, ticker, method='evolution', budget=200, batch_size=None, workers=None,
+             metric='sharpe', cash=100000.0, commission=0.001, seed=None, space=TURTLE_SPACE,
+             prune=None, verbose=True):
+    """budget 회 이내의 백테스트로 최적 파라미터 탐색. (최고 점수, 파라미터, 지표, 전체 이력) 반환"""
+    space = SearchSpace(space)
+    searcher = SEARCHERS[method](space.dim, seed=seed)
+    workers = workers or os.cpu_count() or 1
+    batch_size = batch_size or workers
+
+    history = []
+    best = (-float('inf'), None, None)
+    with _pool(df, ticker, cash, commission, metric, prune, workers) as pool:
+        while len(history) < budget:
+            xs = searcher.ask(min(batch_size, budget - len(history)))
+            candidates = [space.decode(x) for x in xs]
+            results = list(pool.map(evaluate, candidates))
+            scores = [score for score, _ in results]
+            searcher.tell(xs, scores)
+
+            for params, (score, metrics) in zip(candidates, results):
+                history.append((score, params, metrics))
+                if score > best[0]:
+                    best = (score, params, metrics)
+            if verbose:
+                print(f"   [{method}] {len(history)}/{budget} 평가, 최고 {metric}={best[0]:.4f}")
+    if verbose and best[0] <= PRUNED_SCORE:
+        print("   ⚠️  모든 후보가 조기 중단되었거나 점수가 없습니다 (--max-dd/--trade-deadline 확인)")
+    return best[0], best[1], best[2], history
+
+
+def successive_halving(df, ticker, n_candidates=81, eta=3, min_fraction=1.0 / 9, workers=None,
+                       metric='sharpe', cash=100000.0, commission=0.001, seed=None,
+                       space=TURTLE_SPACE, prune=DEFAULT_PRUNE, verbose=True):
+    """모든 후보를 데이터 앞부분에서 평가하고 상위 1/eta 만 더 긴 구간으로 올려 보내는 탐색.
+    마지막 단계는 전체 구간. (최고 점수, 파라미터, 지표, 마지막 단계 결과) 반환"""
+    space = SearchSpace(space)
+    workers = workers or os.cpu_count() or 1
+    total = data_length(df)
+    candidates = [space.decode(x) for x in RandomSearch(space.dim, seed=seed).ask(n_candidates)]
+
+    ranked = []
+    cost = 0.0   # 전체 구간 백테스트 환산 횟수
+    with _pool(df, ticker, cash, commission, metric, prune, workers) as pool:
+        for fraction, keep in halving_rungs(n_candidates, eta, min_fraction):
+            candidates = candidates[:keep]
+            bars = None if fraction >= 1.0 else max(1, int(total * fraction))
+            results = list(pool.map(evaluate, candidates, [bars] * len(candidates)))
+            ranked = sorted(zip(results, candidates), key=lambda r: -r[0][0])
+            candidates = [params for _, params in ranked]
+            cost += fraction * len(results)
+            if verbose:
+                pruned = sum(1 for (_, metrics), _ in ranked if metrics['pruned'])
+                print(f"   [halving] {fraction * 100:5.1f}% 구간, 후보 {len(results)}개 "
+                      f"(조기 중단 {pruned}), 최고 {metric}={ranked[0][0][0]:.4f}")
+    if verbose:
+        print(f"   [halving] 총 연산량: 전체 구간 백테스트 {cost:.1f}회 분량 (후보 {n_candidates}개)")
+        if ranked[0][0][0] <= PRUNED_SCORE:
+            print("   ⚠️  모든 후보가 조기 중단되었거나 점수가 없습니다 (--max-dd/--trade-deadline 확인)")
+
+    (score, metrics), params = ranked[0]
+    return score, params, metrics, ranked
+
+
+def prune_criteria(max_drawdown=None, trade_deadline=None, min_trades=None):
+    """CLI 인자로 DEFAULT_PRUNE 을 덮어쓴 중단 조건 dict"""
+    criteria = dict(DEFAULT_PRUNE)
+    for name, value in (('max_drawdown', max_drawdown), ('trade_deadline', trade_deadline),
+                        ('min_trades', min_trades)):
+        if value is not None:
+            criteria[name] = value
+    return criteria
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='TurtleStrategy 파라미터 탐색 최적화')
+    parser.add_argument('--ticker', default='SPY')
+    parser.add_argument('--from', dest='fromdate', default='2015-01-01')
+    parser.add_argument('--to', dest='todate', default='2025-11-04')
+    parser.add_argument('--method', choices=sorted(SEARCHERS) + ['halving'], default='evolution')
+    parser.add_argument('--budget', type=int, default=200, help='평가 횟수 (halving: 후보 수)')
+    parser.add_argument('--batch', type=int, default=None)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--metric', default='sharpe')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--prune', action='store_true', help='가망 없는 실행 조기 중단')
+    parser.add_argument('--max-dd', type=float, default=None)
+    parser.add_argument('--trade-deadline', type=int, default=None)
+    args = parser.parse_args()
+
+    df = load_history(args.ticker,
+                      datetime.datetime.strptime(args.fromdate, '%Y-%m-%d'),
+                      datetime.datetime.strptime(args.todate, '%Y-%m-%d'))
+    prune = prune_criteria(args.max_dd, args.trade_deadline) if args.prune else None
+    if args.method == 'halving':
+        score, params, metrics, _ = successive_halving(
+            df, args.ticker, args.budget, workers=args.workers, metric=args.metric,
+            seed=args.seed, prune=prune)
+    else:
+        score, params, metrics, _ = optimize(
+            df, args.ticker, args.method, args.budget, args.batch, args.workers,
+            args.metric, seed=args.seed, prune=prune)
+    print("="*70)
+    print(f"최고 {args.metric}: {score:.4f}")
+    for name in TurtleStrategy.params._getkeys():
+        if params and name in params:
+            print(f"   {name:<24} {params[name]}")
+    print("="*70)
@@ -0,0 +1,265 @@
+import argparse
+import datetime
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import backtrader as bt
+
+# demo-python 폴더의 공용 모듈(adjusted_cache, util 등)을 import 하기 위한 경로 추가
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from numpy_feed import NumpyData
+from turtle_strategy import TurtleStrategy
+from util.dynamic_date import window_start
+
+# ----------------------------------------------------------------------
+# 오늘의 TurtleStrategy 시그널 (신규 진입 / 피라미딩 / 청산)
+# - fromdate 부터 전체 백테스트를 돌리지 않고, 파라미터에서 계산한 최소 워밍업 구간만 로드
+#   워밍업 = 지표 최소 기간(Donchian/EMA/ADX/ATR/MACD) + EMA/ADX 평활 수렴 길이
+# - 마지막 바에서 TurtleStrategy.next() 를 그대로 실행하고 주문 대신 결정을 기록
+# - 보유 종목은 holdings(JSON)로 진입가/손절/유닛 수를 넘겨 청산/피라미딩까지 판단
+# - 종목별로 프로세스 풀에서 병렬 실행
+#
+# 사용 예)
+#   python turtle_signals.py --tickers AAPL,MSFT,NVDA
+#   python turtle_signals.py --holdings holdings.json --account 100000
+#
+# holdings.json 예)
+#   {"AAPL": {"size": 40, "entry_price": 190.5, "initial_stop": 181.2,
+#             "units": 2, "last_pyramid_price": 195.0, "entry_date": "2025-10-01"}}
+# ----------------------------------------------------------------------
+
+# MACD 기본값(12/26/9): 느린 EMA 26 + 시그널 9 - 1
+MACD_MINPERIOD = 26 + 9 - 1
+MACD_SLOW = 26
+OBV_SMA_PERIOD = 21
+
+
+def convergence_bars(alpha, tolerance=1e-3):
+    """지수 평활(계수 alpha)의 초기값 영향이 tolerance 아래로 줄어드는 바 수"""
+    return int(math.ceil(math.log(tolerance) / math.log(1.0 - alpha)))
+
+
+def required_warmup(params=None, tolerance=1e-3):
+    """전략 파라미터로 계산한 최소 워밍업 바 수
+
+    - 최소 기간: 지표가 첫 값을 내기 위해 필요한 바 수
+    - 수렴 길이: EMA(alpha=2/(n+1)), ATR/ADX(Wilder, alpha=1/n) 의 시작값 오차가
+      tolerance 아래로 줄어들 때까지의 바 수 (이 구간이 짧으면 전체 백테스트와 값이 달라짐)
+    """
+    p = dict(TurtleStrategy.params._getitems())
+    p.update(params or {})
+
+    ema = p['ema_period'] + convergence_bars(2.0 / (p['ema_period'] + 1), tolerance)
+    # ATR: TrueRange 에 전일 종가가 필요 (+1)
+    atr = p['atr_period'] + 1 + convergence_bars(1.0 / p['atr_period'], tolerance)
+    # ADX: DM 평활 후 DX 를 다시 평활 (2단 Wilder 평활)
+    adx = 2 * p['adx_period'] + 1 + 2 * convergence_bars(1.0 / p['adx_period'], tolerance)
+    macd = MACD_MINPERIOD + convergence_bars(2.0 / (MACD_SLOW + 1), tolerance)
+    channels = max(p['donchian_high_period'], p['donchian_low_period'], OBV_SMA_PERIOD)
+    # ADX 하락 카운트가 판정 가능하도록 adx_decline_days 만큼 여유
+    return max(ema, atr, adx, macd, channels) + p['adx_decline_days']
+
+
+class SignalProbe(TurtleStrategy):
+    """마지막 바에서 TurtleStrategy.next() 를 실행하고 주문 대신 결정을 기록하는 전략
+
+    holding 이 주어지면 실제 브로커 포지션 없이 보유 상태(진입가/손절/유닛)를 복원해
+    청산/트레일링 스탑/피라미딩 판단을 원래 로직 그대로 수행한다.
+    """
+    params = (
+        ('holding', None),   # dict: size, entry_price, initial_stop, units, last_pyramid_price, ...
+        # 오늘 종가 기준으로 스탑 이탈 여부와 트레일링 스탑 가격을 판단 (브로커 주문 없음)
+        ('use_broker_stops', False),
+        ('printlog', False),
+    )
+
+    def __init__(self):
+        super(SignalProbe, self).__init__()
+        self.decision = None
+        self.note = None
+        self._held = bt.Position()
+        self._entry_date = None
+
+    @property
+    def position(self):
+        return self._held
+
+    def start(self):
+        holding = self.p.holding
+        if not holding:
+            return
+        self.entry_price = holding['entry_price']
+        self.initial_stop = holding['initial_stop']
+        self.units = holding.get('units', 1)
+        self.last_pyramid_price = holding.get('last_pyramid_price', self.entry_price)
+        self.highest_since_entry = holding.get('highest_since_entry', self.entry_price)
+        if holding.get('entry_date'):
+            self._entry_date = datetime.date.fromisoformat(holding['entry_date'])
+        # 진입일이 구간 밖(또는 미지정)이면 구간 시작부터 보유 중인 것으로 본다
+        self._held = bt.Position(holding['size'], self.entry_price)
+
+    def log(self, txt, dt=None):
+        self.note = txt
+        super(SignalProbe, self).log(txt, dt)
+
+    def _record(self, action, size=None, stop=None):
+        self.decision = {
+            'action': action,
+            'size': size,
+            'close': self.dataclose[0],
+            'stop': stop,
+            'atr': self.atr[0],
+            'adx': self.adx[0],
+            'note': self.note,
+        }
+
+    def buy(self, size=None, **kwargs):
+        if self.position:
+            self._record('pyramid', size, self.initial_stop)
+        else:
+            atr_value = self.atr[0]
+            if atr_value > 0:
+                stop = self.dataclose[0] - atr_value * self.p.atr_multiplier_stop
+            else:
+                stop = self.dataclose[0] * 0.95
+            self._record('entry', size, stop)
+        return None
+
+    def close(self, data=None, size=None, **kwargs):
+        self._record('exit', self.position.size, self.update_trailing_stop())
+        return None
+
+    def next(self):
+        date = self.data.datetime.date(0)
+        holding = self._held.size and (self._entry_date is None or date >= self._entry_date)
+        if len(self) < self.data.buflen():
+            if holding:
+                # 보유 기간의 최고가와 ADX 하락 카운트를 원래 전략과 같은 방식으로 누적
+                self.highest_since_entry = max(self.highest_since_entry, self.datahigh[0])
+                self.check_exit_signal()
+            return
+
+        super(SignalProbe, self).next()
+        if self.decision is None:
+            if holding:
+                self._record('hold', self.position.size, self.update_trailing_stop())
+            else:
+                self._record('none')
+
+
+def load_window(ticker, bars, end=None):
+    """마지막 거래일까지 bars 개 일봉 (수정주가). 로컬 캐시가 없으면 해당 구간만 다운로드"""
+    from adjusted_cache import load_adjusted, raw_data_path
+
+    end = end or datetime.date.today()
+    start = window_start(bars, end)
+    todate = end + datetime.timedelta(days=1)
+    if os.path.exists(raw_data_path(ticker)):
+        df = load_adjusted(ticker, start, todate)
+    else:
+        # 전체 이력 캐시를 새로 만들지 않고 워밍업 구간만 받는다
+        import yfinance as yf
+        df = yf.Ticker(ticker).history(start=start, end=todate, auto_adjust=True)
+        if not df.empty:
+            df.index = df.index.tz_localize(None)
+    return df.tail(bars)
+
+
+def evaluate_ticker(ticker, bars, params=None, holding=None, account=100000.0, end=None):
+    """종목 1개의 오늘 시그널 dict"""
+    t0 = time.perf_counter()
+    try:
+        df = load_window(ticker, bars, end)
+    except Exception as e:   # 네트워크/데이터 오류는 종목 단위로 보고
+        return {'ticker': ticker, 'action': 'error', 'note': '%s: %s' % (type(e).__name__, e)}
+    if len(df) < bars:
+        return {'ticker': ticker, 'action': 'insufficient',
+                'note': '%d/%d bars' % (len(df), bars)}
+
+    try:
+        cerebro = bt.Cerebro(stdstats=False)
+        cerebro.adddata(NumpyData(dataname=df), name=ticker)
+        cerebro.addstrategy(SignalProbe, holding=holding, **(params or {}))
+        # 포지션 사이즈는 broker.getvalue() 기준 → 계좌 평가액을 현금으로 둔다
+        cerebro.broker.setcash(account)
+        strat = cerebro.run()[0]
+    except Exception as e:   # 잘못된 보유 정보/데이터로 인한 실패도 종목 단위로 보고 (전체 스캔은 계속)
+        return {'ticker': ticker, 'action': 'error', 'note': '%s: %s' % (type(e).__name__, e)}
+
+    result = dict(strat.decision, ticker=ticker)
+    result['date'] = df.index[-1].date().isoformat()
+    result['seconds'] = round(time.perf_counter() - t0, 3)
+    return result
+
+
+def _evaluate(args):
+    return evaluate_ticker(*args)
+
+
+def scan_signals(tickers, params=None, holdings=None, account=100000.0, workers=None,
+                 end=None, tolerance=1e-3):
+    """유니버스 전체의 오늘 시그널 목록 (종목 순서 유지)"""
+    holdings = holdings or {}
+    bars = required_warmup(params, tolerance)
+    jobs = [(ticker, bars, params, holdings.get(ticker), account, end) for ticker in tickers]
+    if workers == 1:
+        return [_evaluate(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_evaluate, jobs))
+
+
+def print_signals(results):
+    order = ('exit', 'pyramid', 'entry', 'hold')
+    print("="*70)
+    print("    🐢 TurtleStrategy 오늘의 시그널")
+    print("="*70)
+    for action in order:
+        rows = [r for r in results if r['action'] == action]
+        if not rows:
+            continue
+        print(f"  [{action.upper()}]")
+        for r in rows:
+            size = '' if r['size'] is None else f"size {r['size']:>6.0f}"
+            stop = '' if r['stop'] is None else f"stop {r['stop']:10.2f}"
+            print(f"   {r['ticker']:<8} {r['date']}  close {r['close']:10.2f}  {size}  {stop}")
+    skipped = [r for r in results if r['action'] in ('error', 'insufficient')]
+    for r in skipped:
+        print(f"   ⚠️  {r['ticker']:<8} {r['action']}: {r['note']}")
+    quiet = sum(1 for r in results if r['action'] == 'none')
+    print(f"   시그널 없음: {quiet}개 종목")
+    print("="*70)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='TurtleStrategy 오늘의 진입/피라미딩/청산 시그널')
+    parser.add_argument('--tickers', default=None, help='쉼표 구분 (기본: 나스닥 100)')
+    parser.add_argument('--holdings', default=None, help='보유 종목 JSON 파일')
+    parser.add_argument('--account', type=float, default=100000.0, help='계좌 평가액 (포지션 사이즈 계산)')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--tolerance', type=float, default=1e-3, help='지표 수렴 허용 오차')
+    args = parser.parse_args()
+
+    holdings = {}
+    if args.holdings:
+        with open(args.holdings, 'r', encoding='utf-8') as f:
+            holdings = json.load(f)
+    if args.tickers:
+        tickers = args.tickers.split(',')
+    else:
+        from nasdaq_data import get_nasdaq_100_tickers
+        tickers = get_nasdaq_100_tickers() or []
+    # 보유 종목은 유니버스에 없어도 평가
+    tickers += [t for t in holdings if t not in tickers]
+
+    t0 = time.perf_counter()
+    bars = required_warmup(tolerance=args.tolerance)
+    print(f"워밍업 {bars} 바, {len(tickers)}개 종목")
+    results = scan_signals(tickers, holdings=holdings, account=args.account,
+                           workers=args.workers, tolerance=args.tolerance)
+    print_signals(results)
+    print(f"⏱  {time.perf_counter() - t0:.1f}s")
@@ -1,9 +1,16 @@
 import datetime
 import backtrader as bt
-import pandas as pd
-import yfinance as yf
 import math
 import os
+import sys
+
+# demo-python 폴더의 공용 모듈(data_updater 등)을 import 하기 위한 경로 추가
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from data_updater import update_data_file
+from lean_mode import lean_settings, lean_strategy
+from numpy_feed import NumpyData
+from streaming_analyzers import add_streaming_analyzers, collect_metrics, print_metrics
 
 # 커스텀 지표: Donchian Channel
 class DonchianChannel(bt.Indicator):
@@ -14,17 +21,60 @@ class DonchianChannel(bt.Indicator):
         self.lines.high = bt.indicators.Highest(self.data.high, period=self.params.period)
         self.lines.low = bt.indicators.Lowest(self.data.low, period=self.params.period)
 
+# 커스텀 지표: OBV (On-Balance Volume)
+# 배포판 backtrader(1.9.78)에는 OBV 지표가 없으므로 직접 정의
+# 종가가 전일보다 오르면 거래량을 더하고, 내리면 빼서 누적 (첫 값은 두 번째 바의 부호 붙은 거래량)
+class OBV(bt.Indicator):
+    lines = ('obv',)
+    
+    def __init__(self):
+        self.addminperiod(2)
+    
+    def _signed_volume(self, close, prev_close, volume):
+        if close > prev_close:
+            return volume
+        if close < prev_close:
+            return -volume
+        return 0.0
+    
+    def nextstart(self):
+        self.lines.obv[0] = self._signed_volume(self.data.close[0], self.data.close[-1], self.data.volume[0])
+    
+    def next(self):
+        self.lines.obv[0] = self.lines.obv[-1] + self._signed_volume(
+            self.data.close[0], self.data.close[-1], self.data.volume[0])
+    
+    def oncestart(self, start, end):
+        close = self.data.close.array
+        self.lines.obv.array[start] = self._signed_volume(close[start], close[start - 1],
+                                                          self.data.volume.array[start])
+    
+    def once(self, start, end):
+        close = self.data.close.array
+        volume = self.data.volume.array
+        obv = self.lines.obv.array
+        for i in range(start, end):
+            obv[i] = obv[i - 1] + self._signed_volume(close[i], close[i - 1], volume[i])
+
 # 커스텀 지표: OBV SMA
 class OBV_SMA(bt.Indicator):
     lines = ('obv_sma',)
     params = (('period', 21),)
     
     def __init__(self):
-        self.obv = bt.indicators.OBV(self.data)
+        self.obv = OBV(self.data)
         self.lines.obv_sma = bt.indicators.SMA(self.obv, period=self.params.period)
 
 # 전략 클래스
 class TurtleStrategy(bt.Strategy):
+    # next()에서 데이터는 현재 바([0])만 참조 → 메모리 절약 모드(save_memory)에서 exactbars=1 사용 가능
+    # (돈치안 채널의 전일 값[-1]은 지표 자체 버퍼(기간 길이)에 남아 있음)
+    lean_lookback = 1
+    # 체크포인트(checkpoint.py)로 저장/복원하는 전략 상태 변수 (주문 참조 포함)
+    checkpoint_attrs = ('order', 'stop_order', 'buyprice', 'buycomm', 'entry_price', 'initial_stop',
+                        'highest_since_entry', 'units', 'last_pyramid_price',
+                        'adx_decline_count', 'last_adx')
+    
     params = (
         ('donchian_high_period', 20),
         ('donchian_low_period', 10),
@@ -38,10 +88,17 @@ class TurtleStrategy(bt.Strategy):
         ('risk_per_trade', 0.02),  # 계좌의 2% 리스크
         ('max_units', 4),
         ('adx_decline_days', 3),
+        # True: 손절/트레일링 스탑을 브로커의 StopTrail 주문으로 (장중 고가/저가로 체결)
+        # False: 매 바 종가로 스탑을 확인하고 다음 바 시가에 청산 (이전 방식)
+        ('use_broker_stops', True),
+        ('stop_atr_tolerance', 0.1),  # 트레일 폭(ATR 기반)이 이 비율 이상 바뀔 때만 스탑 주문 교체
+        ('printlog', True),  # False면 로그 출력 생략 (최적화/배치 실행용)
     )
     
     def log(self, txt, dt=None):
         ''' 로깅 함수 '''
+        if not self.params.printlog:
+            return
         dt = dt or self.datas[0].datetime.date(0)
         print('%s, %s' % (dt.isoformat(), txt))
     
@@ -66,7 +123,7 @@ class TurtleStrategy(bt.Strategy):
         self.atr = bt.indicators.ATR(self.data, period=self.params.atr_period)
         
         # OBV 및 OBV SMA
-        self.obv = bt.indicators.OBV(self.data)
+        self.obv = OBV(self.data)
         self.obv_sma = OBV_SMA(self.data, period=21)
         
         # MACD
@@ -74,6 +131,7 @@ class TurtleStrategy(bt.Strategy):
         
         # 주문 추적
         self.order = None
+        self.stop_order = None  # 브로커 스탑 주문 (use_broker_stops)
         self.buyprice = None
         self.buycomm = None
         
@@ -86,10 +144,25 @@ class TurtleStrategy(bt.Strategy):
         self.adx_decline_count = 0
         self.last_adx = None
         
+    @staticmethod
+    def is_same_order(order, tracked):
+        """브로커 알림은 주문의 복사본(clone)이므로 객체가 아니라 ref 로 비교"""
+        return tracked is not None and order.ref == tracked.ref
+    
     def notify_order(self, order):
         if order.status in [order.Submitted, order.Accepted]:
             return
         
+        is_stop = self.is_same_order(order, self.stop_order)
+        is_main = self.is_same_order(order, self.order)
+        
+        # 교체/취소한 이전 스탑 주문의 취소 알림
+        if order.status == order.Canceled and not is_main and not is_stop:
+            return
+        
+        if is_stop and order.status in [order.Completed]:
+            self.log('STOP EXECUTED, %.2f' % order.executed.price)
+        
         if order.status in [order.Completed]:
             if order.isbuy():
                 self.log(
@@ -137,7 +210,11 @@ class TurtleStrategy(bt.Strategy):
         elif order.status in [order.Canceled, order.Margin, order.Rejected]:
             self.log('Order Canceled/Margin/Rejected')
         
-        self.order = None
+        # 스탑 체결/거절은 진행 중인 진입·피라미딩 주문(self.order)을 지우지 않는다
+        if is_stop:
+            self.stop_order = None
+        elif is_main:
+            self.order = None
     
     def notify_trade(self, trade):
         if not trade.isclosed:
@@ -166,8 +243,9 @@ class TurtleStrategy(bt.Strategy):
         if len(self.dataclose) < max(self.params.donchian_high_period, self.params.ema_period, self.params.adx_period):
             return False
         
-        # 필수 조건
-        close_above_donchian = self.dataclose[0] > self.donchian_high.lines.high[0]
+        # 필수 조건: 전일까지의 N일 고가 돌파
+        # (당일 고가가 포함된 [0] 과 비교하면 종가가 고가를 넘을 수 없어 진입이 생기지 않는다)
+        close_above_donchian = self.dataclose[0] > self.donchian_high.lines.high[-1]
         adx_above_threshold = self.adx[0] >= self.params.adx_threshold
         
         if not (close_above_donchian and adx_above_threshold):
@@ -197,8 +275,8 @@ class TurtleStrategy(bt.Strategy):
         if not self.position:
             return False
         
-        # 즉시 청산 조건 1: DonchianLow(10) 돌파
-        if self.dataclose[0] < self.donchian_low.lines.low[0]:
+        # 즉시 청산 조건 1: 전일까지의 DonchianLow(10) 하향 돌파 (당일 저가 포함 시 발생 불가)
+        if self.dataclose[0] < self.donchian_low.lines.low[-1]:
             return True
         
         # 즉시 청산 조건 2: ADX가 3거래일 이상 하락하여 25 미만
@@ -243,6 +321,43 @@ class TurtleStrategy(bt.Strategy):
         
         return self.initial_stop
     
+    def sync_stop_order(self):
+        """브로커 스탑 주문을 현재 포지션/ATR 에 맞춘다 (필요할 때만 취소 후 재주문)
+
+        스탑 가격의 정의는 하나 (브로커 StopTrail 과 같음):
+            stop[t] = max(stop[t-1], 종가[t] - 트레일 폭),  초기 손절가 이상
+        브로커가 매 바 종가로 이 식을 적용해 올리기만 하고(ratchet), 전략은 포지션 수량이 바뀌거나
+        ATR 트레일 폭(ATR x atr_multiplier_trail)이 stop_atr_tolerance 이상 변할 때만 같은 식으로
+        새 주문을 낸다. 허용 범위 안의 ATR 변화는 이전 트레일 폭으로 계속 계산된다.
+        (use_broker_stops=False 의 종가 확인 방식은 진입 후 최고가 기준 - update_trailing_stop)
+        """
+        trail = self.atr[0] * self.params.atr_multiplier_trail
+        stop = self.stop_order
+        if stop is not None and stop.alive() and stop.size == -self.position.size:
+            if trail <= 0:
+                return
+            if stop.trailamount and abs(trail - stop.trailamount) <= stop.trailamount * self.params.stop_atr_tolerance:
+                return
+        
+        level = self.initial_stop
+        if trail > 0:
+            level = max(level, self.dataclose[0] - trail)
+        if stop is not None and stop.alive():
+            level = max(level, stop.created.price)
+            self.cancel(stop)
+        
+        if trail > 0:
+            # StopTrail 의 첫 스탑 가격 = price - trailamount
+            self.stop_order = self.sell(size=self.position.size, exectype=bt.Order.StopTrail,
+                                        price=level + trail, trailamount=trail)
+        else:
+            self.stop_order = self.sell(size=self.position.size, exectype=bt.Order.Stop, price=level)
+    
+    def cancel_stop_order(self):
+        if self.stop_order is not None and self.stop_order.alive():
+            self.cancel(self.stop_order)
+        self.stop_order = None
+    
     def check_pyramid_signal(self):
         """추가 매수(피라미딩) 시그널 확인"""
         if not self.position:
@@ -276,21 +391,26 @@ class TurtleStrategy(bt.Strategy):
             # 청산 시그널 확인
             if self.check_exit_signal():
                 self.log('SELL CREATE, %.2f' % self.dataclose[0])
+                self.cancel_stop_order()
                 self.order = self.close()
                 return
             
-            # 트레일링 스탑 확인
-            trail_stop = self.update_trailing_stop()
-            if trail_stop and self.dataclose[0] < trail_stop:
-                self.log('TRAILING STOP SELL, %.2f, Stop: %.2f' % (self.dataclose[0], trail_stop))
-                self.order = self.close()
-                return
-            
-            # 초기 손절 확인
-            if self.initial_stop and self.dataclose[0] < self.initial_stop:
-                self.log('STOP LOSS SELL, %.2f, Stop: %.2f' % (self.dataclose[0], self.initial_stop))
-                self.order = self.close()
-                return
+            if self.params.use_broker_stops:
+                # 손절/트레일링 스탑은 브로커가 장중 고가/저가로 처리
+                self.sync_stop_order()
+            else:
+                # 트레일링 스탑 확인
+                trail_stop = self.update_trailing_stop()
+                if trail_stop and self.dataclose[0] < trail_stop:
+                    self.log('TRAILING STOP SELL, %.2f, Stop: %.2f' % (self.dataclose[0], trail_stop))
+                    self.order = self.close()
+                    return
+                
+                # 초기 손절 확인
+                if self.initial_stop and self.dataclose[0] < self.initial_stop:
+                    self.log('STOP LOSS SELL, %.2f, Stop: %.2f' % (self.dataclose[0], self.initial_stop))
+                    self.order = self.close()
+                    return
             
             # 피라미딩 확인
             if self.check_pyramid_signal():
@@ -327,7 +447,10 @@ class TurtleStrategy(bt.Strategy):
 
 
 def update_orcl_data_file():
-    """orcl-1995-2014.txt 파일을 최신 데이터로 업데이트합니다."""
+    """orcl-1995-2014.txt 파일을 최신 데이터로 업데이트합니다.
+
+    마지막 날짜는 파일 끝(tail) 또는 manifest에서만 읽고, 새 행만 파일 끝에 추가한다.
+    """
     # 파일 경로 설정
     modpath = os.path.dirname(os.path.abspath(__file__))
     datapath = os.path.join(modpath, '../datas/yfinance/orcl-1995-2014.txt')
@@ -337,80 +460,52 @@ def update_orcl_data_file():
     print("ORCL 데이터 파일 업데이트 확인 중...")
     print(f"파일 경로: {datapath}")
     
-    today = datetime.date.today()
-    last_date = None
-    
-    # 기존 파일이 있으면 마지막 날짜 확인
-    if os.path.exists(datapath):
-        try:
-            df_existing = pd.read_csv(datapath, index_col='Date', parse_dates=True)
-            if not df_existing.empty:
-                last_date = df_existing.index[-1].date()
-                print(f"📅 파일의 마지막 날짜: {last_date}")
-                print(f"📅 오늘 날짜: {today}")
-                
-                # 오늘 날짜와 비교
-                if last_date >= today:
-                    print(f"✅ 데이터가 최신입니다. (마지막 날짜: {last_date}, 오늘: {today})")
-                    print("="*70)
-                    return datapath
-                
-                days_diff = (today - last_date).days
-                print(f"🔄 데이터 업데이트가 필요합니다. (차이: {days_diff}일)")
-                start_date = last_date + datetime.timedelta(days=1)
-            else:
-                print("⚠️  기존 데이터 파일이 비어있습니다.")
-                print("   전체 데이터를 새로 다운로드합니다...")
-                start_date = datetime.date(1995, 1, 1)
-        except Exception as e:
-            print(f"⚠️  기존 파일 읽기 오류: {e}")
-            print("   전체 데이터를 새로 다운로드합니다...")
-            start_date = datetime.date(1995, 1, 1)
+    datapath, _ = update_data_file('ORCL', datapath)
+    print("="*70)
+    return datapath
+
+
+def load_history(ticker, fromdate, todate):
+    """수정주가(분할/배당 반영) 일봉 데이터를 가져온다
+
+    원본 OHLCV + 이벤트 테이블 로컬 캐시(adjusted_cache)를 증분 업데이트한 뒤 읽을 때 조정한다.
+    (yfinance history(auto_adjust=True) 와 같은 컬럼, todate 미포함)
+    """
+    # yfinance/pandas는 import 비용이 크므로 실제로 데이터가 필요할 때만 import
+    from adjusted_cache import load_adjusted
+    return load_adjusted(ticker, fromdate, todate)
+
+
+def build_cerebro(df, ticker, cash=100000.0, commission=0.001, strategy=TurtleStrategy,
+                  lean=False, save_memory=False, **params):
+    """데이터/전략/자본/수수료/스트리밍 분석기를 설정한 Cerebro 생성
+
+    lean=True: 배치용 린 프로파일 (옵저버 없음), save_memory=True: 메모리 절약 (느림, lean_mode 참고)
+    """
+    if lean or save_memory:
+        cerebro = bt.Cerebro(**lean_settings(strategy, save_memory=save_memory))
+        strategy = lean_strategy(strategy, save_memory)
     else:
-        print("⚠️  기존 데이터 파일을 찾을 수 없습니다.")
-        print("   전체 데이터를 새로 다운로드합니다...")
-        start_date = datetime.date(1995, 1, 1)
-    
-    # yfinance로 데이터 다운로드
-    print(f"📥 ORCL 데이터 다운로드 중... (시작일: {start_date})")
-    try:
-        ticker = yf.Ticker("ORCL")
-        # end_date는 오늘 다음 날로 설정 (오늘까지 포함)
-        end_date = today + datetime.timedelta(days=1)
-        df_new = ticker.history(start=start_date, end=end_date, auto_adjust=True)
-        
-        if df_new.empty:
-            print("⚠️  새로운 데이터가 없습니다.")
-            print("="*70)
-            return datapath
-        
-        print(f"✅ {len(df_new)}개의 새로운 데이터를 받았습니다.")
-        
-        # 기존 파일이 있으면 추가, 없으면 새로 생성
-        if os.path.exists(datapath) and last_date is not None:
-            # 기존 데이터 읽기 (이미 위에서 읽었지만, 병합을 위해 다시 읽음)
-            df_existing = pd.read_csv(datapath, index_col='Date', parse_dates=True)
-            
-            # 새 데이터와 병합 (중복 제거)
-            df_combined = pd.concat([df_existing, df_new])
-            df_combined = df_combined[~df_combined.index.duplicated(keep='last')]
-            df_combined = df_combined.sort_index()
-            
-            # CSV로 저장
-            df_combined.to_csv(datapath, date_format='%Y-%m-%d')
-            print(f"💾 파일 업데이트 완료: {len(df_combined)}개 행 (기존: {len(df_existing)}, 추가: {len(df_new)})")
-        else:
-            # 새 파일 생성
-            df_new.to_csv(datapath, date_format='%Y-%m-%d')
-            print(f"💾 새 파일 생성 완료: {len(df_new)}개 행")
-        
-        print("="*70)
-        return datapath
-        
-    except Exception as e:
-        print(f"❌ 데이터 다운로드 오류: {e}")
-        print("="*70)
-        return datapath
+        cerebro = bt.Cerebro()
+    # NumpyData: 컬럼 단위 일괄 로딩 (PandasData 행 단위 복사 대비 로딩 시간/메모리 절감)
+    cerebro.adddata(NumpyData(dataname=df), name=ticker)
+    cerebro.addstrategy(strategy, **params)
+    cerebro.broker.setcash(cash)
+    cerebro.broker.setcommission(commission=commission)
+    # 스트리밍 성과 분석기 (바마다 O(1), 상수 메모리)
+    add_streaming_analyzers(cerebro)
+    return cerebro
+
+
+def run_backtest(df, ticker, cash=100000.0, commission=0.001, strategy=TurtleStrategy,
+                 lean=False, **params):
+    """백테스트 1회 실행 후 (cerebro, 전략 인스턴스, 성과 지표 dict) 반환"""
+    cerebro = build_cerebro(df, ticker, cash, commission, strategy, lean, **params)
+    strat = cerebro.run()[0]
+    metrics = collect_metrics(strat)
+    metrics['final_value'] = cerebro.broker.getvalue()
+    return cerebro, strat, metrics
+
 
 if __name__ == '__main__':
     # ORCL 데이터 파일 업데이트
@@ -428,28 +523,16 @@ if __name__ == '__main__':
     print("="*70)
     
     # 데이터 가져오기
-    ticker = yf.Ticker(TICKER)
-    df = ticker.history(start=fromdate, end=todate, auto_adjust=True)
+    df = load_history(TICKER, fromdate, todate)
     
     if df.empty:
         print(f"!! 데이터 로드 실패: {TICKER} 데이터를 가져오지 못했습니다. !!")
     else:
-        # Cerebro 생성
-        cerebro = bt.Cerebro()
-        
-        # 데이터 추가
-        data = bt.feeds.PandasData(dataname=df)
-        cerebro.adddata(data, name=TICKER)
-        
-        # 전략 추가
-        cerebro.addstrategy(TurtleStrategy)
-        
         # 초기 자본 설정
         INITIAL_CASH = 100000.0
-        cerebro.broker.setcash(INITIAL_CASH)
         
-        # 수수료 설정 (0.1%)
-        cerebro.broker.setcommission(commission=0.001)
+        # Cerebro 생성 (데이터, 전략, 수수료 0.1%, 스트리밍 분석기)
+        cerebro = build_cerebro(df, TICKER, cash=INITIAL_CASH, commission=0.001)
         
         # 백테스트 실행
         print('Starting Portfolio Value: %.2f' % cerebro.broker.getvalue())
@@ -466,6 +549,10 @@ if __name__ == '__main__':
         print(f'Total Return: {return_pct:.2f}%')
         print("="*70)
         
+        # 성과 지표 출력 (Sharpe, MDD, 익스포저 등)
+        print_metrics(collect_metrics(results[0]))
+        print("="*70)
+        
         # 플로팅 (선택 사항)
         try:
             cerebro.plot(style="candle", barup="red", bardown="blue")
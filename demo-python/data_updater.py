@@ -0,0 +1,243 @@
+# data_updater.py 파일
+# 티커별 CSV 데이터 파일을 "뒤에 이어 쓰기(append-only)" 방식으로 증분 업데이트한다.
+# - 마지막 날짜는 manifest(JSON) 또는 파일 끝부분(tail)만 읽어서 확인 (전체 파일 파싱 X)
+# - 새로 받은 행만 파일 끝에 추가 (기존 행은 다시 쓰지 않음 → 장 마감 전의 미확정 봉은 받지 않음)
+# - 여러 티커 파일을 스레드 풀로 병렬 업데이트
+# - 갱신은 파일별 single-flight 잠금 안에서만 (다른 프로세스와 동시에 받거나 섞어 쓰지 않음),
+#   읽기는 잠금 없이 manifest 에 커밋된 길이까지만 (shared_cache)
+
+import datetime
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from shared_cache import atomic_write, read_committed, single_flight
+from util.dynamic_date import last_closed_session
+
+# 새 파일을 만들 때 사용하는 Yahoo CSV 형식 헤더 (YahooFinanceCSVData 호환)
+DEFAULT_HEADER = ['Date', 'Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume']
+# 파일이 없을 때 전체 데이터를 받기 시작하는 날짜
+DEFAULT_START = datetime.date(1995, 1, 1)
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'datas', 'yfinance')
+
+
+def default_data_path(ticker):
+    """티커의 기본 데이터 파일 경로 (datas/yfinance/<ticker>.txt)"""
+    return os.path.join(DATA_DIR, '%s.txt' % ticker.lower())
+
+
+def manifest_path(datapath):
+    return datapath + '.manifest.json'
+
+
+def read_manifest(datapath):
+    """manifest를 읽는다. 파일 크기가 manifest와 다르면(외부에서 수정됨) None"""
+    try:
+        with open(manifest_path(datapath), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('size') != os.path.getsize(datapath):
+            return None
+        return manifest
+    except (OSError, ValueError):
+        return None
+
+
+def write_manifest(datapath, last_date, header):
+    manifest = {
+        'last_date': last_date.isoformat(),
+        'size': os.path.getsize(datapath),
+        'header': header,
+    }
+    atomic_write(manifest_path(datapath), json.dumps(manifest))
+
+
+def committed_size(datapath):
+    """manifest 에 기록된(쓰기가 끝난) 파일 길이. 없거나 파일이 더 짧으면(외부 수정) None"""
+    try:
+        with open(manifest_path(datapath), 'r', encoding='utf-8') as f:
+            size = json.load(f)['size']
+    except (OSError, ValueError, KeyError):
+        return None
+    return size if size <= os.path.getsize(datapath) else None
+
+
+def read_data_frame(datapath, index_col='Date'):
+    """커밋된 행만 잠금 없이 DataFrame 으로 읽는다 (다른 프로세스가 이어 쓰는 중이어도 안전)"""
+    import io
+    import pandas as pd
+
+    data = read_committed(datapath, committed_size(datapath))
+    return pd.read_csv(io.BytesIO(data), index_col=index_col, parse_dates=True)
+
+
+def read_header(datapath):
+    """첫 줄(헤더)만 읽어 컬럼 리스트로 반환"""
+    with open(datapath, 'r', encoding='utf-8') as f:
+        return f.readline().strip().split(',')
+
+
+def read_last_line(datapath, blocksize=4096):
+    """파일 끝으로 seek 하여 마지막 한 줄만 읽는다 (파일 크기와 무관하게 O(1))"""
+    with open(datapath, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        end = f.tell()
+        buf = b''
+        pos = end
+        while pos > 0:
+            step = min(blocksize, pos)
+            pos -= step
+            f.seek(pos)
+            buf = f.read(step) + buf
+            # 끝의 개행을 제외하고 줄바꿈이 하나라도 있으면 마지막 줄을 찾은 것
+            if buf.rstrip(b'\r\n').count(b'\n') >= 1:
+                break
+    lines = buf.rstrip(b'\r\n').split(b'\n')
+    return lines[-1].decode('utf-8').strip() if lines else ''
+
+
+def read_last_date(datapath):
+    """manifest 또는 파일 tail에서 마지막 날짜를 읽는다. 데이터 행이 없으면 None"""
+    manifest = read_manifest(datapath)
+    if manifest is not None:
+        return datetime.date.fromisoformat(manifest['last_date'])
+
+    last_line = read_last_line(datapath)
+    if not last_line or last_line.startswith('Date'):
+        return None
+    return datetime.datetime.strptime(last_line.split(',')[0], '%Y-%m-%d').date()
+
+
+def format_rows(df, header, after=None):
+    """DataFrame을 헤더 순서의 CSV 행 문자열로 변환 (after 이후 날짜만)"""
+    dates = df.index.strftime('%Y-%m-%d')
+    rows = []
+    for i, date_str in enumerate(dates):
+        if after is not None and date_str <= after.isoformat():
+            continue
+        bar = df.iloc[i]
+        values = [date_str]
+        for col in header[1:]:
+            # auto_adjust 데이터 등 컬럼이 없으면 Close 로 대체
+            value = bar[col] if col in bar.index else bar['Close']
+            if col == 'Volume':
+                # yfinance 는 일부 행의 Volume 을 NaN 으로 준다
+                values.append('%d' % value if value == value else '0')
+            else:
+                values.append('%.6f' % value)
+        rows.append(','.join(values))
+    return rows
+
+
+def download_history(ticker, start, end):
+    """yfinance에서 원본(Close/Adj Close 모두 포함) 일봉 데이터를 받는다"""
+    import yfinance as yf
+    return yf.Ticker(ticker).history(start=start, end=end, auto_adjust=False)
+
+
+def append_rows(datapath, header, rows):
+    """CSV 행을 파일 끝에 추가하고 manifest 갱신. 새 마지막 날짜 반환
+
+    파일이 없거나 비어 있으면 헤더부터 쓰고, 개행 없이 끝나면 개행부터 보충한다.
+    """
+    exists = os.path.exists(datapath) and os.path.getsize(datapath) > 0
+    with open(datapath, 'a+b') as f:
+        f.seek(0, os.SEEK_END)
+        prefix = ''
+        if not exists:
+            prefix = ','.join(header) + '\n'
+        else:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b'\n':
+                prefix = '\n'
+        f.write((prefix + '\n'.join(rows) + '\n').encode('utf-8'))
+
+    new_last = datetime.datetime.strptime(rows[-1].split(',')[0], '%Y-%m-%d').date()
+    write_manifest(datapath, new_last, header)
+    return new_last
+
+
+def update_data_file(ticker, datapath=None, today=None):
+    """티커 데이터 파일을 증분 업데이트하고 (데이터 경로, 추가된 행 수)를 반환
+
+    같은 파일을 동시에 요청하면 한 곳만 받고, 나머지는 기다렸다가 최신 상태를 확인만 한다.
+    이어 쓴 행은 다시 쓰지 않으므로 장 마감이 지난 마지막 거래일까지만 받는다 (today 도 그 날짜로 제한).
+    """
+    datapath = datapath or default_data_path(ticker)
+    closed = last_closed_session()
+    today = min(today, closed) if today else closed
+    os.makedirs(os.path.dirname(datapath), exist_ok=True)
+    with single_flight(datapath):
+        return _update_data_file(ticker, datapath, today)
+
+
+def _update_data_file(ticker, datapath, today):
+    exists = os.path.exists(datapath) and os.path.getsize(datapath) > 0
+    last_date = None
+    if exists:
+        try:
+            header = read_header(datapath)
+            last_date = read_last_date(datapath)
+        except Exception as e:
+            print(f"⚠️  [{ticker}] 기존 파일 읽기 오류: {e}")
+            return datapath, 0
+    else:
+        header = DEFAULT_HEADER
+
+    if last_date is not None and last_date >= today:
+        print(f"✅ [{ticker}] 데이터가 최신입니다. (마지막 날짜: {last_date})")
+        return datapath, 0
+
+    start_date = last_date + datetime.timedelta(days=1) if last_date else DEFAULT_START
+    print(f"📥 [{ticker}] 데이터 다운로드 중... (시작일: {start_date})")
+    try:
+        # end 는 마지막 확정 거래일 다음 날 (그날까지 포함)
+        df_new = download_history(ticker, start_date, today + datetime.timedelta(days=1))
+    except Exception as e:
+        print(f"❌ [{ticker}] 데이터 다운로드 오류: {e}")
+        return datapath, 0
+
+    if df_new.empty:
+        print(f"⚠️  [{ticker}] 새로운 데이터가 없습니다.")
+        return datapath, 0
+
+    df_new = df_new[df_new.index.strftime('%Y-%m-%d') <= today.isoformat()]
+    rows = format_rows(df_new, header, after=last_date)
+    if not rows:
+        print(f"⚠️  [{ticker}] 새로운 데이터가 없습니다.")
+        return datapath, 0
+
+    new_last = append_rows(datapath, header, rows)
+    print(f"💾 [{ticker}] {len(rows)}개 행 추가 (마지막 날짜: {new_last})")
+    return datapath, len(rows)
+
+
+def update_tickers(tickers, paths=None, max_workers=8):
+    """여러 티커 파일을 병렬로 업데이트. {ticker: 추가된 행 수} 반환"""
+    paths = paths or {}
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            pool.submit(update_data_file, ticker, paths.get(ticker)): ticker
+            for ticker in tickers
+        }
+        for future, ticker in futures.items():
+            try:
+                results[ticker] = future.result()[1]
+            except Exception as e:
+                print(f"❌ [{ticker}] 업데이트 실패: {e}")
+                results[ticker] = 0
+    return results
+
+
+if __name__ == "__main__":
+    import sys
+
+    tickers = sys.argv[1:] or ['ORCL']
+    print("="*70)
+    print(f"데이터 파일 증분 업데이트: {', '.join(tickers)}")
+    print("="*70)
+    # ORCL은 기존 파일명(orcl-1995-2014.txt)을 그대로 사용
+    paths = {'ORCL': os.path.join(DATA_DIR, 'orcl-1995-2014.txt')}
+    update_tickers(tickers, paths)
+    print("="*70)
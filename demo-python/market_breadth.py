@@ -0,0 +1,269 @@
+# market_breadth.py 파일
+# 시장 폭(breadth): 모든 거래일 x 유니버스 전체의 N일 신고가/신저가 종목 수와 목록
+# - find_50_day_highs 와 같은 정의: 그날 고가(저가)가 최근 N 거래일(당일 포함) 최고가(최저가)와 같으면 신고가(신저가)
+#   (N 거래일 데이터가 모두 있어야 판정, 상장 전/결측 구간은 제외)
+# - (종목 x 거래일) 행렬을 종목 묶음(chunk) 단위로 한 번에 계산 → 메모리는 묶음 크기로 제한
+# - 결과는 디렉터리 하나에 컬럼별 .npy 파일로 저장 (메모리 맵으로 읽음)
+#     dates.npy       거래일 (datetime64[D], 오름차순) → 날짜 조회는 이진 탐색
+#     tickers.json    종목 순서 + 메타 정보 (window, 기간, 데이터가 없는 종목/읽기 실패 종목)
+#     highs.npy       (거래일 x ceil(종목/8)) uint8, 종목 축으로 packbits 한 신고가 여부
+#     lows.npy        신저가 여부 (같은 형식)
+#     high_count.npy  거래일별 신고가 종목 수 (int32)
+#     low_count.npy   거래일별 신저가 종목 수 (int32)
+#   묶음 크기를 8의 배수로 두면 묶음별 결과가 바이트 경계에 맞으므로 그대로 열 구간에 쓸 수 있다
+# - 로컬 캐시가 없는 종목(missing)과 읽기/다운로드 실패 종목(failed)은 결측으로 계산하고 메타에 기록,
+#   유니버스 전체가 비어 있으면 저장하지 않고 중단 (새로 받은 저장소라면 --sync 로 생성)
+#
+# 생성)  python market_breadth.py build --window 50 --from 2004-01-01 --sync
+# 조회)  python market_breadth.py query 2020-03-16
+
+import argparse
+import datetime
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from numpy.lib.format import open_memmap
+from numpy.lib.stride_tricks import sliding_window_view
+
+from util.dynamic_date import default_calendar
+
+BREADTH_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'datas', 'breadth')
+CHUNK = 64   # 한 번에 계산하는 종목 수 (8의 배수)
+
+
+def breadth_path(window, root=BREADTH_DIR):
+    return os.path.join(root, 'nd%d' % window)
+
+
+class EmptyUniverseError(RuntimeError):
+    """유니버스의 모든 종목에 데이터가 없음 (캐시 없음/읽기 실패)"""
+
+    def __init__(self, missing, failed):
+        super(EmptyUniverseError, self).__init__(
+            '%d개 종목 모두 데이터가 없습니다 (캐시 없음 %d, 실패 %d). --sync 로 원본 캐시를 먼저 받으세요.'
+            % (len(missing) + len(failed), len(missing), len(failed)))
+        self.missing = missing
+        self.failed = failed
+
+
+def load_matrix(tickers, sessions, sync=False, workers=8):
+    """(종목 x 거래일) 고가/저가 행렬과 문제 종목. 거래가 없는 날은 NaN
+
+    반환: (highs, lows, missing, failed)
+      missing: 로컬 캐시에 데이터가 없는 종목 목록, failed: {종목: 오류 메시지}
+      (두 경우 모두 전 구간 결측으로 둔다)
+    """
+    from adjusted_cache import load_adjusted
+
+    days = sessions.astype('datetime64[D]')
+    highs = np.full((len(tickers), len(days)), np.nan)
+    lows = np.full((len(tickers), len(days)), np.nan)
+
+    def load(ticker):
+        try:
+            return load_adjusted(ticker, sync=sync), None
+        except Exception as e:   # 다운로드/파일 오류 종목은 전 구간 결측으로 두고 기록
+            return None, '%s: %s' % (type(e).__name__, e)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        loaded = list(pool.map(load, tickers))
+    missing, failed = [], {}
+    for i, (df, error) in enumerate(loaded):
+        if error is not None:
+            failed[tickers[i]] = error
+            continue
+        if df.empty:
+            missing.append(tickers[i])
+            continue
+        index = df.index.values.astype('datetime64[D]')
+        pos = np.searchsorted(days, index)
+        ok = (pos < len(days)) & (days[np.minimum(pos, len(days) - 1)] == index)
+        highs[i, pos[ok]] = df['High'].to_numpy(dtype='d')[ok]
+        lows[i, pos[ok]] = df['Low'].to_numpy(dtype='d')[ok]
+    return highs, lows, missing, failed
+
+
+def new_extremes(highs, lows, window):
+    """(종목 x 거래일) 신고가/신저가 bool 행렬. 앞쪽 window-1 일은 False"""
+    hit_high = np.zeros(highs.shape, dtype=bool)
+    hit_low = np.zeros(lows.shape, dtype=bool)
+    if highs.shape[1] < window:
+        return hit_high, hit_low
+    # 창 안에 NaN 이 있으면 max/min 도 NaN → 비교 결과 False (전체 창 데이터가 있어야 판정)
+    rolling_high = sliding_window_view(highs, window, axis=1).max(axis=-1)
+    rolling_low = sliding_window_view(lows, window, axis=1).min(axis=-1)
+    hit_high[:, window - 1:] = highs[:, window - 1:] == rolling_high
+    hit_low[:, window - 1:] = lows[:, window - 1:] == rolling_low
+    return hit_high, hit_low
+
+
+def build(tickers, window=50, fromdate=None, todate=None, root=BREADTH_DIR,
+          chunk=CHUNK, sync=False, workers=8):
+    """유니버스 전체 breadth 파일 생성. 저장 디렉터리 경로 반환
+
+    계산 시작일 이전 window-1 거래일도 함께 읽어 첫날부터 판정한다.
+    데이터가 없거나 읽지 못한 종목은 메타의 missing/failed 에 기록하고,
+    모든 종목이 그렇다면 EmptyUniverseError (메타를 쓰지 않으므로 열 수 없는 디렉터리로 남는다)
+    """
+    if chunk % 8:
+        raise ValueError('chunk 는 8의 배수여야 합니다: %d' % chunk)
+    calendar = default_calendar()
+    todate = todate or datetime.date.today()
+    fromdate = fromdate or datetime.date(todate.year - 20, 1, 1)
+    sessions = np.array(calendar.sessions_in_range(fromdate, todate), dtype='datetime64[D]')
+    lead = np.array(calendar.sessions_in_range(calendar.sessions_before(sessions[0].item(), window),
+                                               sessions[0].item()), dtype='datetime64[D]')[:-1]
+    padded = np.concatenate([lead, sessions])
+
+    path = breadth_path(window, root)
+    os.makedirs(path, exist_ok=True)
+    # 이전 결과의 메타를 먼저 지워, 다시 만드는 도중/실패한 디렉터리가 완성본으로 열리지 않게 한다
+    if os.path.exists(os.path.join(path, 'tickers.json')):
+        os.remove(os.path.join(path, 'tickers.json'))
+    n_days, n_bytes = len(sessions), (len(tickers) + 7) // 8
+    highs_out = open_memmap(os.path.join(path, 'highs.npy'), mode='w+', dtype=np.uint8, shape=(n_days, n_bytes))
+    lows_out = open_memmap(os.path.join(path, 'lows.npy'), mode='w+', dtype=np.uint8, shape=(n_days, n_bytes))
+    high_count = np.zeros(n_days, dtype=np.int32)
+    low_count = np.zeros(n_days, dtype=np.int32)
+    missing, failed = [], {}
+
+    for start in range(0, len(tickers), chunk):
+        names = tickers[start:start + chunk]
+        print(f"   -> {start + len(names)}/{len(tickers)} 종목 처리 중...")
+        highs, lows, chunk_missing, chunk_failed = load_matrix(names, padded, sync, workers)
+        missing.extend(chunk_missing)
+        failed.update(chunk_failed)
+        hit_high, hit_low = new_extremes(highs, lows, window)
+        hit_high, hit_low = hit_high[:, len(lead):], hit_low[:, len(lead):]
+        high_count += hit_high.sum(axis=0, dtype=np.int32)
+        low_count += hit_low.sum(axis=0, dtype=np.int32)
+        # 거래일 x 종목으로 돌려 종목 축을 packbits → 이 묶음의 바이트 열 구간에 기록
+        col = start // 8
+        packed_high = np.packbits(hit_high.T, axis=1)
+        packed_low = np.packbits(hit_low.T, axis=1)
+        highs_out[:, col:col + packed_high.shape[1]] = packed_high
+        lows_out[:, col:col + packed_low.shape[1]] = packed_low
+
+    highs_out.flush()
+    lows_out.flush()
+    del highs_out, lows_out
+    if len(missing) + len(failed) == len(tickers):
+        raise EmptyUniverseError(missing, failed)
+    np.save(os.path.join(path, 'dates.npy'), sessions)
+    np.save(os.path.join(path, 'high_count.npy'), high_count)
+    np.save(os.path.join(path, 'low_count.npy'), low_count)
+    # 메타 파일을 마지막에 써서, 도중에 실패한 디렉터리는 열리지 않게 한다
+    meta = {
+        'window': window,
+        'tickers': list(tickers),
+        'from': str(sessions[0]),
+        'to': str(sessions[-1]),
+        'missing': missing,
+        'failed': failed,
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+    }
+    tmp = os.path.join(path, 'tickers.json.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp, os.path.join(path, 'tickers.json'))
+    return path
+
+
+class Breadth(object):
+    """저장된 breadth 파일 조회 (메모리 맵, 날짜별 조회는 한 행만 읽는다)"""
+
+    def __init__(self, window=50, root=BREADTH_DIR):
+        path = breadth_path(window, root)
+        with open(os.path.join(path, 'tickers.json'), 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        self.tickers = np.array(self.meta['tickers'])
+        self.dates = np.load(os.path.join(path, 'dates.npy'))
+        self.highs = np.load(os.path.join(path, 'highs.npy'), mmap_mode='r')
+        self.lows = np.load(os.path.join(path, 'lows.npy'), mmap_mode='r')
+        self.high_count = np.load(os.path.join(path, 'high_count.npy'), mmap_mode='r')
+        self.low_count = np.load(os.path.join(path, 'low_count.npy'), mmap_mode='r')
+
+    def row(self, date):
+        """date 의 행 번호. 거래일이 아니면 KeyError"""
+        day = np.datetime64(date, 'D')
+        i = int(np.searchsorted(self.dates, day))
+        if i >= len(self.dates) or self.dates[i] != day:
+            raise KeyError('%s 는 저장된 거래일이 아닙니다.' % date)
+        return i
+
+    def _names(self, packed, i):
+        mask = np.unpackbits(packed[i], count=len(self.tickers)).astype(bool)
+        return self.tickers[mask].tolist()
+
+    def highs_on(self, date):
+        return self._names(self.highs, self.row(date))
+
+    def lows_on(self, date):
+        return self._names(self.lows, self.row(date))
+
+    def counts(self, fromdate=None, todate=None):
+        """(거래일, 신고가 수, 신저가 수) 배열 구간"""
+        lo = 0 if fromdate is None else int(np.searchsorted(self.dates, np.datetime64(fromdate, 'D')))
+        hi = len(self.dates) if todate is None else int(
+            np.searchsorted(self.dates, np.datetime64(todate, 'D'), side='right'))
+        return self.dates[lo:hi], self.high_count[lo:hi], self.low_count[lo:hi]
+
+
+def print_problems(missing, failed):
+    """데이터가 없거나 읽지 못한 종목 출력"""
+    if missing:
+        print(f"   ⚠️  캐시 없음 {len(missing)}개: {', '.join(missing)}")
+    for ticker, error in failed.items():
+        print(f"   ❌ [{ticker}] 읽기 실패: {error}")
+
+
+def print_day(breadth, date):
+    highs, lows = breadth.highs_on(date), breadth.lows_on(date)
+    print("="*70)
+    print(f"    📊 {date} {breadth.meta['window']}일 신고가 {len(highs)}개 / 신저가 {len(lows)}개")
+    print("="*70)
+    print_problems(breadth.meta.get('missing', []), breadth.meta.get('failed', {}))
+    print(f"   신고가: {', '.join(highs) or '-'}")
+    print(f"   신저가: {', '.join(lows) or '-'}")
+    print("="*70)
+
+
+def _date(text):
+    return datetime.datetime.strptime(text, '%Y-%m-%d').date()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='N일 신고가/신저가 시장 폭(breadth)')
+    sub = parser.add_subparsers(dest='command', required=True)
+    p = sub.add_parser('build', help='breadth 파일 생성')
+    p.add_argument('--window', type=int, default=50)
+    p.add_argument('--from', dest='fromdate', type=_date, default=None)
+    p.add_argument('--to', dest='todate', type=_date, default=None)
+    p.add_argument('--tickers', default=None, help='쉼표 구분 (기본: 나스닥 100)')
+    p.add_argument('--sync', action='store_true', help='로컬 원본 캐시를 먼저 증분 업데이트')
+    p.add_argument('--chunk', type=int, default=CHUNK)
+    p = sub.add_parser('query', help='날짜별 신고가/신저가 종목')
+    p.add_argument('date', type=_date)
+    p.add_argument('--window', type=int, default=50)
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        if args.tickers:
+            tickers = args.tickers.split(',')
+        else:
+            from nasdaq_data import get_nasdaq_100_tickers
+            tickers = get_nasdaq_100_tickers() or []
+        try:
+            path = build(tickers, args.window, args.fromdate, args.todate, chunk=args.chunk, sync=args.sync)
+        except EmptyUniverseError as e:
+            print_problems(e.missing, e.failed)
+            print(f"❌ {e}")
+            sys.exit(1)
+        meta = Breadth(args.window).meta
+        print_problems(meta['missing'], meta['failed'])
+        print(f"💾 breadth 저장: {path} ({len(tickers) - len(meta['missing']) - len(meta['failed'])}/{len(tickers)} 종목)")
+    else:
+        print_day(Breadth(args.window), args.date)
@@ -0,0 +1,272 @@
+# memory_profile.py 파일
+# 백테스트/스캔 메모리 계측 (opt-in)
+# - 단계(phase)별: tracemalloc 최대 사용량, 증가량 상위 할당 위치(top allocators),
+#   단계 중 RSS 최대값 (백그라운드 스레드가 RSS_SAMPLE_INTERVAL 마다 /proc 에서 샘플링)
+# - 보고서 전체: 프로세스 시작 이후 최대 RSS (ru_maxrss, 단계별 값이 아님)
+# - 백테스트가 끝난 뒤 피드/지표/옵저버의 라인 버퍼 크기 (어떤 구조를 줄여야 하는지 확인용)
+# - 결과는 JSON 보고서로 저장 (기계 판독용)
+#
+# 사용 예)
+#   profiler = MemoryProfiler(enabled=True)
+#   with profiler.phase('data_load'):
+#       df = load_history(...)
+#   ...
+#   profiler.record_buffers(strat)
+#   profiler.write('memory_report.json')
+
+import contextlib
+import datetime
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:   # Windows 에는 resource 모듈이 없음
+    resource = None
+
+# 할당 위치 집계에서 제외할 내부 프레임
+_IGNORED_FILES = (__file__, tracemalloc.__file__, contextlib.__file__, threading.__file__,
+                  '<frozen importlib._bootstrap>', '<frozen importlib._bootstrap_external>')
+
+RSS_SAMPLE_INTERVAL = 0.01   # 단계 중 RSS 샘플링 주기(초)
+
+
+def peak_rss_bytes():
+    """프로세스 시작 이후 최대 RSS (바이트). 측정할 수 없으면 None"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 는 KB, macOS 는 바이트 단위
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def current_rss_bytes():
+    """현재 RSS (바이트, Linux /proc 기준). 측정할 수 없으면 None"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class RssSampler(threading.Thread):
+    """구간 동안 RSS 를 주기적으로 읽어 최대값을 기록 (샘플 사이의 짧은 최대값은 놓칠 수 있음)"""
+
+    def __init__(self, interval=RSS_SAMPLE_INTERVAL):
+        threading.Thread.__init__(self, daemon=True)
+        self.interval = interval
+        self.peak = current_rss_bytes()
+        self._stop_event = threading.Event()
+
+    def _sample(self):
+        rss = current_rss_bytes()
+        if rss is not None:
+            self.peak = rss if self.peak is None else max(self.peak, rss)
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self._sample()
+
+    def stop(self):
+        """샘플링을 멈추고 최대 RSS (바이트, 측정할 수 없으면 None) 반환"""
+        self._stop_event.set()
+        self.join()
+        self._sample()
+        return self.peak
+
+
+def _mb(value):
+    return None if value is None else round(value / 1024.0 / 1024.0, 3)
+
+
+class MemoryProfiler(object):
+    """단계별 메모리 사용량을 기록. enabled=False 이면 모든 호출이 아무 일도 하지 않는다"""
+
+    def __init__(self, enabled=True, top=10, frames=1):
+        self.enabled = enabled
+        self.top = top
+        self.frames = frames
+        self.phases = []
+        self.buffers = None
+        self._stack = []   # 중첩 단계의 [이름, 진행 중 최대값]
+
+    def _filtered(self, snapshot):
+        return snapshot.filter_traces([tracemalloc.Filter(False, name) for name in _IGNORED_FILES])
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        if not self.enabled:
+            yield
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+
+        # 바깥 단계의 최대값을 보존한 뒤 이 단계의 최대값을 새로 측정
+        if self._stack:
+            self._stack[-1][1] = max(self._stack[-1][1], tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+        entry = [name, 0]
+        self._stack.append(entry)
+
+        start_snapshot = self._filtered(tracemalloc.take_snapshot())
+        start_current = tracemalloc.get_traced_memory()[0]
+        sampler = RssSampler()
+        sampler.start()
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - t0
+            rss_peak = sampler.stop()
+            current, peak = tracemalloc.get_traced_memory()
+            peak = max(peak, entry[1])
+            self._stack.pop()
+            if self._stack:
+                self._stack[-1][1] = max(self._stack[-1][1], peak)
+
+            stats = self._filtered(tracemalloc.take_snapshot()).compare_to(start_snapshot, 'lineno')
+            self.phases.append({
+                'phase': name,
+                'parent': self._stack[-1][0] if self._stack else None,
+                'seconds': round(elapsed, 4),
+                'traced_start_mb': _mb(start_current),
+                'traced_end_mb': _mb(current),
+                'traced_peak_mb': _mb(peak),
+                'rss_mb': _mb(current_rss_bytes()),
+                'rss_peak_mb': _mb(rss_peak),   # 이 단계 중 샘플링한 최대 RSS
+                'top_allocators': [
+                    {
+                        'location': '%s:%d' % (stat.traceback[0].filename, stat.traceback[0].lineno),
+                        'size_diff_kb': round(stat.size_diff / 1024.0, 1),
+                        'count_diff': stat.count_diff,
+                    }
+                    for stat in stats[:self.top] if stat.size_diff > 0
+                ],
+            })
+
+    def wrap_strategy(self, strategy_cls):
+        """전략 __init__ (지표 생성)을 'indicators' 단계로 기록하는 서브클래스"""
+        if not self.enabled:
+            return strategy_cls
+        profiler = self
+
+        class ProfiledStrategy(strategy_cls):
+            def __init__(self, *args, **kwargs):
+                with profiler.phase('indicators'):
+                    super(ProfiledStrategy, self).__init__(*args, **kwargs)
+
+        ProfiledStrategy.__name__ = strategy_cls.__name__
+        return ProfiledStrategy
+
+    def record_buffers(self, strategy):
+        if self.enabled:
+            self.buffers = line_buffer_report(strategy)
+
+    def report(self):
+        return {
+            'created': datetime.datetime.now().isoformat(timespec='seconds'),
+            'argv': sys.argv,
+            'process_peak_rss_mb': _mb(peak_rss_bytes()),
+            'phases': self.phases,
+            'line_buffers': self.buffers,
+        }
+
+    def write(self, path):
+        """JSON 보고서 저장 후 요약 출력"""
+        if not self.enabled:
+            return
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, indent=2, ensure_ascii=False)
+        print_summary(self.report())
+        print(f"💾 메모리 보고서 저장: {path}")
+
+
+# ----------------------------------------------------------------------
+# 라인 버퍼 크기
+# ----------------------------------------------------------------------
+
+def _lines_info(obj):
+    """객체의 라인별 버퍼 길이와 추정 바이트 수"""
+    if hasattr(obj.lines, 'getlinealiases'):
+        aliases = obj.lines.getlinealiases()
+        buffers = [obj.lines[i] for i in range(obj.lines.fullsize())]
+    else:
+        # data.high - data.low 같은 연산 결과(LinesOperation)는 자기 자신이 버퍼 하나
+        aliases = ()
+        buffers = list(obj.lines)
+    lines = {}
+    total = 0
+    for i, buffer in enumerate(buffers):
+        array = getattr(buffer, 'array', None)
+        if array is None:
+            continue
+        # array('d') 는 itemsize, 메모리 절약 모드(deque)는 float 객체 하나당 8바이트로 추정
+        total += len(array) * getattr(array, 'itemsize', 8)
+        lines[aliases[i] if i < len(aliases) else 'line%d' % i] = len(array)
+    return lines, total
+
+
+def _walk_indicators(owner, path):
+    getindicators = getattr(owner, 'getindicators', None)
+    if getindicators is None:
+        return
+    for indicator in getindicators():
+        name = '%s/%s' % (path, indicator.__class__.__name__)
+        lines, nbytes = _lines_info(indicator)
+        yield {'name': name, 'lines': lines, 'bytes': nbytes}
+        # ADX, DonchianChannel 같은 지표 안의 하위 지표까지
+        for child in _walk_indicators(indicator, name):
+            yield child
+
+
+def line_buffer_report(strategy):
+    """전략의 피드/지표/옵저버 라인 버퍼 크기 보고서 (dict)"""
+    feeds = []
+    for data in strategy.datas:
+        lines, nbytes = _lines_info(data)
+        feeds.append({'name': data._name or data.__class__.__name__, 'lines': lines, 'bytes': nbytes})
+
+    indicators = list(_walk_indicators(strategy, strategy.__class__.__name__))
+
+    observers = []
+    for observer in strategy.getobservers():
+        lines, nbytes = _lines_info(observer)
+        observers.append({'name': observer.__class__.__name__, 'lines': lines, 'bytes': nbytes})
+
+    own_lines, own_bytes = _lines_info(strategy)
+    groups = (feeds, indicators, observers)
+    return {
+        'feeds': feeds,
+        'indicators': sorted(indicators, key=lambda r: -r['bytes']),
+        'observers': observers,
+        'strategy': {'lines': own_lines, 'bytes': own_bytes},
+        'total_mb': _mb(own_bytes + sum(r['bytes'] for group in groups for r in group)),
+    }
+
+
+def print_summary(report):
+    print("="*70)
+    print("    🧠 메모리 프로파일")
+    print("="*70)
+    for phase in report['phases']:
+        label = phase['phase'] if phase['parent'] is None else '  ' + phase['phase']
+        rss = '' if phase['rss_peak_mb'] is None else f"  RSS peak {phase['rss_peak_mb']:9.1f} MB"
+        print(f"   {label:<16} peak {phase['traced_peak_mb']:9.2f} MB  "
+              f"end {phase['traced_end_mb']:9.2f} MB  {phase['seconds']:8.2f}s{rss}")
+        if phase['top_allocators']:
+            top = phase['top_allocators'][0]
+            print(f"   {'':<16} └ {top['location']} (+{top['size_diff_kb']:.1f} KB)")
+    if report['process_peak_rss_mb'] is not None:
+        print(f"   프로세스 최대 RSS: {report['process_peak_rss_mb']:.1f} MB")
+    buffers = report['line_buffers']
+    if buffers:
+        print(f"   라인 버퍼 합계: {buffers['total_mb']:.2f} MB "
+              f"(피드 {len(buffers['feeds'])}, 지표 {len(buffers['indicators'])}, "
+              f"옵저버 {len(buffers['observers'])})")
+        for row in buffers['indicators'][:5]:
+            print(f"     {row['name']:<50} {row['bytes'] / 1024.0:9.1f} KB")
+    print("="*70)
@@ -0,0 +1,237 @@
+# query_server.py 파일
+# 팀 공용 로컬 조회 API 서버
+# - 최신 50일 신고가 목록, OHLCV 구간, TurtleStrategy 백테스트 결과를 JSON(또는 Arrow)으로 제공
+# - 같은 요청은 한 번만 계산하고(메모이제이션 + 동시 요청 대기) 결과를 공유 → N명이 써도 계산은 1회
+# - ETag / If-None-Match 로 클라이언트 캐시 지원 (변경이 없으면 304)
+# - OHLCV 는 로컬 수정주가 캐시(adjusted_cache, 네트워크 없음)만 읽는다 → 캐시는 data_updater/adjusted_cache 로 갱신
+# - 잘못된 날짜/파라미터는 400, 데이터가 없는 종목은 404
+#
+# 실행)   python query_server.py --port 8080
+# 조회)   curl localhost:8080/highs
+#         curl localhost:8080/ohlcv?ticker=ORCL&start=2014-01-01&end=2014-12-31
+#         curl "localhost:8080/backtest?ticker=SPY&from=2024-01-01&to=2025-11-04&adx_threshold=20"
+
+import argparse
+import datetime
+import hashlib
+import io
+import json
+import os
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# backtrader 예제 모듈(turtle_strategy 등)을 import 하기 위한 경로 추가
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backtrader'))
+
+from shared_cache import Memo
+from util.params import parse_value
+
+HIGHS_TTL = 15 * 60        # 신고가 목록 캐시 유지 시간(초)
+OHLCV_TTL = 60 * 60        # OHLCV 캐시 유지 시간(초)
+BACKTEST_TTL = 24 * 60 * 60
+
+MEMO = Memo()
+
+
+def compute_highs():
+    from nasdaq_data import get_nasdaq_100_tickers
+    from yfinance_data import find_50_day_highs
+
+    tickers = get_nasdaq_100_tickers()
+    rows = find_50_day_highs(tickers) if tickers else []
+    return {
+        'as_of': datetime.datetime.now().isoformat(timespec='seconds'),
+        'count': len(rows),
+        'rows': [dict(row, Current_Price=float(row['Current_Price'])) for row in rows],
+    }
+
+
+class BadRequest(ValueError):
+    """잘못된 요청 인자 (400)"""
+
+
+class NotFound(LookupError):
+    """데이터가 없음 (404)"""
+
+
+def parse_date(text, name):
+    """'YYYY-MM-DD' 쿼리 값을 date 로 (형식이 틀리면 BadRequest)"""
+    try:
+        return datetime.datetime.strptime(text, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        raise BadRequest('%s 는 YYYY-MM-DD 형식이어야 합니다: %r' % (name, text))
+
+
+def date_range(query, start_key, end_key, start=None, end=None):
+    """쿼리의 시작/종료일 (없으면 기본값). 시작이 종료보다 늦으면 BadRequest"""
+    if start_key in query:
+        start = parse_date(query[start_key], start_key)
+    if end_key in query:
+        end = parse_date(query[end_key], end_key)
+    if start and end and start > end:
+        raise BadRequest('%s(%s) 가 %s(%s) 보다 늦습니다.' % (start_key, start, end_key, end))
+    return start, end
+
+
+def strategy_params(query):
+    """나머지 쿼리 값을 TurtleStrategy 파라미터로 (모르는 이름/숫자가 아닌 값은 BadRequest)"""
+    from turtle_strategy import TurtleStrategy
+
+    defaults = dict(TurtleStrategy.params._getitems())
+    unknown = sorted(set(query) - set(defaults))
+    if unknown:
+        raise BadRequest('알 수 없는 파라미터: %s' % ', '.join(unknown))
+    params = {k: parse_value(v) for k, v in sorted(query.items())}
+    for name, value in params.items():
+        # 숫자 파라미터에 숫자가 아닌 값
+        if isinstance(defaults[name], (int, float)) and not isinstance(value, (int, float)):
+            raise BadRequest('%s 는 숫자여야 합니다: %r' % (name, value))
+    return params
+
+
+def load_ohlcv(ticker):
+    """로컬 캐시의 수정주가 일봉 (분할/배당 반영, 네트워크 없음). 캐시가 없으면 NotFound"""
+    from adjusted_cache import load_adjusted
+
+    df = load_adjusted(ticker, sync=False)
+    if df.empty:
+        raise NotFound('%s 의 로컬 캐시가 없습니다 (adjusted_cache 로 먼저 받으세요).' % ticker)
+    return df
+
+
+def ohlcv_slice(ticker, start, end):
+    import pandas as pd
+
+    df = MEMO.get(('ohlcv', ticker), lambda: load_ohlcv(ticker), OHLCV_TTL)
+    if start is not None:
+        df = df[df.index >= pd.Timestamp(start)]
+    if end is not None:
+        df = df[df.index <= pd.Timestamp(end)]
+    return df
+
+
+def compute_backtest(ticker, fromdate, todate, params):
+    import turtle_strategy
+
+    df = turtle_strategy.load_history(ticker, fromdate, todate)
+    if df.empty:
+        raise NotFound('%s 데이터를 가져오지 못했습니다.' % ticker)
+    _, _, metrics = turtle_strategy.run_backtest(df, ticker, printlog=False, **params)
+    return dict(metrics, ticker=ticker, fromdate=str(fromdate), todate=str(todate), params=params)
+
+
+def frame_to_records(df):
+    out = df.reset_index()
+    first = out.columns[0]
+    out[first] = out[first].astype(str)
+    return out.to_dict(orient='records')
+
+
+def to_arrow(payload):
+    """Arrow IPC 스트림으로 직렬화 (pyarrow 가 설치된 경우에만 지원)"""
+    import pyarrow as pa
+    import pandas as pd
+
+    if isinstance(payload, pd.DataFrame):
+        table = pa.Table.from_pandas(payload.reset_index())
+    elif isinstance(payload, dict) and 'rows' in payload:
+        table = pa.Table.from_pylist(payload['rows'])
+    else:
+        table = pa.Table.from_pylist([payload])
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+
+    def _send_body(self, body, content_type):
+        etag = '"%s"' % hashlib.sha1(body).hexdigest()
+        # 클라이언트가 가진 버전과 같으면 본문 없이 304
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status, message):
+        body = json.dumps({'error': message}).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _respond(self, payload, fmt):
+        if fmt == 'arrow':
+            try:
+                return self._send_body(to_arrow(payload), 'application/vnd.apache.arrow.stream')
+            except ImportError:
+                return self._send_error(406, 'pyarrow 가 설치되어 있지 않아 arrow 형식을 지원하지 않습니다.')
+        if hasattr(payload, 'reset_index'):
+            payload = frame_to_records(payload)
+        body = json.dumps(payload, ensure_ascii=False, default=str).encode('utf-8')
+        self._send_body(body, 'application/json; charset=utf-8')
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        fmt = query.pop('format', 'json')
+        try:
+            if url.path == '/highs':
+                payload = MEMO.get(('highs',), compute_highs, HIGHS_TTL)
+            elif url.path == '/ohlcv':
+                ticker = query.get('ticker', 'ORCL').upper()
+                start, end = date_range(query, 'start', 'end')
+                payload = ohlcv_slice(ticker, start, end)
+            elif url.path == '/backtest':
+                ticker = query.pop('ticker', 'SPY').upper()
+                fromdate, todate = date_range(query, 'from', 'to',
+                                              datetime.date(2024, 1, 1), datetime.date(2025, 11, 4))
+                query.pop('from', None)
+                query.pop('to', None)
+                params = strategy_params(query)
+                key = ('backtest', ticker, fromdate, todate, tuple(sorted(params.items())))
+                payload = MEMO.get(
+                    key, lambda: compute_backtest(ticker, fromdate, todate, params), BACKTEST_TTL)
+            else:
+                return self._send_error(404, 'not found')
+        except BadRequest as e:
+            return self._send_error(400, str(e))
+        except NotFound as e:
+            return self._send_error(404, str(e))
+        except Exception as e:
+            return self._send_error(500, str(e))
+        self._respond(payload, fmt)
+
+    def log_message(self, format, *args):
+        # 요청마다 stderr 로그를 남기지 않음
+        pass
+
+
+def serve(host='127.0.0.1', port=8080):
+    server = ThreadingHTTPServer((host, port), QueryHandler)
+    print(f"🚀 조회 API 서버 시작: http://{host}:{port}  (/highs, /ohlcv, /backtest)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("서버 종료")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='로컬 조회 API 서버')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    args = parser.parse_args()
+    serve(args.host, args.port)
@@ -0,0 +1,284 @@
+# scanner_daemon.py 파일
+# 상시 실행 50일 신고가 스캐너
+# - asyncio 스케줄러로 주기적으로(기본 5분) 최신 봉만 받아서 메모리 상태를 갱신
+# - 확정된 일봉은 공유 캐시(adjusted_cache)로 받는다: 다른 도구/프로세스와 같은 파일을
+#   single-flight 잠금 안에서 한 번만 받고 이어 쓰며, 새 봉이 들어온 날만 파일을 다시 읽는다
+# - 공유 캐시가 없는 종목은 전체 이력(1995~)을 받지 않고 최근 WINDOW + BOOTSTRAP_MARGIN 거래일만
+#   메모리로 받는다 (하루 한 번). 짧은 이력을 공유 캐시에 쓰면 다른 도구가 잘린 이력을 읽게 되므로 쓰지 않음
+# - 진행 중인 당일 봉만 메모리로 받는다 (미확정 봉은 append-only 파일에 쓰지 않음)
+# - 종목별 최근 50거래일 고가를 deque 로 유지 (전체 재다운로드 X)
+# - 데이터가 바뀐 종목만 다시 판정하고, 신고가 목록의 "변화"(신규 진입/이탈)만 출력
+#   (시작 시와 유니버스에 새로 들어온 종목은 현재 신고가 여부로 목록만 채우고 진입으로 출력하지 않음)
+#
+# 실행)   python scanner_daemon.py --interval 300
+
+import argparse
+import asyncio
+import datetime
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import yfinance as yf
+
+import adjusted_cache
+from nasdaq_data import get_nasdaq_100_tickers
+from util.dynamic_date import MARKET_TZ, default_calendar, last_closed_session, window_start
+
+WINDOW = 50  # 50 거래일 기준
+SYNC_WORKERS = 8  # 공유 캐시 동기화 동시 다운로드 수
+BOOTSTRAP_MARGIN = 10  # 캐시가 없는 종목의 초기 다운로드 여유 (거래일, 거래 정지/결측 대비)
+
+
+class TickerState(object):
+    """종목 하나의 롤링 상태 (최근 WINDOW 개 고가와 마지막 봉)"""
+
+    def __init__(self):
+        self.highs = deque(maxlen=WINDOW)
+        self.last_date = None
+        self.last_close = None
+        self.closed_date = None  # 공유 캐시에서 읽은 마지막 확정 봉 날짜
+
+    def update(self, df):
+        """새 봉을 반영하고 변경 여부를 반환 (같은 날짜 봉은 장중 갱신으로 덮어씀)"""
+        changed = False
+        for ts, row in df.iterrows():
+            bar_date = ts.date()
+            if pd.isna(row['High']):
+                continue
+            if self.last_date is not None and bar_date < self.last_date:
+                continue
+            if bar_date == self.last_date:
+                if self.highs[-1] != row['High'] or self.last_close != row['Close']:
+                    self.highs[-1] = row['High']
+                    changed = True
+            else:
+                self.highs.append(row['High'])
+                self.last_date = bar_date
+                changed = True
+            self.last_close = row['Close']
+        return changed
+
+    def at_50_day_high(self):
+        # 최근 고가가 지난 50거래일 최고가와 같으면 신고가 (find_50_day_highs 와 동일 기준)
+        return len(self.highs) >= WINDOW and self.highs[-1] == max(self.highs)
+
+
+def split_by_ticker(data, tickers):
+    """yf.download(group_by='ticker') 결과를 {ticker: DataFrame} 으로 분리"""
+    if data is None or data.empty:
+        return {}
+    if not isinstance(data.columns, pd.MultiIndex):
+        return {tickers[0]: data}
+    frames = {}
+    for ticker in tickers:
+        if ticker in data.columns.get_level_values(0):
+            frames[ticker] = data[ticker].dropna(how='all')
+    return frames
+
+
+def cached_last_date(ticker):
+    path = adjusted_cache.raw_data_path(ticker)
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return None
+    return adjusted_cache.read_last_date(path)
+
+
+class Scanner(object):
+    """유니버스 가격 상태와 신고가 목록을 메모리에 유지하는 스캐너"""
+
+    def __init__(self):
+        self.states = {}
+        self.highs = set()
+        self.names = {}
+
+    def refresh_universe(self):
+        """구성 종목을 다시 받아 추가/제외된 종목만 반영. (추가, 제외) 반환"""
+        tickers = get_nasdaq_100_tickers()
+        if not tickers:
+            return
+        removed = set(self.states) - set(tickers)
+        for ticker in removed:
+            del self.states[ticker]
+        added = [t for t in tickers if t not in self.states]
+        if added:
+            self._fetch(added)
+        return added, removed
+
+    def refresh_prices(self):
+        """공유 캐시의 새 확정 봉과 당일 봉을 반영. 변경된 종목 반환"""
+        if not self.states:
+            return set()
+        return self._fetch(list(self.states))
+
+    def _fetch(self, tickers):
+        now = datetime.datetime.now(MARKET_TZ)
+        closed = last_closed_session(now)
+        changed = self._sync_closed(tickers, closed)
+        if default_calendar().is_session(now.date()) and closed < now.date():
+            changed |= self._fetch_live(tickers, now.date())
+        return changed
+
+    def _sync_closed(self, tickers, closed):
+        """확정 봉은 공유 캐시로 갱신하고, 새 봉이 들어온 종목만 최근 WINDOW 봉으로 상태를 다시 만든다
+
+        캐시가 없는 종목은 공유 캐시를 만들지 않고 _bootstrap 으로 최근 구간만 받는다
+        """
+        def sync(ticker):
+            if cached_last_date(ticker) is None:
+                return ticker, None
+            try:
+                adjusted_cache.sync_ticker(ticker, today=closed)
+            except Exception as e:
+                # 다운로드 실패는 캐시에 있는 봉으로 판정하고 다음 주기에 다시 시도
+                print(f"⚠️  [{ticker}] 캐시 갱신 실패: {e}")
+            return ticker, cached_last_date(ticker)
+
+        changed = set()
+        uncached = []
+        with ThreadPoolExecutor(max_workers=SYNC_WORKERS) as pool:
+            for ticker, last_date in pool.map(sync, tickers):
+                state = self.states.get(ticker)
+                if last_date is None:
+                    # 새 거래일이 확정됐을 때만 다시 받는다
+                    if state is None or state.closed_date is None or state.closed_date < closed:
+                        uncached.append(ticker)
+                    continue
+                if state is not None and state.closed_date == last_date:
+                    continue
+                # 분할이 생기면 과거 봉도 바뀌므로 이어 붙이지 않고 다시 만든다 (하루 한 번)
+                df = adjusted_cache.load_adjusted(ticker, dividends=False, sync=False)
+                state = TickerState()
+                state.update(df.tail(WINDOW))
+                state.closed_date = last_date
+                self.states[ticker] = state
+                changed.add(ticker)
+        if uncached:
+            changed |= self._bootstrap(uncached, closed)
+        return changed
+
+    def _bootstrap(self, tickers, closed):
+        """캐시가 없는 종목의 최근 WINDOW + BOOTSTRAP_MARGIN 거래일 확정 봉을 batch 로 받아 상태를 만든다"""
+        start = window_start(WINDOW + BOOTSTRAP_MARGIN, closed)
+        # auto_adjust=False 의 가격은 분할만 반영 → 공유 캐시의 load_adjusted(dividends=False) 와 같은 기준
+        data = yf.download(tickers, start=start, end=closed + datetime.timedelta(days=1), interval='1d',
+                           group_by='ticker', progress=False, auto_adjust=False, threads=True)
+        changed = set()
+        for ticker, df in split_by_ticker(data, tickers).items():
+            df = df[df.index.date <= closed]
+            if df.empty:
+                continue
+            state = TickerState()
+            state.update(df.tail(WINDOW))
+            # 마지막 봉이 closed 보다 이르더라도(거래 정지 등) 이 거래일은 받은 것으로 본다
+            state.closed_date = closed
+            self.states[ticker] = state
+            changed.add(ticker)
+        return changed
+
+    def _fetch_live(self, tickers, today):
+        """진행 중인 당일 봉만 batch 로 받아 메모리 상태에 반영 (파일에는 쓰지 않음)"""
+        data = yf.download(tickers, start=today, interval='1d', group_by='ticker',
+                           progress=False, auto_adjust=False, threads=True)
+        changed = set()
+        for ticker, df in split_by_ticker(data, tickers).items():
+            state = self.states.get(ticker)
+            if state is None or state.closed_date is None:
+                continue
+            if state.update(df[df.index.date > state.closed_date]):
+                changed.add(ticker)
+        return changed
+
+    def seed(self, tickers):
+        """이전 상태가 없는 종목의 현재 신고가 여부를 목록에 채운다 (신규 진입으로 출력하지 않음)"""
+        for ticker in tickers:
+            state = self.states.get(ticker)
+            if state is not None and state.at_50_day_high():
+                self.highs.add(ticker)
+
+    def rescan(self, changed):
+        """변경된 종목만 다시 판정하여 (신규 진입, 이탈) 반환"""
+        entries, exits = [], []
+        for ticker in changed:
+            state = self.states.get(ticker)
+            hit = state is not None and state.at_50_day_high()
+            if hit and ticker not in self.highs:
+                self.highs.add(ticker)
+                entries.append(ticker)
+            elif not hit and ticker in self.highs:
+                self.highs.discard(ticker)
+                exits.append(ticker)
+        # 유니버스에서 빠진 종목은 이탈로 처리
+        for ticker in list(self.highs - set(self.states)):
+            self.highs.discard(ticker)
+            exits.append(ticker)
+        return entries, exits
+
+    def name_of(self, ticker):
+        # 종목명은 신규 진입 시에만 한 번 조회하여 캐시
+        if ticker not in self.names:
+            try:
+                self.names[ticker] = yf.Ticker(ticker).info.get('shortName', 'N/A')
+            except Exception:
+                self.names[ticker] = 'N/A'
+        return self.names[ticker]
+
+    def emit(self, entries, exits):
+        now = datetime.datetime.now(MARKET_TZ).strftime('%Y-%m-%d %H:%M')
+        for ticker in sorted(entries):
+            state = self.states[ticker]
+            print(f"[{now}] ⭐ 신규 50일 신고가: {ticker} ({self.name_of(ticker)}) "
+                  f"{state.last_close:.2f}")
+        for ticker in sorted(exits):
+            print(f"[{now}] 🔻 50일 신고가 이탈: {ticker}")
+        if entries or exits:
+            print(f"[{now}]    현재 신고가 종목 {len(self.highs)}개")
+
+
+def market_is_open(now=None):
+    """정규장(거래일 09:30~16:00, 뉴욕 시간) 여부"""
+    now = now or datetime.datetime.now(MARKET_TZ)
+    if not default_calendar().is_session(now.date()):
+        return False
+    return datetime.time(9, 30) <= now.time() <= datetime.time(16, 0)
+
+
+async def run_scanner(interval=300, universe_interval=86400, always=False):
+    """주기적으로 가격 델타를 받아 신고가 목록 변화를 출력하는 메인 루프"""
+    loop = asyncio.get_running_loop()
+    scanner = Scanner()
+
+    print("👉 유니버스 및 초기 50거래일 데이터 로딩 중...")
+    await loop.run_in_executor(None, scanner.refresh_universe)
+    scanner.seed(scanner.states)
+    print(f"   현재 50일 신고가 종목 {len(scanner.highs)}개: {', '.join(sorted(scanner.highs)) or '-'}")
+    last_universe = loop.time()
+
+    while True:
+        await asyncio.sleep(interval)
+        if not always and not market_is_open():
+            continue
+        try:
+            changed = set()
+            if loop.time() - last_universe >= universe_interval:
+                result = await loop.run_in_executor(None, scanner.refresh_universe)
+                last_universe = loop.time()
+                if result:
+                    scanner.seed(result[0])
+            changed |= await loop.run_in_executor(None, scanner.refresh_prices)
+            scanner.emit(*scanner.rescan(changed))
+        except Exception as e:
+            # 일시적인 네트워크 오류 등은 다음 주기에 다시 시도
+            print(f"❌ 갱신 오류: {e}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='상시 실행 50일 신고가 스캐너')
+    parser.add_argument('--interval', type=int, default=300, help='가격 갱신 주기(초)')
+    parser.add_argument('--always', action='store_true', help='장외 시간에도 갱신')
+    args = parser.parse_args()
+    try:
+        asyncio.run(run_scanner(args.interval, always=args.always))
+    except KeyboardInterrupt:
+        print("스캐너 종료")
@@ -0,0 +1,235 @@
+# shared_cache.py 파일
+# 여러 프로세스(스캐너, 백테스트, 차트 스크립트)가 같은 티커 데이터 파일을 함께 쓸 때의 접근 계층
+# - 쓰기: 파일 잠금(lock 파일에 거는 OS 잠금, POSIX flock / Windows msvcrt.locking) 안에서만 갱신
+#   · 잠금을 가진 프로세스가 죽으면 OS 가 잠금을 풀어 주므로 별도의 정리가 필요 없다
+# - 단일 실행(single-flight): 같은 키(파일)에 대한 동시 요청은 스레드/프로세스 모두 한 곳만 갱신하고
+#   나머지는 기다렸다가 갱신된 파일을 다시 확인 → 다운로드는 정확히 한 번
+# - 통째로 바꾸는 파일(manifest, 이벤트 테이블)은 고유한 임시 파일 + os.replace 로 원자적 교체
+# - 읽기: 잠금 없이 메모리 맵으로, 커밋된 길이(manifest 의 size)까지만 읽는다
+#   · 이어 쓰기 중인 파일이라도 manifest 는 쓰기가 끝난 뒤 교체되므로 반쯤 쓴 행은 보이지 않는다
+# - 프로세스 안의 계산 결과 메모(Memo): 같은 키는 한 번만 계산, TTL 이 지난 항목은 정리
+
+import contextlib
+import json
+import mmap
+import os
+import socket
+import threading
+import time
+from collections import OrderedDict
+
+if os.name == 'nt':
+    import msvcrt
+else:
+    import fcntl
+
+LOCK_SUFFIX = '.lock'
+LOCK_TIMEOUT = 300
+
+
+def _try_lock(fd):
+    """fd 에 배타적 잠금을 걸어 보고 성공 여부 반환 (기다리지 않음)"""
+    try:
+        if os.name == 'nt':
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        else:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:    # BlockingIOError / PermissionError: 다른 프로세스가 잡고 있음
+        return False
+    return True
+
+
+def _unlock(fd):
+    if os.name == 'nt':
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    else:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+class FileLock(object):
+    """lock 파일에 거는 OS 잠금(flock / msvcrt.locking) 기반 프로세스 간 잠금 (재진입 불가)
+
+    잠금은 파일 디스크립터에 걸리므로 프로세스가 죽으면 OS 가 바로 풀어 준다
+    (죽은 프로세스의 잠금을 찾아 지우는 과정이 없어 두 프로세스가 동시에 잡는 경쟁도 없다).
+    lock 파일은 지우지 않는다: 지우면 이미 열어 둔 쪽과 새로 만든 쪽이 서로 다른 파일을 잠근다.
+    """
+
+    def __init__(self, path, timeout=LOCK_TIMEOUT, poll=0.05):
+        self.path = path + LOCK_SUFFIX
+        self.timeout = timeout
+        self.poll = poll
+        self._fd = None
+
+    def acquire(self):
+        deadline = time.monotonic() + self.timeout
+        delay = self.poll
+        fd = os.open(self.path, os.O_CREAT | os.O_RDWR, 0o644)
+        while not _try_lock(fd):
+            if time.monotonic() > deadline:
+                os.close(fd)
+                raise TimeoutError('잠금을 얻지 못했습니다: %s' % self.path)
+            time.sleep(delay)
+            delay = min(delay * 2, 1.0)
+        self._fd = fd
+        # 누가 잡고 있는지 확인용 (잠금 자체와는 무관). Windows 는 잠근 첫 바이트를 덮어쓰지 않도록 뒤에 쓴다
+        info = json.dumps({'pid': os.getpid(), 'host': socket.gethostname(), 'time': time.time()})
+        with contextlib.suppress(OSError):
+            os.ftruncate(fd, 1)
+            os.lseek(fd, 1, os.SEEK_SET)
+            os.write(fd, info.encode('utf-8') + b'\n')
+        return self
+
+    def release(self):
+        fd, self._fd = self._fd, None
+        if fd is None:
+            return
+        try:
+            _unlock(fd)
+        finally:
+            os.close(fd)
+
+    def __enter__(self):
+        return self.acquire()
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class KeyedLock(object):
+    """키별 스레드 잠금. 잡고 있거나 기다리는 스레드가 없는 키의 잠금은 지워서 쌓이지 않게 한다"""
+
+    def __init__(self):
+        self._locks = {}   # key -> [Lock, 사용 중인 스레드 수]
+        self._guard = threading.Lock()
+
+    @contextlib.contextmanager
+    def hold(self, key):
+        with self._guard:
+            entry = self._locks.get(key)
+            if entry is None:
+                entry = self._locks[key] = [threading.Lock(), 0]
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._guard:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._locks[key]
+
+    def __len__(self):
+        return len(self._locks)
+
+
+# 프로세스 안의 파일별 잠금 (스레드끼리는 lock 파일 폴링 대신 바로 대기)
+_PATH_LOCKS = KeyedLock()
+
+
+def _reset_path_locks():
+    # fork 시점에 다른 스레드가 잡고 있던 잠금은 자식 프로세스에서 영원히 풀리지 않으므로 새로 만든다
+    global _PATH_LOCKS
+    _PATH_LOCKS = KeyedLock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_path_locks)
+
+
+@contextlib.contextmanager
+def single_flight(path, timeout=LOCK_TIMEOUT):
+    """path 를 갱신하는 구간을 스레드/프로세스 통틀어 한 곳에서만 실행
+
+    블록 안에서는 반드시 최신 여부를 다시 확인한 뒤 갱신해야 한다.
+    (먼저 들어간 쪽이 이미 받았으면 기다린 쪽은 할 일이 없다)
+    """
+    key = os.path.abspath(path)
+    with _PATH_LOCKS.hold(key):
+        with FileLock(key, timeout=timeout):
+            yield
+
+
+class Memo(object):
+    """키별 계산 결과를 TTL 동안 메모리에 유지하는 프로세스 내 single-flight
+
+    같은 키의 동시 요청은 첫 계산을 기다려 결과를 공유한다.
+    만료된 항목은 prune_interval 마다 정리하고, max_entries 를 넘으면 오래 안 쓴 것부터 버린다.
+    """
+
+    def __init__(self, max_entries=1024, prune_interval=60.0):
+        self.max_entries = max_entries
+        self.prune_interval = prune_interval
+        self._values = OrderedDict()   # key -> (만료 시각, 값), 최근 사용 순
+        self._guard = threading.Lock()
+        self._locks = KeyedLock()
+        self._next_prune = 0.0
+
+    def _lookup(self, key):
+        with self._guard:
+            entry = self._values.get(key)
+            if entry is None or entry[0] <= time.time():
+                return False, None
+            self._values.move_to_end(key)
+            return True, entry[1]
+
+    def get(self, key, compute, ttl):
+        found, value = self._lookup(key)
+        if found:
+            return value
+        with self._locks.hold(key):
+            # 대기하는 동안 다른 스레드가 계산을 끝냈으면 그 결과를 사용
+            found, value = self._lookup(key)
+            if found:
+                return value
+            value = compute()
+            with self._guard:
+                self._values[key] = (time.time() + ttl, value)
+                self._values.move_to_end(key)
+                self._prune()
+            return value
+
+    def _prune(self):
+        now = time.time()
+        if now >= self._next_prune:
+            self._next_prune = now + self.prune_interval
+            for key in [k for k, (expires, _) in self._values.items() if expires <= now]:
+                del self._values[key]
+        while len(self._values) > self.max_entries:
+            self._values.popitem(last=False)
+
+    def __len__(self):
+        return len(self._values)
+
+
+def atomic_write(path, data):
+    """고유한 임시 파일에 쓰고 fsync 후 os.replace (읽는 쪽은 이전 또는 새 내용만 본다)"""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    tmp = '%s.%d.%d.tmp' % (path, os.getpid(), threading.get_ident())
+    try:
+        with open(tmp, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp)
+        raise
+
+
+def read_committed(path, size=None):
+    """잠금 없이 메모리 맵으로 커밋된 부분만 읽어 bytes 반환
+
+    size: 커밋된 길이 (manifest). 없으면 마지막 개행까지 (쓰는 중인 마지막 줄 제외)
+    """
+    with open(path, 'rb') as f:
+        length = os.fstat(f.fileno()).st_size
+        if length == 0:
+            return b''
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if size is not None and size <= length:
+                return mm[:size]
+            end = mm.rfind(b'\n')
+            return mm[:end + 1] if end >= 0 else b''
@@ -1 +1,176 @@
-from datetime import datetime
\ No newline at end of file
+from datetime import datetime, date, time, timedelta
+from array import array
+from zoneinfo import ZoneInfo
+import bisect
+
+# ----------------------------------------------------------------------
+# 거래일(세션) 캘린더
+# - 주말과 NYSE 휴장일을 제외한 거래일을 미리 계산해 정렬된 배열(ordinal)로 보관
+# - "N 거래일 전 날짜", 거래일 수 세기, 기간 내 거래일 목록을 이진 탐색(O(log n))으로 처리
+# - 마지막으로 확정된(장 마감이 지난) 거래일: 이어 쓰기 캐시는 이 날짜까지만 저장한다
+# ----------------------------------------------------------------------
+
+MARKET_TZ = ZoneInfo('America/New_York')
+MARKET_CLOSE = time(16, 0)
+
+# 정기 휴장일 외의 특별 휴장일 (국가 애도일, 천재지변 등)
+SPECIAL_CLOSURES = {
+    date(1994, 4, 27),   # 닉슨 대통령 장례
+    date(2001, 9, 11), date(2001, 9, 12), date(2001, 9, 13), date(2001, 9, 14),  # 9.11 테러
+    date(2004, 6, 11),   # 레이건 대통령 장례
+    date(2007, 1, 2),    # 포드 대통령 장례
+    date(2012, 10, 29), date(2012, 10, 30),  # 허리케인 샌디
+    date(2018, 12, 5),   # 부시 대통령 장례
+    date(2025, 1, 9),    # 카터 대통령 장례
+}
+
+
+def easter_sunday(year):
+    """그레고리력 부활절 날짜 (Anonymous Gregorian algorithm)"""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def nth_weekday(year, month, weekday, n):
+    """해당 월의 n번째 요일 (weekday: 월=0 ... 일=6, n=-1 이면 마지막 주)"""
+    if n > 0:
+        first = date(year, month, 1)
+        offset = (weekday - first.weekday()) % 7
+        return first + timedelta(days=offset + 7 * (n - 1))
+    # 마지막 주: 다음 달 1일에서 거꾸로 탐색
+    last = date(year + (month == 12), month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def observed(holiday):
+    """토요일 휴일은 금요일, 일요일 휴일은 월요일에 대체 휴장"""
+    if holiday.weekday() == 5:
+        return holiday - timedelta(days=1)
+    if holiday.weekday() == 6:
+        return holiday + timedelta(days=1)
+    return holiday
+
+
+def nyse_holidays(year):
+    """해당 연도의 NYSE 정기 휴장일 집합"""
+    holidays = {
+        nth_weekday(year, 2, 0, 3),              # Washington's Birthday (2월 셋째 월요일)
+        easter_sunday(year) - timedelta(days=2),  # Good Friday
+        nth_weekday(year, 5, 0, -1),             # Memorial Day (5월 마지막 월요일)
+        observed(date(year, 7, 4)),              # Independence Day
+        nth_weekday(year, 9, 0, 1),              # Labor Day (9월 첫째 월요일)
+        nth_weekday(year, 11, 3, 4),             # Thanksgiving (11월 넷째 목요일)
+        observed(date(year, 12, 25)),            # Christmas
+    }
+    # New Year's Day: 토요일이면 전년도 12/31 에 대체 휴장하지 않음
+    new_year = date(year, 1, 1)
+    if new_year.weekday() != 5:
+        holidays.add(observed(new_year))
+    if year >= 1998:
+        holidays.add(nth_weekday(year, 1, 0, 3))  # Martin Luther King Jr. Day
+    if year >= 2022:
+        holidays.add(observed(date(year, 6, 19)))  # Juneteenth
+    return holidays
+
+
+def _as_date(d):
+    return d.date() if isinstance(d, datetime) else d
+
+
+class TradingCalendar(object):
+    """미리 계산된 거래일 배열 기반 캘린더"""
+
+    def __init__(self, start_year=1990, end_year=None):
+        end_year = end_year or date.today().year + 2
+        closed = set(SPECIAL_CLOSURES)
+        for year in range(start_year, end_year + 1):
+            closed |= nyse_holidays(year)
+
+        first = date(start_year, 1, 1).toordinal()
+        last = date(end_year, 12, 31).toordinal()
+        # 거래일을 ordinal(정수)로 저장 → 메모리 절약 및 bisect 탐색
+        self.sessions = array('l', (
+            o for o in range(first, last + 1)
+            if (o - 1) % 7 < 5 and date.fromordinal(o) not in closed  # ordinal 1 = 월요일
+        ))
+
+    def _check(self, d):
+        o = _as_date(d).toordinal()
+        if not self.sessions or o < self.sessions[0] or o > self.sessions[-1]:
+            raise ValueError('%s 은(는) 캘린더 범위를 벗어났습니다.' % d)
+        return o
+
+    def is_session(self, d):
+        """거래일 여부"""
+        o = self._check(d)
+        i = bisect.bisect_left(self.sessions, o)
+        return i < len(self.sessions) and self.sessions[i] == o
+
+    def session_index(self, d):
+        """d 이하의 마지막 거래일 인덱스"""
+        return bisect.bisect_right(self.sessions, self._check(d)) - 1
+
+    def previous_session(self, d):
+        """d 이하의 가장 최근 거래일"""
+        return date.fromordinal(self.sessions[self.session_index(d)])
+
+    def next_session(self, d):
+        """d 이상의 가장 가까운 거래일"""
+        i = bisect.bisect_left(self.sessions, self._check(d))
+        return date.fromordinal(self.sessions[i])
+
+    def sessions_before(self, d, n):
+        """d 이하의 마지막 거래일을 포함해 n 거래일 구간의 첫 거래일"""
+        i = self.session_index(d) - (n - 1)
+        if i < 0:
+            raise ValueError('%s 이전 %d 거래일은 캘린더 범위를 벗어났습니다.' % (d, n))
+        return date.fromordinal(self.sessions[i])
+
+    def count_sessions(self, start, end):
+        """start ~ end (양 끝 포함) 사이의 거래일 수"""
+        lo = bisect.bisect_left(self.sessions, self._check(start))
+        hi = bisect.bisect_right(self.sessions, self._check(end))
+        return max(0, hi - lo)
+
+    def sessions_in_range(self, start, end):
+        """start ~ end (양 끝 포함) 사이의 거래일 목록"""
+        lo = bisect.bisect_left(self.sessions, self._check(start))
+        hi = bisect.bisect_right(self.sessions, self._check(end))
+        return [date.fromordinal(o) for o in self.sessions[lo:hi]]
+
+
+_DEFAULT_CALENDAR = None
+
+
+def default_calendar():
+    """기본(NYSE) 캘린더. 처음 호출할 때 한 번만 계산한다."""
+    global _DEFAULT_CALENDAR
+    if _DEFAULT_CALENDAR is None:
+        _DEFAULT_CALENDAR = TradingCalendar()
+    return _DEFAULT_CALENDAR
+
+
+def window_start(n, end=None):
+    """end(기본 오늘)까지 n 거래일을 받기 위한 다운로드 시작일"""
+    return default_calendar().sessions_before(end or date.today(), n)
+
+
+def last_closed_session(now=None):
+    """일봉이 확정된 마지막 거래일 (뉴욕 시간 장 마감 전이면 전 거래일)"""
+    now = now or datetime.now(MARKET_TZ)
+    if now.tzinfo is not None:
+        now = now.astimezone(MARKET_TZ)
+    calendar = default_calendar()
+    today = now.date()
+    if calendar.is_session(today) and now.time() >= MARKET_CLOSE:
+        return today
+    return calendar.previous_session(today - timedelta(days=1))
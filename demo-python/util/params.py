@@ -0,0 +1,19 @@
+# ----------------------------------------------------------------------
+# 명령줄/쿼리 문자열의 전략 파라미터 값 해석 (main.py, sweep_cluster.py, query_server.py 공용)
+# ----------------------------------------------------------------------
+
+
+def parse_value(text):
+    """문자열 값을 int → float → str 순서로 해석"""
+    for cast in (int, float):
+        try:
+            return cast(text)
+        except ValueError:
+            continue
+    return text
+
+
+def parse_param(text):
+    """'name=v1,v2,v3' 형식을 (name, [값...])으로 변환"""
+    name, _, values = text.partition('=')
+    return name, [parse_value(value) for value in values.split(',')]
@@ -7,6 +7,7 @@ from datetime import datetime, timedelta
 # nasdeq_data.py 파일에서 티커 추출 함수를 임포트하고,
 # 요청하신 'nasdeqTickerList'라는 이름으로 사용합니다.
 from nasdaq_data import get_nasdaq_100_tickers as nasdeqTickerList 
+from util.dynamic_date import window_start
 
 # ----------------------------------------------------------------------
 # 2단계 & 3단계: 주가 데이터 다운로드 및 50일 신고가 분석 함수
@@ -18,9 +19,10 @@ def find_50_day_highs(tickers):
     """
     WINDOW = 50 # 50 거래일 기준
     
-    # 50거래일 데이터를 안전하게 확보하기 위해 넉넉히 6개월(약 180일)의 데이터 요청
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=180) 
+    # 거래일 캘린더로 50거래일 구간의 시작일을 정확히 계산
+    # (오늘 봉이 아직 없을 수 있으므로 1 거래일 여유, end는 오늘 포함을 위해 다음 날)
+    end_date = datetime.now() + timedelta(days=1)
+    start_date = window_start(WINDOW + 1)
     
     high_50_day_stocks = []
     
@@ -70,4 +72,21 @@ def find_50_day_highs(tickers):
             continue
         
     print("✅ 50일 신고가 분석 완료.")
-    return high_50_day_stocks
\ No newline at end of file
+    return high_50_day_stocks
+
+
+def print_50_day_highs(result_list):
+    """50일 신고가 결과 리스트를 표 형태로 출력"""
+    print("\n" + "="*70)
+    print("    ⭐ 나스닥 100 종목 중 50일 신고가 기록 종목 ⭐")
+    print("="*70)
+    if result_list:
+        print(f"🎉 총 {len(result_list)}개 종목:")
+        # 리스트를 DataFrame으로 변환하여 표 형태로 깔끔하게 출력
+        result_df = pd.DataFrame(result_list)
+        # 주가를 보기 쉽게 소수점 두 자리로 포매팅
+        result_df['Current_Price'] = result_df['Current_Price'].round(2)
+        print(result_df.to_string(index=False)) # 인덱스 없이 출력
+    else:
+        print("🔍 현재 기준으로 50일 신고가를 기록한 종목은 없습니다.")
+    print("="*60)
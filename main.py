@@ -0,0 +1,323 @@
+# main.py 파일 - 통합 CLI 진입점
+#
+# 사용 예)
+#   python main.py scan
+#   python main.py backtest --ticker SPY --from 2024-01-01 --to 2025-11-04
+#   python main.py update ORCL AAPL
+#   python main.py optimize --ticker SPY --param donchian_high_period=10,20,30
+#   python main.py optimize --ticker SPY --method evolution --budget 200
+#   python main.py optimize --ticker SPY --method halving --budget 81 --prune
+#   python main.py signals --tickers AAPL,MSFT --holdings holdings.json
+#   python main.py --profile-imports update
+#   python main.py --memory-report mem.json backtest --ticker SPY --quiet
+#
+# backtrader / pandas / yfinance / matplotlib 같은 무거운 라이브러리는
+# 해당 서브커맨드가 실제로 필요할 때만 import 한다. (빠른 시작)
+
+import argparse
+import datetime
+import importlib
+import json
+import os
+import sys
+import time
+
+_START = time.perf_counter()
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+# demo-python 공용 모듈과 backtrader 예제 모듈을 import 할 수 있도록 경로 추가
+sys.path.append(os.path.join(ROOT, 'demo-python'))
+sys.path.append(os.path.join(ROOT, 'demo-python', 'backtrader'))
+
+from util.params import parse_param
+
+# 최적화 정렬 기준 (streaming_analyzers.collect_metrics 결과 중 클수록 좋은 값)
+METRICS = ('sharpe', 'total_return', 'annual_return', 'win_rate', 'final_value')
+
+# 지연 import 프로파일 (모듈 이름, 소요 시간 초)
+IMPORT_PROFILE = []
+
+
+def lazy_import(name):
+    """모듈을 필요할 때 import 하고 소요 시간을 기록"""
+    already = name in sys.modules
+    t0 = time.perf_counter()
+    module = importlib.import_module(name)
+    if not already:
+        IMPORT_PROFILE.append((name, time.perf_counter() - t0))
+    return module
+
+
+def print_import_profile():
+    """지연 import 소요 시간과 전체 실행 시간을 출력"""
+    print("="*70)
+    print("⏱  Import-time profile")
+    for name, elapsed in IMPORT_PROFILE:
+        print(f"   {name:<28} {elapsed * 1000:9.1f} ms")
+    total_imports = sum(elapsed for _, elapsed in IMPORT_PROFILE)
+    print(f"   {'(lazy imports total)':<28} {total_imports * 1000:9.1f} ms")
+    print(f"   {'(main.py elapsed)':<28} {(time.perf_counter() - _START) * 1000:9.1f} ms")
+    print("="*70)
+
+
+def parse_date(text):
+    return datetime.datetime.strptime(text, '%Y-%m-%d')
+
+
+def memory_profiler(args):
+    """--memory-report 가 주어졌을 때만 기록하는 MemoryProfiler"""
+    memory_profile = lazy_import('memory_profile')
+    return memory_profile.MemoryProfiler(enabled=bool(args.memory_report))
+
+
+# ----------------------------------------------------------------------
+# 서브커맨드
+# ----------------------------------------------------------------------
+
+def cmd_scan(args):
+    """나스닥 100 종목 중 50일 신고가 종목 스캔"""
+    nasdaq_data = lazy_import('nasdaq_data')
+    yfinance_data = lazy_import('yfinance_data')
+    profiler = memory_profiler(args)
+
+    with profiler.phase('universe'):
+        tickers = nasdaq_data.get_nasdaq_100_tickers()
+    if not tickers:
+        print("❗ 티커 리스트를 가져오는 데 실패하여 분석을 진행할 수 없습니다.")
+        return 1
+    with profiler.phase('scan'):
+        rows = yfinance_data.find_50_day_highs(tickers)
+    yfinance_data.print_50_day_highs(rows)
+    profiler.write(args.memory_report)
+    return 0
+
+
+def cmd_backtest(args):
+    """TurtleStrategy 백테스트 실행"""
+    turtle = lazy_import('turtle_strategy')
+    analyzers = lazy_import('streaming_analyzers')
+    profiler = memory_profiler(args)
+
+    print(f"백테스트 시작: {args.ticker}")
+    print(f"기간: {args.fromdate.date()} ~ {args.todate.date()}")
+    print("="*70)
+    with profiler.phase('data_load'):
+        df = turtle.load_history(args.ticker, args.fromdate, args.todate)
+    if df.empty:
+        print(f"!! 데이터 로드 실패: {args.ticker} 데이터를 가져오지 못했습니다. !!")
+        return 1
+
+    # --memory-report 가 없으면 wrap_strategy/phase 는 아무 일도 하지 않음
+    cerebro = turtle.build_cerebro(
+        df, args.ticker, cash=args.cash, commission=args.commission,
+        strategy=profiler.wrap_strategy(turtle.TurtleStrategy), printlog=not args.quiet)
+    with profiler.phase('run'):
+        strat = cerebro.run()[0]
+    with profiler.phase('analyzers'):
+        metrics = analyzers.collect_metrics(strat)
+    metrics['final_value'] = cerebro.broker.getvalue()
+    profiler.record_buffers(strat)
+
+    print("="*70)
+    print('Final Portfolio Value: %.2f' % metrics['final_value'])
+    analyzers.print_metrics(metrics)
+    print("="*70)
+
+    if args.plot:
+        # 플로팅이 필요할 때만 matplotlib 로드
+        with profiler.phase('plot'):
+            lazy_import('matplotlib')
+            cerebro.plot(style="candle", barup="red", bardown="blue")
+    profiler.write(args.memory_report)
+    return 0
+
+
+def cmd_update(args):
+    """티커 데이터 파일 증분 업데이트"""
+    data_updater = lazy_import('data_updater')
+
+    tickers = [t.upper() for t in args.tickers] or ['ORCL']
+    # ORCL은 기존 파일명(orcl-1995-2014.txt)을 그대로 사용
+    paths = {'ORCL': os.path.join(data_updater.DATA_DIR, 'orcl-1995-2014.txt')}
+    data_updater.update_tickers(tickers, paths, max_workers=args.workers)
+    return 0
+
+
+def cmd_optimize(args):
+    """TurtleStrategy 파라미터 최적화 (grid: cerebro.optstrategy, 그 외: 탐색 최적화기)"""
+    if args.method != 'grid':
+        return cmd_search(args)
+
+    turtle = lazy_import('turtle_strategy')
+    analyzers = lazy_import('streaming_analyzers')
+    bt = lazy_import('backtrader')
+    numpy_feed = lazy_import('numpy_feed')
+
+    grid = dict(parse_param(p) for p in args.param)
+    if not grid:
+        print("❗ --param name=v1,v2 형식으로 최적화할 파라미터를 지정하세요.")
+        return 1
+
+    df = turtle.load_history(args.ticker, args.fromdate, args.todate)
+    if df.empty:
+        print(f"!! 데이터 로드 실패: {args.ticker} 데이터를 가져오지 못했습니다. !!")
+        return 1
+
+    cerebro = bt.Cerebro(stdstats=False, maxcpus=args.workers)
+    # 최적화 중 같은 피드를 여러 번 사용하므로 원본 배열 유지
+    cerebro.adddata(numpy_feed.NumpyData(dataname=df, keepsource=True), name=args.ticker)
+    cerebro.optstrategy(turtle.TurtleStrategy, printlog=False, **grid)
+    cerebro.broker.setcash(args.cash)
+    cerebro.broker.setcommission(commission=args.commission)
+    analyzers.add_streaming_analyzers(cerebro)
+
+    rows = []
+    for run in cerebro.run():
+        strat = run[0]
+        metrics = analyzers.collect_metrics(strat)
+        metrics['final_value'] = strat.broker.getvalue()
+        metrics.update({name: getattr(strat.params, name) for name in grid})
+        rows.append(metrics)
+
+    rows.sort(key=lambda m: m[args.metric] if m[args.metric] is not None else float('-inf'),
+              reverse=True)
+    print("="*70)
+    print(f"최적화 결과 (상위 {args.top}개, 정렬 기준: {args.metric})")
+    for metrics in rows[:args.top]:
+        params = ', '.join(f"{name}={metrics[name]}" for name in grid)
+        print(f"   {params} -> {args.metric}={metrics[args.metric]}, "
+              f"return={metrics['total_return']:.2f}%, mdd={metrics['max_drawdown']:.2f}%")
+    print("="*70)
+    return 0
+
+
+def cmd_search(args):
+    """랜덤/진화/대리모델 탐색(budget 회 이내) 또는 successive halving 으로 최적 파라미터 탐색"""
+    turtle = lazy_import('turtle_strategy')
+    optimizer = lazy_import('turtle_optimizer')
+
+    df = turtle.load_history(args.ticker, args.fromdate, args.todate)
+    if df.empty:
+        print(f"!! 데이터 로드 실패: {args.ticker} 데이터를 가져오지 못했습니다. !!")
+        return 1
+
+    prune = optimizer.prune_criteria(args.max_dd, args.trade_deadline) if args.prune else None
+    if args.method == 'halving':
+        score, params, metrics, _ = optimizer.successive_halving(
+            df, args.ticker, args.budget, workers=args.workers, metric=args.metric,
+            cash=args.cash, commission=args.commission, seed=args.seed, prune=prune)
+    else:
+        score, params, metrics, _ = optimizer.optimize(
+            df, args.ticker, method=args.method, budget=args.budget, workers=args.workers,
+            metric=args.metric, cash=args.cash, commission=args.commission, seed=args.seed,
+            prune=prune)
+    print("="*70)
+    print(f"최고 {args.metric}: {score:.4f} (return={metrics['total_return']:.2f}%, "
+          f"mdd={metrics['max_drawdown']:.2f}%)")
+    for name, value in params.items():
+        print(f"   {name:<24} {value}")
+    print("="*70)
+    return 0
+
+
+def cmd_signals(args):
+    """워밍업 구간만 로드해 유니버스 전체의 오늘 TurtleStrategy 시그널 평가"""
+    signals = lazy_import('turtle_signals')
+
+    holdings = {}
+    if args.holdings:
+        with open(args.holdings, 'r', encoding='utf-8') as f:
+            holdings = json.load(f)
+    if args.tickers:
+        tickers = args.tickers.split(',')
+    else:
+        tickers = lazy_import('nasdaq_data').get_nasdaq_100_tickers()
+        if not tickers:
+            print("❗ 티커 리스트를 가져오는 데 실패하여 분석을 진행할 수 없습니다.")
+            return 1
+    tickers += [t for t in holdings if t not in tickers]
+
+    params = {name: values[0] for name, values in map(parse_param, args.param)}
+    results = signals.scan_signals(tickers, params=params, holdings=holdings,
+                                   account=args.account, workers=args.workers)
+    signals.print_signals(results)
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='backtrader-app 통합 CLI')
+    parser.add_argument('--profile-imports', action='store_true',
+                        help='지연 import 소요 시간 프로파일 출력')
+    parser.add_argument('--memory-report', metavar='PATH', default=None,
+                        help='단계별 메모리/라인 버퍼 보고서(JSON) 저장 (scan, backtest)')
+    sub = parser.add_subparsers(dest='command')
+
+    sub.add_parser('scan', help='나스닥 100 50일 신고가 스캔')
+
+    def add_backtest_args(p):
+        p.add_argument('--ticker', default='SPY')
+        p.add_argument('--from', dest='fromdate', type=parse_date, default=parse_date('2024-01-01'))
+        p.add_argument('--to', dest='todate', type=parse_date, default=parse_date('2025-11-04'))
+        p.add_argument('--cash', type=float, default=100000.0)
+        p.add_argument('--commission', type=float, default=0.001)
+
+    p = sub.add_parser('backtest', help='TurtleStrategy 백테스트')
+    add_backtest_args(p)
+    p.add_argument('--plot', action='store_true', help='결과 차트 출력')
+    p.add_argument('--quiet', action='store_true', help='전략 로그 출력 생략')
+
+    p = sub.add_parser('update', help='데이터 파일 증분 업데이트')
+    p.add_argument('tickers', nargs='*')
+    p.add_argument('--workers', type=int, default=8)
+
+    p = sub.add_parser('optimize', help='TurtleStrategy 파라미터 최적화')
+    add_backtest_args(p)
+    p.add_argument('--param', action='append', default=[],
+                   help='name=v1,v2,... (여러 번 지정 가능)')
+    p.add_argument('--metric', choices=METRICS, default='sharpe')
+    p.add_argument('--top', type=int, default=10)
+    p.add_argument('--workers', type=int, default=None)
+    p.add_argument('--method', choices=['grid', 'random', 'evolution', 'surrogate', 'halving'],
+                   default='grid')
+    p.add_argument('--budget', type=int, default=200,
+                   help='탐색 최적화의 최대 백테스트 횟수 (halving: 후보 수)')
+    p.add_argument('--seed', type=int, default=None)
+    p.add_argument('--prune', action='store_true',
+                   help='낙폭/무거래 기준으로 가망 없는 실행 조기 중단 (grid 제외)')
+    p.add_argument('--max-dd', type=float, default=None, help='조기 중단 낙폭 기준(%%)')
+    p.add_argument('--trade-deadline', type=int, default=None,
+                   help='이 바 수까지 거래가 없으면 조기 중단')
+
+    p = sub.add_parser('signals', help='TurtleStrategy 오늘의 진입/피라미딩/청산 시그널')
+    p.add_argument('--tickers', default=None, help='쉼표 구분 (기본: 나스닥 100)')
+    p.add_argument('--holdings', default=None, help='보유 종목 JSON 파일')
+    p.add_argument('--account', type=float, default=100000.0)
+    p.add_argument('--param', action='append', default=[], help='name=value (여러 번 지정 가능)')
+    p.add_argument('--workers', type=int, default=None)
+    return parser
+
+
+COMMANDS = {
+    'scan': cmd_scan,
+    'backtest': cmd_backtest,
+    'update': cmd_update,
+    'optimize': cmd_optimize,
+    'signals': cmd_signals,
+}
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command is None:
+        parser.print_help()
+        return 0
+    try:
+        return COMMANDS[args.command](args)
+    finally:
+        if args.profile_imports:
+            print_import_profile()
+
+
+if __name__ == '__main__':
+    sys.exit(main())